@@ -0,0 +1,6 @@
+"""Benchmarks for the Geneweaver Core library.
+
+These are not part of the test suite. Run them from the repository root, e.g.
+
+    python -m benchmarks.batch_classify_line
+"""
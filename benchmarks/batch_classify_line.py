@@ -0,0 +1,81 @@
+"""Benchmark the table driven batch line classifier on a 1M line file.
+
+Compares the exception driven header/value detection that process_lines used to do
+for every line against `classify_line`, and checks that the full parse produces the
+same genesets either way.
+
+python -m benchmarks.batch_classify_line
+"""
+
+from typing import List
+
+from geneweaver.core.parse.batch import (
+    BatchUploadGeneset,
+    IgnoreLineError,
+    LineKind,
+    NotAHeaderRowError,
+    ReadMode,
+    classify_line,
+    create_geneset,
+    process_header_line,
+    process_lines,
+    read_header,
+    read_values,
+)
+
+from benchmarks.utils import make_batch_file, timed
+
+
+def exception_line_kind(line: str) -> LineKind:
+    """Classify a line by trying to parse it as a header, as process_lines used to."""
+    try:
+        process_header_line(line)
+    except IgnoreLineError:
+        return LineKind.IGNORE
+    except NotAHeaderRowError:
+        return LineKind.VALUE
+    return LineKind.HEADER
+
+
+def exception_process_lines(contents: str) -> List[BatchUploadGeneset]:
+    """Parse a batch file with the exception driven loop process_lines used to use."""
+    genesets, header, current_geneset_values, read_mode = [], {}, [], ReadMode.HEADER
+    for line in contents.splitlines():
+        try:
+            genesets, current_geneset_values, header, read_mode = read_header(
+                line, header, current_geneset_values, read_mode, genesets
+            )
+        except NotAHeaderRowError:
+            current_geneset_values, read_mode = read_values(
+                line, header, current_geneset_values, read_mode
+            )
+        except IgnoreLineError:
+            continue
+    genesets.append(create_geneset(header, current_geneset_values))
+    return genesets
+
+
+def main() -> None:
+    """Run the benchmark."""
+    contents = make_batch_file(n_genesets=1000, values_per_geneset=1000)
+    lines = contents.splitlines()
+    print(f"{len(lines):,} lines")
+
+    old_kinds, old_time = timed(lambda: [exception_line_kind(x) for x in lines])
+    new_kinds, new_time = timed(lambda: [classify_line(x) for x in lines])
+    assert old_kinds == new_kinds
+    print(f"classify (exceptions):  {old_time:.2f}s")
+    print(f"classify (table):       {new_time:.2f}s  ({old_time / new_time:.1f}x)")
+
+    old_genesets, old_time = timed(exception_process_lines, contents)
+    new_genesets, new_time = timed(process_lines, contents)
+    # GeneValue equality ignores values, so compare the dumped genesets.
+    assert [g.model_dump() for g in old_genesets] == [
+        g.model_dump() for g in new_genesets
+    ]
+    print(f"process_lines (before): {old_time:.2f}s")
+    print(f"process_lines (after):  {new_time:.2f}s  ({old_time / new_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
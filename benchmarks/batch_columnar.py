@@ -0,0 +1,49 @@
+"""Benchmark columnar value accumulation against a regular batch parse.
+
+python -m benchmarks.batch_columnar
+"""
+
+# ruff: noqa: PD011
+import tracemalloc
+
+from geneweaver.core.parse.batch import process_lines
+
+from benchmarks.utils import make_batch_file, timed
+
+
+def peak_memory(func, *args, **kwargs) -> int:  # noqa: ANN001, ANN002, ANN003
+    """Call a function and return the peak memory it allocated, in bytes."""
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    """Run the benchmark."""
+    contents = make_batch_file(n_genesets=100, values_per_geneset=10000)
+
+    genesets, parse_time = timed(process_lines, contents)
+    columnar, columnar_time = timed(process_lines, contents, columnar=True)
+    assert [g.values.symbols for g in columnar] == [
+        [v.symbol for v in g.values] for g in genesets
+    ]
+    del genesets, columnar
+
+    parse_memory = peak_memory(process_lines, contents)
+    columnar_memory = peak_memory(process_lines, contents, columnar=True)
+
+    parse_mib, columnar_mib = parse_memory / 2**20, columnar_memory / 2**20
+    print(f"process_lines:                {parse_time:.2f}s {parse_mib:.0f} MiB")
+    print(
+        f"process_lines(columnar=True): {columnar_time:.2f}s "
+        f"{columnar_mib:.0f} MiB "
+        f"({parse_time / columnar_time:.1f}x faster, "
+        f"{parse_memory / columnar_memory:.1f}x less memory)"
+    )
+
+
+if __name__ == "__main__":
+    main()
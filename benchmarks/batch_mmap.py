@@ -0,0 +1,35 @@
+"""Benchmark the memory-mapped batch parser against reading the file into a string.
+
+python -m benchmarks.batch_mmap
+"""
+
+import tempfile
+from pathlib import Path
+
+from geneweaver.core.parse.batch import process_lines
+from geneweaver.core.parse.batch_mmap import process_batch_file
+from geneweaver.core.parse.utils import read_file_content
+
+from benchmarks.utils import make_batch_file, timed
+
+
+def main() -> None:
+    """Run the benchmark."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = Path(tmp_dir) / "batch.gw"
+        file_path.write_text(make_batch_file(n_genesets=500, values_per_geneset=1000))
+
+        text, text_time = timed(lambda: process_lines(read_file_content(file_path)))
+        print(f"process_lines(read_file_content(...)): {text_time:.2f}s")
+
+        mapped, mapped_time = timed(process_batch_file, file_path)
+        # GeneValue equality ignores values, so compare the dumped genesets.
+        assert [g.model_dump() for g in mapped] == [g.model_dump() for g in text]
+        print(
+            f"process_batch_file(...):               {mapped_time:.2f}s "
+            f"({text_time / mapped_time:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
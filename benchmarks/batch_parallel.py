@@ -0,0 +1,34 @@
+"""Benchmark parsing a large multi-geneset batch file across multiple processes.
+
+python -m benchmarks.batch_parallel
+"""
+
+import os
+
+from geneweaver.core.parse.batch import process_lines, process_lines_parallel
+
+from benchmarks.utils import make_batch_file, timed
+
+
+def main() -> None:
+    """Run the benchmark."""
+    contents = make_batch_file(n_genesets=2000, values_per_geneset=250)
+
+    serial, serial_time = timed(process_lines, contents)
+    # GeneValue equality ignores values, so compare the dumped genesets.
+    expected = [geneset.model_dump() for geneset in serial]
+    print(f"process_lines:                       {serial_time:.2f}s")
+
+    for workers in sorted({2, 4, os.cpu_count() or 1}):
+        parallel, parallel_time = timed(
+            process_lines_parallel, contents, max_workers=workers, chunksize=16
+        )
+        assert [geneset.model_dump() for geneset in parallel] == expected
+        print(
+            f"process_lines_parallel ({workers:>2} workers): {parallel_time:.2f}s "
+            f"({serial_time / parallel_time:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
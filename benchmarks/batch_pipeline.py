@@ -0,0 +1,64 @@
+"""Benchmark the staged batch pipeline against parsing then consuming each geneset.
+
+The consumer simulates a database write by sleeping, which (like a real database
+driver waiting on the network) releases the GIL.
+
+python -m benchmarks.batch_pipeline
+"""
+
+import io
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from geneweaver.core.parse.batch import iter_batch_genesets
+from geneweaver.core.parse.batch_pipeline import run_batch_pipeline
+
+from benchmarks.utils import make_batch_file, timed
+
+WRITE_SECONDS = 0.02
+
+
+def write_geneset(geneset: object) -> None:
+    """Simulate writing a geneset to a database."""
+    time.sleep(WRITE_SECONDS)
+
+
+def run_sequential(contents: bytes) -> int:
+    """Parse and consume each geneset in turn."""
+    count = 0
+    for geneset in iter_batch_genesets(io.BytesIO(contents)):
+        write_geneset(geneset)
+        count += 1
+    return count
+
+
+def main() -> None:
+    """Run the benchmark."""
+    contents = make_batch_file(n_genesets=100, values_per_geneset=10000).encode()
+
+    count, sequential_time = timed(run_sequential, contents)
+    print(f"sequential:                           {sequential_time:.2f}s")
+
+    _, pipeline_time = timed(run_batch_pipeline, io.BytesIO(contents), write_geneset)
+    print(
+        f"run_batch_pipeline:                   {pipeline_time:.2f}s "
+        f"({sequential_time / pipeline_time:.1f}x)"
+    )
+
+    with ProcessPoolExecutor() as executor:
+        _, executor_time = timed(
+            run_batch_pipeline,
+            io.BytesIO(contents),
+            write_geneset,
+            executor=executor,
+            columnar=True,
+        )
+    print(
+        f"run_batch_pipeline (procs, columnar): {executor_time:.2f}s "
+        f"({sequential_time / executor_time:.1f}x)"
+    )
+    print(f"({count} genesets, {count * WRITE_SECONDS:.2f}s of simulated writes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Benchmark the REGEX batch parsing engine against the LINES engine.
+
+python -m benchmarks.batch_regex
+"""
+
+from geneweaver.core.parse.batch import TrustLevel, process_lines
+from geneweaver.core.parse.enum import BatchEngine
+
+from benchmarks.utils import make_batch_file, timed
+
+OPTIONS = {
+    "default": {},
+    "columnar": {"columnar": True},
+    "columnar, trusted": {"columnar": True, "trust": TrustLevel.TRUSTED},
+    "vectorized": {"vectorized": True},
+}
+
+
+def main() -> None:
+    """Run the benchmark."""
+    contents = make_batch_file(n_genesets=100, values_per_geneset=10000)
+    print(f"{len(contents) / 1024 / 1024:.1f} MiB, 1000000 values:")
+
+    for name, options in OPTIONS.items():
+        _, lines_time = timed(process_lines, contents, **options)
+        _, regex_time = timed(
+            process_lines, contents, engine=BatchEngine.REGEX, **options
+        )
+        print(
+            f"{name + ':':<20} lines {lines_time:.2f}s, regex {regex_time:.2f}s "
+            f"({lines_time / regex_time:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
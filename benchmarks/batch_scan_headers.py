@@ -0,0 +1,28 @@
+"""Benchmark the header-only batch scan against a full parse.
+
+python -m benchmarks.batch_scan_headers
+"""
+
+import io
+
+from geneweaver.core.parse.batch import process_lines, scan_batch_headers
+
+from benchmarks.utils import make_batch_file, timed
+
+
+def main() -> None:
+    """Run the benchmark."""
+    contents = make_batch_file(n_genesets=1000, values_per_geneset=1000)
+
+    genesets, parse_time = timed(process_lines, contents)
+    print(f"process_lines:      {parse_time:.2f}s")
+
+    summaries, scan_time = timed(
+        lambda: list(scan_batch_headers(io.StringIO(contents)))
+    )
+    assert [s.value_count for s in summaries] == [len(g.values) for g in genesets]
+    print(f"scan_batch_headers: {scan_time:.2f}s ({parse_time / scan_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark the memory saved by interning gene symbols, for a whole import.
+
+Each parse runs in a fresh process, and its RSS growth is measured while every parsed
+geneset is still held in memory. RSS is read from /proc, so this runs on Linux.
+
+python -m benchmarks.batch_symbols
+"""
+
+import gc
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from geneweaver.core.parse.batch import process_lines
+from geneweaver.core.parse.symbols import SymbolTable, SymbolTableStats
+
+from benchmarks.utils import make_batch_file, timed
+
+
+def current_rss() -> int:
+    """Get the resident set size of this process, in bytes."""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def measure(
+    contents: str, intern: bool, columnar: bool
+) -> Tuple[int, float, Optional[SymbolTableStats]]:
+    """Parse the contents, and report the RSS growth while holding the genesets."""
+    gc.collect()
+    start_rss = current_rss()
+    symbols = SymbolTable() if intern else None
+    genesets, parse_time = timed(
+        process_lines, contents, columnar=columnar, symbols=symbols
+    )
+    gc.collect()
+    rss = current_rss() - start_rss
+    del genesets
+    return rss, parse_time, symbols.stats() if symbols else None
+
+
+def main() -> None:
+    """Run the benchmark."""
+    contents = make_batch_file(n_genesets=2000, values_per_geneset=500)
+    context = multiprocessing.get_context("fork")
+
+    for columnar in (False, True):
+        for intern in (False, True):
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                rss, parse_time, stats = executor.submit(
+                    measure, contents, intern, columnar
+                ).result()
+
+            print(
+                f"columnar={columnar!s:5} intern={intern!s:5} "
+                f"RSS +{rss / 2**20:.0f} MiB, {parse_time:.2f}s"
+            )
+            if stats:
+                print(
+                    f"    {stats.unique_symbols} unique symbols, "
+                    f"{stats.duplicates} duplicates, "
+                    f"table {stats.table_bytes / 2**20:.1f} MiB, "
+                    f"saved ~{stats.bytes_saved / 2**20:.0f} MiB"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Benchmark vectorized value conversion against converting each value.
+
+python -m benchmarks.batch_vectorized
+"""
+
+from geneweaver.core.parse.batch import process_lines
+from geneweaver.core.parse.values import convert_values
+from geneweaver.core.schema.batch import GenesetValueInput
+
+from benchmarks.utils import make_batch_file, timed
+
+
+def main() -> None:
+    """Run the benchmark."""
+    contents = make_batch_file(n_genesets=100, values_per_geneset=10000)
+    raw_values = [line.split()[1] for line in contents.splitlines()[7:] if "\t" in line]
+
+    _, each_time = timed(
+        lambda: [GenesetValueInput(symbol="A", value=value) for value in raw_values]
+    )
+    _, bulk_time = timed(convert_values, raw_values)
+    print(f"{len(raw_values)} values:")
+    print(f"GenesetValueInput per value:     {each_time:.2f}s")
+    print(
+        f"convert_values:                  {bulk_time:.2f}s "
+        f"({each_time / bulk_time:.1f}x)"
+    )
+
+    _, parse_time = timed(process_lines, contents)
+    _, columnar_time = timed(process_lines, contents, columnar=True)
+    _, vectorized_time = timed(process_lines, contents, vectorized=True)
+    print(f"process_lines:                   {parse_time:.2f}s")
+    print(f"process_lines(columnar=True):    {columnar_time:.2f}s")
+    print(
+        f"process_lines(vectorized=True):  {vectorized_time:.2f}s "
+        f"({parse_time / vectorized_time:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Benchmark cache hits on parse results against a full parse.
+
+python -m benchmarks.parse_cache
+"""
+
+import tempfile
+
+from geneweaver.core.parse.batch import process_lines
+from geneweaver.core.parse.cache import ParseCache
+
+from benchmarks.utils import make_batch_file, timed
+
+
+def main() -> None:
+    """Run the benchmark."""
+    contents = make_batch_file(n_genesets=100, values_per_geneset=10000)
+    _, parse_time = timed(process_lines, contents)
+    print(f"process_lines:                 {parse_time:.2f}s")
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ParseCache(directory)
+        _, miss_time = timed(cache.process_lines, contents, columnar=True)
+        print(f"ParseCache miss:               {miss_time:.2f}s")
+
+        for columnar in (True, False):
+            _, hit_time = timed(cache.process_lines, contents, columnar=columnar)
+            print(
+                f"ParseCache hit (columnar={columnar!s:5}): {hit_time:.2f}s "
+                f"({parse_time / hit_time:.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Benchmark exporting many genesets to one file each, across multiple processes.
+
+python -m benchmarks.render_export
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+from geneweaver.core.parse.batch import TrustLevel, process_lines
+from geneweaver.core.render.batch import format_batch_file
+from geneweaver.core.render.export import export_genesets
+
+from benchmarks.utils import make_batch_file, timed
+
+
+def export_serial(genesets: list, directory: Path) -> None:
+    """Export each geneset with a single-threaded loop."""
+    for index, geneset in enumerate(genesets):
+        (directory / f"{index}.gw").write_text(format_batch_file([geneset]))
+
+
+def main() -> None:
+    """Run the benchmark."""
+    contents = make_batch_file(n_genesets=2000, values_per_geneset=250)
+    genesets = process_lines(contents, columnar=True, trust=TrustLevel.TRUSTED)
+
+    with tempfile.TemporaryDirectory() as directory:
+        _, serial_time = timed(export_serial, genesets, Path(directory))
+    print(f"serial loop:                  {serial_time:.2f}s")
+
+    for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+        with tempfile.TemporaryDirectory() as directory:
+            _, export_time = timed(
+                export_genesets,
+                genesets,
+                "{index}.gw",
+                directory=directory,
+                max_workers=workers,
+            )
+        print(
+            f"export_genesets ({workers:>2} workers): {export_time:.2f}s "
+            f"({serial_time / export_time:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Benchmark formatting geneset values for export.
+
+python -m benchmarks.render_values
+"""
+
+from geneweaver.core.parse.batch import TrustLevel, process_lines
+from geneweaver.core.render.batch import format_geneset_values
+
+from benchmarks.utils import make_batch_file, timed
+
+
+def format_each_value(genesets: list) -> list:
+    """Format each value on its own, as format_geneset_values used to."""
+    return [
+        "\n".join(str(gene_value) for gene_value in geneset.values)  # noqa: PD011
+        for geneset in genesets
+    ]
+
+
+def format_values(genesets: list, value_format: str = None) -> list:
+    """Format each geneset's values in bulk."""
+    return [format_geneset_values(geneset, value_format) for geneset in genesets]
+
+
+def main() -> None:
+    """Run the benchmark."""
+    contents = make_batch_file(n_genesets=100, values_per_geneset=10000)
+    print("1000000 values:")
+
+    for name, columnar in (("list", False), ("columnar", True)):
+        genesets = process_lines(contents, columnar=columnar, trust=TrustLevel.TRUSTED)
+        expected, each_time = timed(format_each_value, genesets)
+        result, bulk_time = timed(format_values, genesets)
+        assert result == expected
+        _, g_time = timed(format_values, genesets, "%.6g")
+        print(
+            f"{name + ':':<10} per value {each_time:.2f}s, bulk {bulk_time:.2f}s "
+            f"({each_time / bulk_time:.1f}x), bulk %.6g {g_time:.2f}s "
+            f"({each_time / g_time:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Utility functions for generating benchmark data."""
+
+import random
+import string
+import time
+from typing import Any, Callable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+BATCH_FILE_PREAMBLE = """# Benchmark batch file
+! P-Value < 0.05
+@ Mus musculus
+% Gene Symbol
+P 19958391
+A Private
+"""
+
+
+def make_batch_file(
+    n_genesets: int, values_per_geneset: int, n_symbols: int = 25000, seed: int = 0
+) -> str:
+    """Generate the contents of a synthetic batch file.
+
+    :param n_genesets: The number of genesets in the file.
+    :param values_per_geneset: The number of value lines in each geneset.
+    :param n_symbols: The number of distinct gene symbols to draw from.
+    :param seed: The random seed, so the same file is generated every time.
+
+    :returns: The contents of the batch file.
+    """
+    rng = random.Random(seed)
+    symbols = [
+        "".join(rng.choices(string.ascii_uppercase + string.digits, k=8))
+        for _ in range(n_symbols)
+    ]
+    parts = [BATCH_FILE_PREAMBLE]
+    for idx in range(n_genesets):
+        parts.append(
+            f"\n: GS{idx}\n= Benchmark Geneset {idx}\n+ Geneset number {idx}.\n\n"
+        )
+        parts.append(
+            "\n".join(
+                f"{rng.choice(symbols)}\t{rng.random():.6g}"
+                for _ in range(values_per_geneset)
+            )
+        )
+        parts.append("\n")
+    return "".join(parts)
+
+
+def timed(
+    func: Callable[..., T], *args: Any, **kwargs: Any  # noqa: ANN401
+) -> Tuple[T, float]:
+    """Call a function and return its result along with the elapsed seconds."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
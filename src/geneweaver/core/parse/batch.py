@@ -5,12 +5,43 @@ their contents. It includes functionality to check the type of a file,
 process lines of content, read headers and values, update and reset headers,
 and create Geneset objects for batch upload.
 
-File Type Identification Function:
+File Type Identification Functions:
 - is_batch_file: Check if the provided file contents are a valid batch file.
+- sniff_file_type: Determine the type of a file from a path or stream, reading only as
+much of it as is needed (up to a maximum number of bytes).
+- file_type_from_lines: Determine the file type from the first decisive line.
 
-Line Processing Function:
+Line Processing Functions:
 - process_lines: Process each line of content to build and return a list of
 BatchUploadGeneset instances.
+- iter_batch_genesets: Lazily parse a batch file from a text or binary stream, yielding
+each BatchUploadGeneset as soon as it is complete.
+- iter_genesets_from_lines: Lazily build BatchUploadGeneset instances from an iterable
+of lines.
+
+Header-Only Scanning Functions:
+- scan_batch_headers: Lazily summarise each geneset in a batch file stream, without
+building its values.
+- scan_headers: Lazily summarise each geneset in an iterable of lines, without building
+its values.
+
+Incremental Parsing Class:
+- BatchParser: Push-style parser which accepts a batch file in chunks through feed(),
+returning genesets as they are completed, and validates the final geneset on close().
+
+Parsing Options:
+- TrustLevel: How much a batch file is trusted, and so how much of it is validated.
+
+Parallel Processing Functions:
+- process_lines_parallel: Process a batch file across multiple processes, with the same
+results and errors as process_lines.
+- split_geneset_blocks: Split lines into per-geneset blocks, each with the header values
+it inherits from the genesets before it.
+- process_geneset_block: Process a single geneset block into BatchUploadGeneset
+instances.
+
+Line Classification Function:
+- classify_line: Classify a line as a header, value or ignored line without raising.
 
 Header Processing Functions:
 - read_header: Process a header line and update the corresponding state variables
@@ -26,6 +57,7 @@ processed line.
 Value Processing Functions:
 - read_values: Read a line assuming it's a value, and updates the reading mode if
 necessary.
+- read_trusted_values: Read a line from a trusted batch file, assuming it's a value.
 - process_value_line: Process a value line into a key-value pair.
 
 Geneset Construction Function:
@@ -48,12 +80,31 @@ values.
 - MissingRequiredHeaderError: Raised when any of the required keys are missing in the
 header.
 - IgnoreLineError: Raised if the line is to be ignored based on its prefix.
+- ValueConversionError: Raised by vectorized parsing if any of a geneset's values cannot
+be converted to floats.
 """
 
+import io
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
-from typing import List, Tuple
+from pathlib import Path
+from typing import (
+    BinaryIO,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+)
 
-from geneweaver.core.parse.enum import GeneweaverFileType
+from geneweaver.core.parse.duplicates import DuplicateStats, deduplicate_gene_values
+from geneweaver.core.parse.enum import (
+    BatchEngine,
+    DuplicatePolicy,
+    GeneweaverFileType,
+)
 from geneweaver.core.parse.exceptions import (
     IgnoreLineError,
     InvalidBatchValueLineError,
@@ -62,7 +113,23 @@ from geneweaver.core.parse.exceptions import (
     NotAHeaderRowError,
     UnsupportedFileTypeError,
 )
-from geneweaver.core.schema.batch import BatchUploadGeneset, GenesetValueInput
+from geneweaver.core.parse.symbols import SymbolTable
+from geneweaver.core.parse.utils import (
+    LineSplitter,
+    is_binary_stream,
+    iter_lines,
+    open_decompressed_stream,
+    open_file,
+)
+from geneweaver.core.parse.values import RawGeneValues
+from geneweaver.core.schema.batch import (
+    BatchGenesetSummary,
+    BatchUploadGeneset,
+    ColumnarBatchUploadGeneset,
+    GenesetValueInput,
+)
+from geneweaver.core.schema.gene import GeneValueColumns
+from geneweaver.core.types import StringOrPath
 
 # Header characters which DO NOT need to be space separated.
 HEADER_CHARACTERS = {
@@ -95,6 +162,11 @@ IGNORE_CHARACTERS = {
 # Characters denoting required header information for all genesets.
 REQUIRED_HEADERS = (":", "=", "+")
 
+# The default maximum number of bytes to read when sniffing the type of a file, and
+# the size of the chunks to read them in.
+DEFAULT_SNIFF_MAX_BYTES = 1024 * 1024
+SNIFF_CHUNK_SIZE = 8 * 1024
+
 
 class ReadMode(Enum):
     """Enum to keep track of what part of the batch file is being read."""
@@ -103,6 +175,39 @@ class ReadMode(Enum):
     CONTENT = "content"
 
 
+class TrustLevel(Enum):
+    """Enum for how much a batch file is trusted to be well-formed.
+
+    UNTRUSTED files are fully validated. TRUSTED files (e.g. those written by our own
+    pipelines) still have their header values validated, once per geneset, but value
+    lines are only split and converted to floats, without the checks and error
+    wrapping of `process_value_line`, and without validating a model for each value.
+    Malformed value lines in a trusted file raise a bare ValueError rather than an
+    InvalidBatchValueLineError.
+    """
+
+    UNTRUSTED = "untrusted"
+    TRUSTED = "trusted"
+
+
+class LineKind(Enum):
+    """Enum for the kinds of line that can be found in a batch file."""
+
+    HEADER = "header"
+    VALUE = "value"
+    IGNORE = "ignore"
+
+
+# Dispatch table from the first (non-whitespace) character of a line to its kind.
+# Space separated header characters map to None, because they are only headers when
+# they are followed by whitespace. Any character not in the table starts a value line.
+LINE_PREFIX_KINDS = {
+    **{char: LineKind.HEADER for char in HEADER_CHARACTERS},
+    **{char: None for char in SPACE_SEPARATED_HEADER_CHARACTERS},
+    **{char: LineKind.IGNORE for char in IGNORE_CHARACTERS},
+}
+
+
 def is_batch_file(contents: str) -> GeneweaverFileType:
     """Check if the provided file contents are a valid batch file.
 
@@ -125,7 +230,91 @@ def is_batch_file(contents: str) -> GeneweaverFileType:
     :returns: GeneweaverFileType.BATCH if the file is a batch file,
     GeneweaverFileType.VALUES otherwise.
     """
-    for line in contents.splitlines():
+    file_type = file_type_from_lines(iter_lines(io.StringIO(contents, newline="")))
+
+    if file_type is None:
+        raise UnsupportedFileTypeError()
+
+    return file_type
+
+
+def sniff_file_type(
+    source: Union[StringOrPath, TextIO, BinaryIO],
+    max_bytes: int = DEFAULT_SNIFF_MAX_BYTES,
+    encoding: str = "utf-8",
+) -> GeneweaverFileType:
+    """Determine whether a file is a batch file, without loading the whole file.
+
+    This makes the same decision as `is_batch_file`, but reads the file in small chunks
+    and stops as soon as the first header or value line is found. At most `max_bytes`
+    bytes (or characters, for text streams) are examined.
+
+    If a stream is given and it is seekable, its position is restored afterwards, so it
+    can be passed straight on to a parser. Compressed files are decompressed
+    transparently when a path is given, see `geneweaver.core.parse.utils.open_file`.
+
+    :param source: A path to the file, or a readable text or binary stream.
+    :param max_bytes: The maximum number of bytes to examine.
+    :param encoding: The encoding to use for binary files and streams.
+
+    :raises: UnsupportedFileTypeError: If the file is neither a batch file nor a
+    geneset values file, or if no header or value line is found within `max_bytes`.
+
+    :returns: GeneweaverFileType.BATCH if the file is a batch file,
+    GeneweaverFileType.VALUES otherwise.
+    """
+    if isinstance(source, (str, Path)):
+        with open_file(source, "rb") as stream:
+            return sniff_file_type(stream, max_bytes, encoding)
+
+    start = source.tell() if source.seekable() else None
+    line_splitter, remaining = LineSplitter(encoding), max_bytes
+
+    try:
+        while remaining > 0:
+            chunk = source.read(min(SNIFF_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+
+            remaining -= len(chunk)
+            file_type = file_type_from_lines(line_splitter.feed(chunk))
+            if file_type is not None:
+                return file_type
+
+        else:
+            # The budget is used up, which is only OK if the file ends here too.
+            if source.read(1):
+                raise UnsupportedFileTypeError(
+                    f"No header or value line found in the first {max_bytes} bytes."
+                )
+
+        file_type = file_type_from_lines(line_splitter.close())
+        if file_type is None:
+            raise UnsupportedFileTypeError()
+
+        return file_type
+
+    finally:
+        if start is not None:
+            source.seek(start)
+
+
+def file_type_from_lines(lines: Iterable[str]) -> Optional[GeneweaverFileType]:
+    """Determine the file type from the first decisive line.
+
+    A header line means the file is a batch file, and a value line means it is a
+    geneset values file. Ignored lines (e.g. comments) are skipped, and no further lines
+    are read after the first decisive line.
+
+    :param lines: The lines to check.
+
+    :raises: UnsupportedFileTypeError: If the first line which is not ignored is neither
+    a header line nor a valid value line.
+
+    :returns: GeneweaverFileType.BATCH or GeneweaverFileType.VALUES, or None if every
+    line is ignored.
+    """
+    for line in lines:
         try:
             _ = process_header_line(line)
             return GeneweaverFileType.BATCH
@@ -144,10 +333,19 @@ def is_batch_file(contents: str) -> GeneweaverFileType:
         except IgnoreLineError:
             continue
 
-    raise UnsupportedFileTypeError()
+    return None
 
 
-def process_lines(contents: str) -> List[BatchUploadGeneset]:
+def process_lines(
+    contents: str,
+    columnar: bool = False,
+    trust: TrustLevel = TrustLevel.UNTRUSTED,
+    duplicates: Optional[DuplicatePolicy] = None,
+    vectorized: bool = False,
+    symbols: Optional[SymbolTable] = None,
+    engine: BatchEngine = BatchEngine.LINES,
+    duplicate_stats: Optional[DuplicateStats] = None,
+) -> List[BatchUploadGeneset]:
     """Process each line of content to build and return a list of BatchUploadGeneset.
 
     The function iterates over each line in the provided content. Depending on the
@@ -168,29 +366,540 @@ def process_lines(contents: str) -> List[BatchUploadGeneset]:
     After processing all lines, the function appends the final geneset (created from the
     last header and value lines) to the genesets list.
 
+    Large files containing many genesets can be processed across multiple processes
+    with `process_lines_parallel`.
+
     :param contents: The contents of the batch file to be processed.
+    :param columnar: Whether to collect each geneset's values as compact columns, and
+    return ColumnarBatchUploadGeneset instances. This uses much less memory and time
+    for large files.
+    :param trust: How much the batch file is trusted, see TrustLevel.
+    :param duplicates: How to resolve duplicate gene symbols in each geneset, see
+    `geneweaver.core.parse.duplicates`. By default duplicates are kept.
+    :param vectorized: Whether to convert each geneset's values to floats in bulk, see
+    `BatchParser`.
+    :param symbols: A table to intern gene symbols in, so that identical symbols share
+    one string object, see `geneweaver.core.parse.symbols`.
+    :param engine: The engine to parse the contents with. The REGEX engine gives the
+    same results, but finds the value lines of the whole file with regular
+    expressions, and reads them in bulk, see `geneweaver.core.parse.batch_regex`.
+    :param duplicate_stats: Where to count the duplicates removed by the duplicates
+    policy, see `geneweaver.core.parse.duplicates.DuplicateStats`.
 
     :returns: A list of genesets created from the processed batch file.
     """
-    genesets, header, current_geneset_values, read_mode = [], {}, [], ReadMode.HEADER
+    if engine is BatchEngine.REGEX:
+        # Imported here, as batch_regex builds on this module.
+        from geneweaver.core.parse.batch_regex import process_lines_regex
+
+        return process_lines_regex(
+            contents,
+            columnar=columnar,
+            trust=trust,
+            duplicates=duplicates,
+            vectorized=vectorized,
+            symbols=symbols,
+            duplicate_stats=duplicate_stats,
+        )
 
-    for line in contents.splitlines():
-        try:
-            genesets, current_geneset_values, header, read_mode = read_header(
-                line, header, current_geneset_values, read_mode, genesets
+    return list(
+        iter_genesets_from_lines(
+            contents.splitlines(),
+            columnar=columnar,
+            trust=trust,
+            duplicates=duplicates,
+            vectorized=vectorized,
+            symbols=symbols,
+            duplicate_stats=duplicate_stats,
+        )
+    )
+
+
+def process_lines_parallel(
+    contents: str, max_workers: Optional[int] = None, chunksize: int = 1
+) -> List[BatchUploadGeneset]:
+    """Process the lines of a batch file across multiple processes.
+
+    The file is first split into geneset blocks (see `split_geneset_blocks`), which
+    resolves the header values each geneset inherits from the ones before it. The
+    blocks are then parsed and validated independently in a ProcessPoolExecutor.
+
+    The result is the same as `process_lines`, in the same order. Results are collected
+    in file order, so if any block fails, the error raised is the same one that
+    `process_lines` would raise (i.e. the one closest to the start of the file).
+
+    :param contents: The contents of the batch file to be processed.
+    :param max_workers: The maximum number of processes to use. Defaults to the number
+    of processors on the machine.
+    :param chunksize: The number of geneset blocks to send to a process at a time.
+    Increasing this reduces overhead for files with many small genesets.
+
+    :returns: A list of genesets created from the processed batch file.
+    """
+    headers, blocks = [], []
+    for header, block in split_geneset_blocks(contents.splitlines()):
+        headers.append(header)
+        blocks.append(block)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return [
+            geneset
+            for block_genesets in executor.map(
+                process_geneset_block, headers, blocks, chunksize=chunksize
             )
+            for geneset in block_genesets
+        ]
 
-        except NotAHeaderRowError:
-            current_geneset_values, read_mode = read_values(
-                line, header, current_geneset_values, read_mode
+
+def split_geneset_blocks(
+    lines: Iterable[str], header: Optional[dict] = None
+) -> Iterator[Tuple[dict, List[str]]]:
+    """Split the lines of a batch file into one block of lines per geneset.
+
+    A new block starts at each header line that follows a value line. Each block is
+    paired with the header values it inherits from the blocks before it (e.g. species,
+    score and gene_id_type), resolved the same way `process_lines` carries them over
+    with `reset_required_header_values`. This means each block can be processed
+    independently of the others with `process_geneset_block`.
+
+    Only header lines are parsed, so splitting is cheap and does not raise for invalid
+    value lines; those errors are left for `process_geneset_block` to raise.
+
+    :param lines: An iterable of lines from a batch file, without line terminators.
+    :param header: The header values to start with, e.g. those inherited from earlier
+    genesets in the same file. Defaults to an empty header.
+
+    :returns: An iterator of tuples, where the first value is the inherited header
+    dictionary and the second value is the list of lines in the block.
+    """
+    header = {} if header is None else dict(header)
+    block_header, block, read_mode = dict(header), [], ReadMode.HEADER
+
+    for line in lines:
+        line_kind = classify_line(line)
+
+        if line_kind is LineKind.HEADER:
+            if read_mode is ReadMode.CONTENT:
+                yield block_header, block
+                block_header = reset_required_header_values(dict(header))
+                header, block, read_mode = dict(block_header), [], ReadMode.HEADER
+            header = update_header(*process_header_line(line), header)
+
+        elif line_kind is LineKind.VALUE:
+            read_mode = ReadMode.CONTENT
+
+        block.append(line)
+
+    yield block_header, block
+
+
+def process_geneset_block(
+    header: dict,
+    lines: List[str],
+    columnar: bool = False,
+    trust: TrustLevel = TrustLevel.UNTRUSTED,
+    duplicates: Optional[DuplicatePolicy] = None,
+) -> List[BatchUploadGeneset]:
+    """Process a single geneset block, as produced by `split_geneset_blocks`.
+
+    :param header: The header values inherited from the preceding genesets.
+    :param lines: The lines in the geneset block.
+    :param columnar: Whether to collect each geneset's values as compact columns, and
+    return ColumnarBatchUploadGeneset instances.
+    :param trust: How much the lines are trusted, see TrustLevel.
+    :param duplicates: How to resolve duplicate gene symbols in each geneset, see
+    `geneweaver.core.parse.duplicates`. By default duplicates are kept.
+
+    :returns: A list of the genesets created from the block.
+    """
+    return list(
+        iter_genesets_from_lines(
+            lines,
+            header=dict(header),
+            columnar=columnar,
+            trust=trust,
+            duplicates=duplicates,
+        )
+    )
+
+
+def iter_batch_genesets(
+    stream: Union[TextIO, BinaryIO],
+    columnar: bool = False,
+    trust: TrustLevel = TrustLevel.UNTRUSTED,
+    duplicates: Optional[DuplicatePolicy] = None,
+    vectorized: bool = False,
+    symbols: Optional[SymbolTable] = None,
+    duplicate_stats: Optional[DuplicateStats] = None,
+) -> Iterator[BatchUploadGeneset]:
+    """Lazily parse a batch file from a text or binary stream.
+
+    This is the streaming counterpart to `process_lines`. The stream is read in chunks
+    and each geneset is yielded as soon as its block of values ends, so peak memory is
+    bounded by the largest single geneset rather than by the size of the whole file.
+
+    :param stream: A readable text or binary file-like object containing a batch file.
+    Binary streams are decoded as UTF-8, after being decompressed if they are
+    compressed (see `geneweaver.core.parse.utils.open_decompressed_stream`).
+    :param columnar: Whether to collect each geneset's values as compact columns, and
+    yield ColumnarBatchUploadGeneset instances.
+    :param trust: How much the batch file is trusted, see TrustLevel.
+    :param duplicates: How to resolve duplicate gene symbols in each geneset, see
+    `geneweaver.core.parse.duplicates`. By default duplicates are kept.
+    :param vectorized: Whether to convert each geneset's values to floats in bulk, see
+    `BatchParser`.
+    :param symbols: A table to intern gene symbols in, so that identical symbols share
+    one string object, see `geneweaver.core.parse.symbols`.
+    :param duplicate_stats: Where to count the duplicates removed by the duplicates
+    policy, see `geneweaver.core.parse.duplicates.DuplicateStats`.
+
+    :returns: An iterator over the genesets in the batch file.
+    """
+    if is_binary_stream(stream):
+        stream = open_decompressed_stream(stream)
+
+    return iter_genesets_from_lines(
+        iter_lines(stream),
+        columnar=columnar,
+        trust=trust,
+        duplicates=duplicates,
+        vectorized=vectorized,
+        symbols=symbols,
+        duplicate_stats=duplicate_stats,
+    )
+
+
+def iter_genesets_from_lines(
+    lines: Iterable[str],
+    header: Optional[dict] = None,
+    columnar: bool = False,
+    trust: TrustLevel = TrustLevel.UNTRUSTED,
+    duplicates: Optional[DuplicatePolicy] = None,
+    vectorized: bool = False,
+    symbols: Optional[SymbolTable] = None,
+    duplicate_stats: Optional[DuplicateStats] = None,
+) -> Iterator[BatchUploadGeneset]:
+    """Lazily build BatchUploadGeneset instances from an iterable of lines.
+
+    Lines are processed exactly as described in `process_lines`, including carrying
+    non-required header values over from one geneset to the next. Each geneset is
+    yielded as soon as a header line following its values is read, and the final
+    geneset is yielded once the lines are exhausted.
+
+    :param lines: An iterable of lines from a batch file, without line terminators.
+    :param header: The header values to start with, e.g. those inherited from earlier
+    genesets in the same file. Defaults to an empty header.
+    :param columnar: Whether to collect each geneset's values as compact columns, and
+    yield ColumnarBatchUploadGeneset instances.
+    :param trust: How much the lines are trusted, see TrustLevel.
+    :param duplicates: How to resolve duplicate gene symbols in each geneset, see
+    `geneweaver.core.parse.duplicates`. By default duplicates are kept.
+    :param vectorized: Whether to convert each geneset's values to floats in bulk, see
+    `BatchParser`.
+    :param symbols: A table to intern gene symbols in, so that identical symbols share
+    one string object, see `geneweaver.core.parse.symbols`.
+    :param duplicate_stats: Where to count the duplicates removed by the duplicates
+    policy, see `geneweaver.core.parse.duplicates.DuplicateStats`.
+
+    :returns: An iterator over the genesets created from the lines.
+    """
+    parser = BatchParser(
+        header=header,
+        columnar=columnar,
+        trust=trust,
+        duplicates=duplicates,
+        vectorized=vectorized,
+        symbols=symbols,
+        duplicate_stats=duplicate_stats,
+    )
+
+    for line in lines:
+        parser.process_line(line)
+        if parser.genesets:
+            yield from parser.pop_genesets()
+
+    yield from parser.close()
+
+
+def scan_batch_headers(
+    stream: Union[TextIO, BinaryIO]
+) -> Iterator[BatchGenesetSummary]:
+    """Lazily summarise each geneset in a batch file stream, without its values.
+
+    See `scan_headers`.
+
+    :param stream: A readable text or binary file-like object containing a batch file.
+    Binary streams are decoded as UTF-8, after being decompressed if they are
+    compressed (see `geneweaver.core.parse.utils.open_decompressed_stream`).
+
+    :returns: An iterator over the summaries of the genesets in the batch file.
+    """
+    if is_binary_stream(stream):
+        stream = open_decompressed_stream(stream)
+
+    return scan_headers(iter_lines(stream))
+
+
+def scan_headers(lines: Iterable[str]) -> Iterator[BatchGenesetSummary]:
+    """Lazily summarise each geneset in an iterable of lines, without its values.
+
+    Header lines are processed with the same state machine as `process_lines`
+    (including carrying header values over between genesets, and checking for required
+    header values), but value lines are only counted. No GenesetValueInput instances are
+    built and value lines are not validated, so this is much faster than
+    `process_lines`, and uses constant memory per geneset.
+
+    :param lines: An iterable of lines from a batch file, without line terminators.
+
+    :returns: An iterator over the summaries of the genesets.
+
+    :raises MissingRequiredHeaderError: If any of the required keys are missing in the
+    header when the first value line of a geneset is read.
+    """
+    header, value_count, read_mode = {}, 0, ReadMode.HEADER
+
+    for line in lines:
+        line_kind = classify_line(line)
+
+        if line_kind is LineKind.VALUE:
+            if read_mode is ReadMode.HEADER:
+                check_has_required_header_values(header)
+                read_mode = ReadMode.CONTENT
+            value_count += 1
+
+        elif line_kind is LineKind.HEADER:
+            if read_mode is ReadMode.CONTENT:
+                yield BatchGenesetSummary(value_count=value_count, **header)
+                header = reset_required_header_values(header)
+                value_count, read_mode = 0, ReadMode.HEADER
+            header = update_header(*process_header_line(line), header)
+
+    yield BatchGenesetSummary(value_count=value_count, **header)
+
+
+class BatchParser:
+    """Push-style, incremental batch file parser.
+
+    This wraps the same ReadMode state machine as `process_lines`, but the batch file
+    is passed to `feed` in chunks (of str or bytes) as it arrives, e.g. from a chunked
+    HTTP request body. Lines split across chunk boundaries are reassembled, and each
+    call to `feed` returns the genesets which were completed by that chunk. The final
+    geneset is created and validated by `close`.
+
+    Errors are raised by the `feed` (or `close`) call which contains the offending line,
+    so validation can start while the rest of the file is still arriving.
+
+    When vectorized, each geneset's raw value strings are collected (in a
+    RawGeneValues), and converted to floats in one NumPy call when the geneset is
+    complete (see `geneweaver.core.parse.values.convert_values`). Every value which
+    cannot be converted is then reported at once, with its line number, in a
+    ValueConversionError.
+    """
+
+    def __init__(
+        self: "BatchParser",
+        header: Optional[dict] = None,
+        encoding: str = "utf-8",
+        columnar: bool = False,
+        trust: TrustLevel = TrustLevel.UNTRUSTED,
+        duplicates: Optional[DuplicatePolicy] = None,
+        vectorized: bool = False,
+        na_values: Iterable[str] = (),
+        symbols: Optional[SymbolTable] = None,
+        duplicate_stats: Optional[DuplicateStats] = None,
+    ) -> None:
+        """Initialize the parser.
+
+        :param header: The header values to start with, e.g. those inherited from
+        earlier genesets in the same file. Defaults to an empty header.
+        :param encoding: The encoding to use for chunks of bytes.
+        :param columnar: Whether to collect each geneset's values as compact columns,
+        and return ColumnarBatchUploadGeneset instances.
+        :param trust: How much the batch file is trusted, see TrustLevel.
+        :param duplicates: How to resolve duplicate gene symbols in each geneset, see
+        `geneweaver.core.parse.duplicates`. By default duplicates are kept. The
+        duplicates removed are counted in `duplicate_stats`.
+        :param vectorized: Whether to convert each geneset's values to floats in bulk,
+        and return ColumnarBatchUploadGeneset instances. Values are converted the same
+        way at either trust level, as they are not validated one at a time.
+        :param na_values: When vectorized, raw values which mark a missing value (and
+        are converted to NaN), see `geneweaver.core.parse.values.convert_values`.
+        :param symbols: A table to intern gene symbols in, so that identical symbols
+        share one string object, see `geneweaver.core.parse.symbols`. The same table
+        can be passed to several parsers.
+        :param duplicate_stats: Where to count the duplicates removed by the
+        duplicates policy. Defaults to a new DuplicateStats. The same instance can be
+        passed to several parsers.
+        """
+        self.header = {} if header is None else dict(header)
+        self.current_geneset_values = GeneValueColumns() if columnar else []
+        self.read_mode = ReadMode.HEADER
+        self.genesets = []
+        self.closed = False
+        self.line_number = 0
+        self._line_splitter = LineSplitter(encoding)
+        self.duplicates = duplicates
+        self.duplicate_stats = (
+            DuplicateStats() if duplicate_stats is None else duplicate_stats
+        )
+        self.symbols = symbols
+        self.trust = trust
+        self._read_values = (
+            read_trusted_values if trust is TrustLevel.TRUSTED else read_values
+        )
+        if vectorized:
+            self.current_geneset_values = RawGeneValues(na_values)
+            self._read_values = self.read_raw_values
+
+    def feed(self: "BatchParser", chunk: Union[str, bytes]) -> List[BatchUploadGeneset]:
+        """Parse the next chunk of the batch file.
+
+        :param chunk: The next chunk of the batch file, as str or bytes.
+
+        :returns: The genesets completed by this chunk (possibly none).
+
+        :raises ValueError: If the parser has already been closed.
+        """
+        if self.closed:
+            raise ValueError("Cannot feed a closed BatchParser.")
+
+        for line in self._line_splitter.feed(chunk):
+            self.process_line(line)
+
+        return self.pop_genesets()
+
+    def close(self: "BatchParser") -> List[BatchUploadGeneset]:
+        """Finish parsing the batch file, and create the final geneset.
+
+        :returns: Any remaining completed genesets, including the final geneset.
+
+        :raises ValueError: If the parser has already been closed.
+        """
+        if self.closed:
+            raise ValueError("BatchParser is already closed.")
+
+        for line in self._line_splitter.close():
+            self.process_line(line)
+
+        self.closed = True
+        self.genesets.append(
+            create_geneset(self.header, self.current_geneset_values, self.trust)
+        )
+
+        return self.pop_genesets()
+
+    def process_line(self: "BatchParser", line: str) -> None:
+        """Process a single line of the batch file.
+
+        Completed genesets are added to `genesets`, where they are kept until they are
+        retrieved with `pop_genesets`.
+
+        :param line: The line to process, without line terminators.
+        """
+        self.line_number += 1
+        line_kind = classify_line(line)
+
+        if line_kind is LineKind.VALUE:
+            self.current_geneset_values, self.read_mode = self._read_values(
+                line,
+                self.header,
+                self.current_geneset_values,
+                self.read_mode,
+                self.symbols,
             )
 
-        except IgnoreLineError:
-            continue
+        elif line_kind is LineKind.HEADER:
+            (
+                self.genesets,
+                self.current_geneset_values,
+                self.header,
+                self.read_mode,
+            ) = read_header(
+                line,
+                self.header,
+                self.current_geneset_values,
+                self.read_mode,
+                self.genesets,
+                self.trust,
+            )
+
+    def read_raw_values(
+        self: "BatchParser",
+        line: str,
+        header: dict,
+        current_geneset_values: RawGeneValues,
+        read_mode: ReadMode,
+        symbols: Optional[SymbolTable] = None,
+    ) -> Tuple[RawGeneValues, ReadMode]:
+        """Read a value line for vectorized parsing, recording its line number.
+
+        See `read_values`, which this calls to add the raw value.
+
+        :param line: The value line.
+        :param header: A dictionary representing the current header data.
+        :param current_geneset_values: The current geneset's raw values.
+        :param read_mode: A ReadMode enum value representing the current reading mode.
+        :param symbols: A table to intern the gene symbol in, if any.
+
+        :returns: A tuple of the raw values, and the updated reading mode.
+        """
+        current_geneset_values, read_mode = read_values(
+            line, header, current_geneset_values, read_mode, symbols
+        )
+        current_geneset_values.line_numbers.append(self.line_number)
+        return current_geneset_values, read_mode
+
+    @property
+    def duplicates_removed(self: "BatchParser") -> int:
+        """The number of duplicates removed by the duplicates policy so far."""
+        return self.duplicate_stats.removed
+
+    def pop_genesets(self: "BatchParser") -> List[BatchUploadGeneset]:
+        """Return the completed genesets, and remove them from the parser.
+
+        If a duplicates policy was given, it is applied to each geneset here.
+
+        :returns: The genesets completed since the last call.
+
+        :raises DuplicateGeneError: If the duplicates policy is ERROR and a geneset has
+        duplicate gene symbols.
+        """
+        genesets, self.genesets = self.genesets, []
+
+        if self.duplicates is not None:
+            for geneset in genesets:
+                geneset.values, removed = deduplicate_gene_values(
+                    geneset.values, self.duplicates
+                )
+                self.duplicate_stats.add(removed)
+
+        return genesets
+
+
+def classify_line(line: str) -> LineKind:
+    """Classify a line as a header, value or ignored line.
+
+    This makes the same decision as trying `process_header_line` and falling back to
+    `process_value_line`, but uses the LINE_PREFIX_KINDS dispatch table instead of
+    raising and catching exceptions, which is much cheaper for the (very common) value
+    lines. Lines classified as values are not validated, so they may still raise an
+    error when they are processed.
+
+    :param line: The line to classify.
+
+    :returns: The kind of the line.
+    """
+    line = line.strip()
+
+    if not line:
+        return LineKind.IGNORE
 
-    genesets.append(create_geneset(header, current_geneset_values))
+    line_kind = LINE_PREFIX_KINDS.get(line[0], LineKind.VALUE)
 
-    return genesets
+    if line_kind is None:
+        return LineKind.HEADER if line[1:2] in (" ", "\t") else LineKind.VALUE
+
+    return line_kind
 
 
 def read_header(
@@ -199,6 +908,7 @@ def read_header(
     current_geneset_values: list,
     read_mode: ReadMode,
     genesets: List[BatchUploadGeneset],
+    trust: TrustLevel = TrustLevel.UNTRUSTED,
 ) -> Tuple[list[BatchUploadGeneset], list, dict, ReadMode]:
     """Process a header line and update the corresponding state variables accordingly.
 
@@ -214,6 +924,7 @@ def read_header(
     :param current_geneset_values: The list of current geneset values.
     :param read_mode: The current read mode - HEADER or CONTENT.
     :param genesets: The list of already processed genesets.
+    :param trust: How much the batch file is trusted, see `create_geneset`.
 
     :returns: A tuple containing:
          0. the updated list of processed genesets,
@@ -231,7 +942,7 @@ def read_header(
 
     if read_mode is ReadMode.CONTENT:
         genesets, current_geneset_values, header = finalize_processed_geneset(
-            genesets, header, current_geneset_values
+            genesets, header, current_geneset_values, trust
         )
         read_mode = ReadMode.HEADER
 
@@ -240,19 +951,23 @@ def read_header(
 
 
 def finalize_processed_geneset(
-    genesets: List[BatchUploadGeneset], header: dict, current_geneset_values: list
+    genesets: List[BatchUploadGeneset],
+    header: dict,
+    current_geneset_values: list,
+    trust: TrustLevel = TrustLevel.UNTRUSTED,
 ) -> Tuple[List[BatchUploadGeneset], list, dict]:
     """Add the current geneset to the list and prepares for processing the next one.
 
     This function first checks that the header contains all required values. Then, it
     creates a new geneset using the header and the current_geneset_values list and
-    appends it to the genesets list. It also resets the current_geneset_values list and
-    the header for the next geneset.
+    appends it to the genesets list. It also resets the current_geneset_values list (to
+    an empty container of the same kind) and the header for the next geneset.
 
     :param genesets: A list of BatchUploadGeneset instances that have been processed.
     :param header: A dictionary representing the current header data.
     :param current_geneset_values: A list of GenesetValueInput instances representing
     the current geneset values.
+    :param trust: How much the batch file is trusted, see `create_geneset`.
 
     :returns: A tuple containing three elements:
         0. The updated list of BatchUploadGeneset instances.
@@ -263,8 +978,8 @@ def finalize_processed_geneset(
     header before trying to finalize the geneset.
     """
     check_has_required_header_values(header)
-    genesets.append(create_geneset(header, current_geneset_values))
-    return genesets, [], reset_required_header_values(header)
+    genesets.append(create_geneset(header, current_geneset_values, trust))
+    return genesets, current_geneset_values[:0], reset_required_header_values(header)
 
 
 def update_header(key: str, value: str, header: dict) -> dict:
@@ -291,7 +1006,11 @@ def update_header(key: str, value: str, header: dict) -> dict:
 
 
 def read_values(
-    line: str, header: dict, current_geneset_values: list, read_mode: ReadMode
+    line: str,
+    header: dict,
+    current_geneset_values: list,
+    read_mode: ReadMode,
+    symbols: Optional[SymbolTable] = None,
 ) -> Tuple[list, ReadMode]:
     r"""Read a line assuming it's a value, and updates the reading mode if necessary.
 
@@ -299,15 +1018,17 @@ def read_values(
     process_value_line function to parse the line into a symbol-value pair. Then, if the
     current read_mode is HEADER, it checks the header for required values and switches
     the read_mode to CONTENT. Finally, it appends a new GenesetValueInput
-    instance to the current_geneset_values list.
+    instance to the current_geneset_values list, or if current_geneset_values is a
+    GeneValueColumns (or RawGeneValues), it appends the symbol and value to the columns.
 
     :param line: A string representing a line in the 'value' format, e.g.,
     'symbol\tvalue' or 'symbol value'. Will also accept multiple whitespace characters
     between the symbol and value.
     :param header: A dictionary representing the current header data.
-    :param current_geneset_values: A list of GenesetValueInput instances representing
-    the current geneset values.
+    :param current_geneset_values: A list of GenesetValueInput instances (or a
+    GeneValueColumns) representing the current geneset values.
     :param read_mode: A ReadMode enum value representing the current reading mode.
+    :param symbols: A table to intern the gene symbol in, if any.
 
     :returns: A tuple where the first element is the updated list of GenesetValueInput
     instances, and the second element is the updated reading mode.
@@ -318,29 +1039,106 @@ def read_values(
     """
     symbol, value = process_value_line(line)
 
+    if symbols is not None:
+        symbol = symbols.intern(symbol)
+
     if read_mode is ReadMode.HEADER:
         check_has_required_header_values(header)
         read_mode = ReadMode.CONTENT
 
-    current_geneset_values.append(GenesetValueInput(symbol=symbol, value=value))
+    if isinstance(current_geneset_values, (GeneValueColumns, RawGeneValues)):
+        current_geneset_values.append(symbol, value)
+    else:
+        current_geneset_values.append(GenesetValueInput(symbol=symbol, value=value))
+
+    return current_geneset_values, read_mode
+
+
+def read_trusted_values(
+    line: str,
+    header: dict,
+    current_geneset_values: list,
+    read_mode: ReadMode,
+    symbols: Optional[SymbolTable] = None,
+) -> Tuple[list, ReadMode]:
+    """Read a line from a trusted batch file, assuming it's a value.
+
+    This is `read_values` for TrustLevel.TRUSTED. The line is split and its value
+    converted with float() directly, instead of going through `process_value_line` and
+    validating the string value. GenesetValueInput instances are built without
+    validation, see `GeneValue.from_typed`. The required header values are still
+    checked.
+
+    :param line: A string representing a line in the 'value' format.
+    :param header: A dictionary representing the current header data.
+    :param current_geneset_values: A list of GenesetValueInput instances (or a
+    GeneValueColumns) representing the current geneset values.
+    :param read_mode: A ReadMode enum value representing the current reading mode.
+    :param symbols: A table to intern the gene symbol in, if any.
+
+    :returns: A tuple where the first element is the updated list of GenesetValueInput
+    instances, and the second element is the updated reading mode.
+
+    :raises MissingRequiredHeaderError: If any of the required keys are missing in the
+    header when switching from HEADER to CONTENT mode.
+    :raises ValueError: If the line does not split into a symbol and a float value.
+    """
+    symbol, value = line.split()
+
+    # The required header values are checked before the value is converted, as in
+    # `read_values`, so that the same error is raised for the same line.
+    if read_mode is ReadMode.HEADER:
+        check_has_required_header_values(header)
+        read_mode = ReadMode.CONTENT
+
+    value = float(value)
+
+    if symbols is not None:
+        symbol = symbols.intern(symbol)
+
+    if isinstance(current_geneset_values, GeneValueColumns):
+        current_geneset_values.symbols.append(symbol)
+        current_geneset_values.values.append(value)  # noqa: PD011
+    else:
+        current_geneset_values.append(GenesetValueInput.from_typed(symbol, value))
 
     return current_geneset_values, read_mode
 
 
 def create_geneset(
-    header: dict, content: List[GenesetValueInput]
+    header: dict,
+    content: Union[List[GenesetValueInput], GeneValueColumns, RawGeneValues],
+    trust: TrustLevel = TrustLevel.UNTRUSTED,
 ) -> BatchUploadGeneset:
     """Create a Geneset object for batch upload.
 
     This function takes a header and content, and constructs a BatchUploadGeneset object
-    using these inputs.
+    using these inputs. If the content is a GeneValueColumns, a
+    ColumnarBatchUploadGeneset is constructed instead. If the content is a
+    RawGeneValues, its values are first converted to columns in bulk.
 
     :param header: Dictionary containing header information.
-    :param content: List containing content information.
+    :param content: List (or columns) containing content information.
+    :param trust: How much the batch file is trusted, see TrustLevel. For a TRUSTED
+    file, only the header is validated, and the values (which are already typed) are
+    attached to the geneset as they are.
 
     :returns: An object representing the Geneset for batch upload.
+
+    :raises ValueConversionError: If any of the raw values cannot be converted.
     """
-    return BatchUploadGeneset(values=content, **header)
+    if isinstance(content, RawGeneValues):
+        content = content.to_columns()
+
+    if isinstance(content, GeneValueColumns):
+        geneset_class, no_values = ColumnarBatchUploadGeneset, GeneValueColumns()
+    else:
+        geneset_class, no_values = BatchUploadGeneset, []
+
+    if trust is TrustLevel.TRUSTED:
+        geneset = geneset_class(values=no_values, **header)
+        return geneset.model_copy(update={"values": content})
+    return geneset_class(values=content, **header)
 
 
 def reset_required_header_values(header: dict) -> dict:
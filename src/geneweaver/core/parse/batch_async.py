@@ -0,0 +1,54 @@
+"""Parse batch geneset files from asynchronous byte streams.
+
+This module provides an asyncio-native entry point to the batch parser for use in
+ASGI applications, where calling `geneweaver.core.parse.batch.process_lines` on a large
+upload would block the event loop. The upload is consumed chunk by chunk from an async
+iterator (such as a request body stream), and each chunk is parsed and validated by a
+`geneweaver.core.parse.batch.BatchParser` in a worker thread, so other tasks on the
+event loop keep running while large files are parsed.
+
+Async Parsing Function:
+- aparse_batch: Asynchronously iterate over the genesets in a batch file stream.
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from typing import AsyncIterable, AsyncIterator, Optional, Union
+
+from geneweaver.core.parse.batch import BatchParser, BatchUploadGeneset
+
+
+async def aparse_batch(
+    stream: AsyncIterable[Union[bytes, str]],
+    executor: Optional[Executor] = None,
+    encoding: str = "utf-8",
+) -> AsyncIterator[BatchUploadGeneset]:
+    """Asynchronously iterate over the genesets in a batch file stream.
+
+    Each chunk is passed to `BatchParser.feed` in the executor, and the genesets it
+    completes are yielded before the next chunk is read. This means that the (blocking)
+    pydantic validation of each BatchUploadGeneset happens off the event loop, and that
+    at most one chunk and one geneset in progress are held in memory.
+
+    Because the parser is stateful, the executor must run its work in the same process
+    (e.g. a ThreadPoolExecutor). Chunks are never parsed concurrently.
+
+        async for geneset in aparse_batch(request.stream()):
+            ...
+
+    :param stream: An async iterable of chunks of a batch file, as bytes or str.
+    :param executor: The executor to parse chunks in. Defaults to the event loop's
+    default (thread pool) executor.
+    :param encoding: The encoding to use for chunks of bytes.
+
+    :returns: An async iterator over the genesets in the batch file.
+    """
+    loop = asyncio.get_running_loop()
+    parser = BatchParser(encoding=encoding)
+
+    async for chunk in stream:
+        for geneset in await loop.run_in_executor(executor, parser.feed, chunk):
+            yield geneset
+
+    for geneset in await loop.run_in_executor(executor, parser.close):
+        yield geneset
@@ -0,0 +1,197 @@
+"""Incrementally re-parse a batch file as it is edited.
+
+A BatchDocument keeps the contents of a batch file split into geneset blocks (see
+`geneweaver.core.parse.batch.split_geneset_blocks`), along with the header values each
+block inherits and the genesets parsed from it. When part of the document is edited,
+only the blocks around the edit are split and parsed again, followed by any later
+blocks whose inherited header values have changed (e.g. after editing the species of
+the first geneset). The genesets are always the same as parsing the whole document
+with `geneweaver.core.parse.batch.process_lines`.
+
+Incremental Parsing Classes:
+- BatchDocument: A batch file which is re-parsed incrementally as it is edited.
+- DocumentBlock: One geneset block of a BatchDocument.
+
+Header Function:
+- carry_header: Get the header values which a block passes on to the next block.
+"""
+
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List, Optional
+
+from geneweaver.core.parse.batch import (
+    BatchUploadGeneset,
+    LineKind,
+    TrustLevel,
+    classify_line,
+    process_geneset_block,
+    process_header_line,
+    reset_required_header_values,
+    split_geneset_blocks,
+    update_header,
+)
+from geneweaver.core.parse.enum import DuplicatePolicy
+
+
+class DocumentBlock:
+    """One geneset block of a BatchDocument.
+
+    `text` is the exact text of the block, including line terminators. `header` holds
+    the header values it inherits from the blocks before it. Parsing the block gives
+    either its `genesets`, or the `error` raised while parsing it.
+    """
+
+    __slots__ = ("text", "header", "genesets", "error")
+
+    def __init__(self: "DocumentBlock", text: str, header: dict) -> None:
+        """Initialize the block, without parsing it.
+
+        :param text: The text of the block.
+        :param header: The header values inherited from the blocks before it.
+        """
+        self.text = text
+        self.header = header
+        self.genesets: List[BatchUploadGeneset] = []
+        self.error: Optional[Exception] = None
+
+
+class BatchDocument:
+    """A batch file which is re-parsed incrementally as it is edited.
+
+    Edits are given as character offsets into the current contents, as in most text
+    editors. Editing one geneset in a document with thousands of genesets only parses
+    that geneset (and its neighbours) again.
+    """
+
+    def __init__(
+        self: "BatchDocument",
+        contents: str,
+        columnar: bool = False,
+        trust: TrustLevel = TrustLevel.UNTRUSTED,
+        duplicates: Optional[DuplicatePolicy] = None,
+    ) -> None:
+        """Initialize the document, parsing all of its contents.
+
+        :param contents: The contents of the batch file.
+        :param columnar: Whether to collect each geneset's values as compact columns,
+        and return ColumnarBatchUploadGeneset instances.
+        :param trust: How much the batch file is trusted, see TrustLevel.
+        :param duplicates: How to resolve duplicate gene symbols in each geneset, see
+        `geneweaver.core.parse.duplicates`. By default duplicates are kept.
+        """
+        self.columnar = columnar
+        self.trust = trust
+        self.duplicates = duplicates
+        self.blocks = self._split_blocks(contents, {})
+        self._block_starts: List[int] = []
+        self._update_block_starts()
+
+    @property
+    def contents(self: "BatchDocument") -> str:
+        """The current contents of the document."""
+        return "".join(block.text for block in self.blocks)
+
+    @property
+    def genesets(self: "BatchDocument") -> List[BatchUploadGeneset]:
+        """The genesets parsed from the document, as `process_lines` would return.
+
+        :raises Exception: The error `process_lines` would raise, i.e. that of the first
+        block which could not be parsed.
+        """
+        for block in self.blocks:
+            if block.error is not None:
+                raise block.error
+        return [geneset for block in self.blocks for geneset in block.genesets]
+
+    def edit(self: "BatchDocument", start: int, end: int, text: str) -> range:
+        """Replace part of the document, and re-parse the blocks that it affects.
+
+        The blocks containing the edit are split and parsed again along with the blocks
+        either side of them, since an edit can move the boundaries between blocks (e.g.
+        by adding or removing a header line). Each later block is then parsed again
+        only if the header values it inherits have changed.
+
+        :param start: The offset of the first character to replace.
+        :param end: The offset after the last character to replace (equal to start
+        to insert text).
+        :param text: The text to replace the characters with.
+
+        :returns: The indexes of the blocks which were parsed again, after the edit.
+
+        :raises ValueError: If the edit is not within the document.
+        """
+        if not 0 <= start <= end <= self._block_starts[-1]:
+            raise ValueError(f"Edit {start}:{end} is outside of the document.")
+
+        first = max(self._block_index(start) - 1, 0)
+        stop = min(self._block_index(end) + 2, len(self.blocks))
+        offset = self._block_starts[first]
+        old_text = "".join(block.text for block in self.blocks[first:stop])
+        new_text = old_text[: start - offset] + text + old_text[end - offset :]
+
+        new_blocks = self._split_blocks(new_text, self.blocks[first].header)
+        self.blocks[first:stop] = new_blocks
+        stop = first + len(new_blocks)
+
+        # Parse later blocks again until one inherits the same header values as before.
+        header = carry_header(new_blocks[-1])
+        while stop < len(self.blocks) and self.blocks[stop].header != header:
+            block = self.blocks[stop]
+            block.header = header
+            self._parse_block(block)
+            header = carry_header(block)
+            stop += 1
+
+        self._update_block_starts()
+        return range(first, stop)
+
+    def _split_blocks(
+        self: "BatchDocument", text: str, header: dict
+    ) -> List[DocumentBlock]:
+        lines = text.splitlines(keepends=True)
+        blocks = []
+        # split_geneset_blocks only strips the lines it classifies, so each block keeps
+        # its line terminators.
+        for block_header, block_lines in split_geneset_blocks(lines, header):
+            block = DocumentBlock("".join(block_lines), block_header)
+            self._parse_block(block)
+            blocks.append(block)
+        return blocks
+
+    def _parse_block(self: "BatchDocument", block: DocumentBlock) -> None:
+        try:
+            block.genesets = process_geneset_block(
+                block.header,
+                block.text.splitlines(),
+                columnar=self.columnar,
+                trust=self.trust,
+                duplicates=self.duplicates,
+            )
+            block.error = None
+        except Exception as error:  # noqa: BLE001
+            block.genesets, block.error = [], error
+
+    def _block_index(self: "BatchDocument", offset: int) -> int:
+        return max(bisect_right(self._block_starts, offset, hi=len(self.blocks)) - 1, 0)
+
+    def _update_block_starts(self: "BatchDocument") -> None:
+        # The start of each block, followed by the length of the document.
+        self._block_starts = list(
+            accumulate((len(block.text) for block in self.blocks), initial=0)
+        )
+
+
+def carry_header(block: DocumentBlock) -> dict:
+    """Get the header values which a block passes on to the next block.
+
+    :param block: The block.
+
+    :returns: The header values inherited by the next block, as
+    `split_geneset_blocks` resolves them.
+    """
+    header = dict(block.header)
+    for line in block.text.splitlines():
+        if classify_line(line) is LineKind.HEADER:
+            header = update_header(*process_header_line(line), header)
+    return reset_required_header_values(header)
@@ -0,0 +1,291 @@
+"""Index the geneset boundaries in a batch file, for random access to its genesets.
+
+This module provides the BatchFileIndex, which is built with one cheap pass over a
+batch file (only header lines are parsed, and value lines are counted but not
+validated). For each geneset it records the byte offsets of its header and value
+blocks, the number of values, and the fully resolved header values (including those
+inherited from earlier genesets). Any single geneset can then be loaded by seeking
+to its value block and parsing just that block.
+
+The index can be saved as a JSON sidecar file next to the batch file, and is checked
+against the batch file's size and modification time when it is loaded again.
+
+Index Classes:
+- GenesetBlockIndex: The location and resolved header of one geneset in a batch file.
+- BatchFileIndex: An index over every geneset in a batch file.
+
+Index Functions:
+- default_sidecar_path: Get the default sidecar file path for a batch file.
+"""
+
+import codecs
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Type
+
+from geneweaver.core.parse.batch import (
+    BatchUploadGeneset,
+    LineKind,
+    ReadMode,
+    check_has_required_header_values,
+    iter_genesets_from_lines,
+    process_header_line,
+    reset_required_header_values,
+    update_header,
+)
+from geneweaver.core.parse.batch_mmap import classify_byte_line
+from geneweaver.core.parse.utils import iter_byte_line_spans, open_mmap
+from geneweaver.core.types import StringOrPath
+from pydantic import BaseModel
+
+# Bump this if the format of the index changes, so that old sidecar files are rebuilt.
+BATCH_FILE_INDEX_VERSION = 1
+
+SIDECAR_SUFFIX = ".index.json"
+
+
+class GenesetBlockIndex(BaseModel):
+    """The location and resolved header of one geneset in a batch file.
+
+    The header block runs from `header_start` to `value_start`, and the value block
+    from `value_start` to `value_end`. Both may also contain ignored lines.
+    """
+
+    header_start: int
+    value_start: int
+    value_end: int
+    value_count: int
+    header: Dict[str, str]
+
+
+class BatchFileIndex(BaseModel):
+    """An index over every geneset in a batch file."""
+
+    version: int = BATCH_FILE_INDEX_VERSION
+    file_path: Path
+    file_size: int
+    file_mtime_ns: int
+    encoding: str = "utf-8"
+    genesets: List[GenesetBlockIndex]
+
+    @classmethod
+    def build(
+        cls: Type["BatchFileIndex"], file_path: StringOrPath, encoding: str = "utf-8"
+    ) -> "BatchFileIndex":
+        """Build an index with a single pass over a batch file.
+
+        Header lines are parsed and carried over between genesets exactly as in
+        `geneweaver.core.parse.batch.process_lines`. Value lines are only counted.
+
+        :param file_path: Path to the batch file.
+        :param encoding: The encoding of the batch file.
+
+        :returns: The index of the batch file.
+
+        :raises MissingRequiredHeaderError: If a geneset's values start before all of
+        its required header values have been given.
+        """
+        file_stat = os.stat(file_path)
+        genesets = []
+        header, read_mode = {}, ReadMode.HEADER
+        header_start, value_start, value_count = 0, 0, 0
+
+        with open_mmap(file_path) as buffer:
+            for start, end, next_start in iter_byte_line_spans(buffer):
+                line = buffer[start:end]
+                line_kind = classify_byte_line(line)
+
+                if line_kind is LineKind.HEADER:
+                    if read_mode is ReadMode.CONTENT:
+                        genesets.append(
+                            GenesetBlockIndex(
+                                header_start=header_start,
+                                value_start=value_start,
+                                value_end=start,
+                                value_count=value_count,
+                                header=dict(header),
+                            )
+                        )
+                        header = reset_required_header_values(header)
+                        header_start, value_count = start, 0
+                        read_mode = ReadMode.HEADER
+
+                    key, value = process_header_line(line.decode(encoding))
+                    header = update_header(key, value, header)
+                    value_start = next_start
+
+                elif line_kind is LineKind.VALUE:
+                    if read_mode is ReadMode.HEADER:
+                        check_has_required_header_values(header)
+                        value_start, read_mode = start, ReadMode.CONTENT
+                    value_count += 1
+
+            value_end = len(buffer)
+
+        genesets.append(
+            GenesetBlockIndex(
+                header_start=header_start,
+                value_start=value_start,
+                value_end=value_end,
+                value_count=value_count,
+                header=dict(header),
+            )
+        )
+
+        return cls(
+            file_path=Path(file_path),
+            file_size=file_stat.st_size,
+            file_mtime_ns=file_stat.st_mtime_ns,
+            encoding=encoding,
+            genesets=genesets,
+        )
+
+    @classmethod
+    def load(
+        cls: Type["BatchFileIndex"],
+        file_path: StringOrPath,
+        sidecar_path: Optional[StringOrPath] = None,
+        encoding: Optional[str] = None,
+    ) -> "BatchFileIndex":
+        """Load a saved index for a batch file.
+
+        :param file_path: Path to the batch file.
+        :param sidecar_path: Path to the saved index. Defaults to
+        `default_sidecar_path(file_path)`.
+        :param encoding: The encoding of the batch file, if known. An index built with
+        a different encoding is out of date.
+
+        :returns: The index of the batch file.
+
+        :raises FileNotFoundError: If there is no saved index.
+        :raises ValueError: If the saved index is out of date, was built with a
+        different encoding, or was saved by an incompatible version.
+        """
+        sidecar_path = sidecar_path or default_sidecar_path(file_path)
+        index = cls.model_validate_json(Path(sidecar_path).read_text())
+        index.file_path = Path(file_path)
+
+        if index.version != BATCH_FILE_INDEX_VERSION or not index.is_current():
+            raise ValueError(f"Index {sidecar_path} is out of date.")
+
+        if encoding is not None and (
+            codecs.lookup(encoding).name != codecs.lookup(index.encoding).name
+        ):
+            raise ValueError(
+                f"Index {sidecar_path} was built with encoding {index.encoding}, "
+                f"not {encoding}."
+            )
+
+        return index
+
+    @classmethod
+    def load_or_build(
+        cls: Type["BatchFileIndex"],
+        file_path: StringOrPath,
+        sidecar_path: Optional[StringOrPath] = None,
+        save: bool = True,
+        encoding: str = "utf-8",
+    ) -> "BatchFileIndex":
+        """Load a saved index for a batch file, or build it if needed.
+
+        :param file_path: Path to the batch file.
+        :param sidecar_path: Path to the saved index. Defaults to
+        `default_sidecar_path(file_path)`.
+        :param save: Whether to save the index if it had to be built.
+        :param encoding: The encoding of the batch file. A saved index built with a
+        different encoding is rebuilt.
+
+        :returns: The index of the batch file.
+        """
+        try:
+            return cls.load(file_path, sidecar_path, encoding)
+        except (FileNotFoundError, ValueError):
+            index = cls.build(file_path, encoding)
+            if save:
+                index.save(sidecar_path)
+            return index
+
+    def save(
+        self: "BatchFileIndex", sidecar_path: Optional[StringOrPath] = None
+    ) -> Path:
+        """Save the index as a JSON sidecar file.
+
+        :param sidecar_path: Path to save the index to. Defaults to
+        `default_sidecar_path(self.file_path)`.
+
+        :returns: The path the index was saved to.
+        """
+        sidecar_path = Path(sidecar_path or default_sidecar_path(self.file_path))
+        sidecar_path.write_text(self.model_dump_json())
+        return sidecar_path
+
+    def is_current(self: "BatchFileIndex") -> bool:
+        """Check that the batch file has not changed since it was indexed.
+
+        :returns: True if the batch file's size and modification time are unchanged.
+        """
+        try:
+            file_stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            return False
+        return (file_stat.st_size, file_stat.st_mtime_ns) == (
+            self.file_size,
+            self.file_mtime_ns,
+        )
+
+    def __len__(self: "BatchFileIndex") -> int:
+        """Return the number of genesets in the batch file."""
+        return len(self.genesets)
+
+    @property
+    def total_value_count(self: "BatchFileIndex") -> int:
+        """The total number of values over all genesets in the batch file."""
+        return sum(geneset.value_count for geneset in self.genesets)
+
+    def get_geneset(self: "BatchFileIndex", idx: int) -> BatchUploadGeneset:
+        """Load a single geneset from the batch file.
+
+        Only the geneset's value block is read and parsed, using its resolved header.
+
+        :param idx: The index of the geneset in the batch file (negative indexes count
+        from the end).
+
+        :returns: The geneset.
+
+        :raises IndexError: If there is no geneset at the index.
+        """
+        block = self.genesets[idx]
+
+        with open(self.file_path, "rb") as f:
+            f.seek(block.value_start)
+            contents = f.read(block.value_end - block.value_start)
+
+        lines = contents.decode(self.encoding).splitlines()
+        return next(iter_genesets_from_lines(lines, header=dict(block.header)))
+
+    def get_genesets(
+        self: "BatchFileIndex", start: int = 0, stop: Optional[int] = None
+    ) -> List[BatchUploadGeneset]:
+        """Load a page of genesets from the batch file.
+
+        :param start: The index of the first geneset to load.
+        :param stop: The index after the last geneset to load. Defaults to the end of
+        the file.
+
+        :returns: The genesets from start up to (but not including) stop.
+        """
+        return [
+            self.get_geneset(idx)
+            for idx in range(*slice(start, stop).indices(len(self.genesets)))
+        ]
+
+
+def default_sidecar_path(file_path: StringOrPath) -> Path:
+    """Get the default sidecar file path for a batch file's index.
+
+    :param file_path: Path to the batch file.
+
+    :returns: The path of the batch file, with SIDECAR_SUFFIX appended.
+    """
+    file_path = Path(file_path)
+    return file_path.with_name(file_path.name + SIDECAR_SUFFIX)
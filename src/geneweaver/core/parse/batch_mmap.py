@@ -0,0 +1,174 @@
+r"""Parse batch geneset files from disk using a memory-mapped, bytes-level reader.
+
+This module provides an alternative entry point to `geneweaver.core.parse.batch` for
+very large batch files on local disk. Rather than reading the whole file into a string
+and splitting it into lines, the file is memory-mapped and line boundaries are found on
+the raw bytes. Header lines and gene symbols are the only parts of the file which are
+decoded, and values are converted to floats straight from the byte slices.
+
+The header state machine is shared with `geneweaver.core.parse.batch`, so the
+genesets produced are the same as `process_lines` would produce for the decoded file.
+Unlike `str.splitlines`, lines are only split on "\n", "\r" and "\r\n", and
+whitespace is ASCII whitespace.
+
+File Processing Functions:
+- process_batch_file: Process a batch file on disk into a list of BatchUploadGeneset.
+- iter_batch_file_genesets: Lazily parse a batch file on disk, yielding each
+BatchUploadGeneset as soon as it is complete.
+- iter_genesets_from_byte_lines: Lazily build BatchUploadGeneset instances from an
+iterable of byte lines.
+
+Line Processing Functions:
+- classify_byte_line: Classify a line of bytes as a header, value or ignored line.
+- process_byte_value_line: Process a value line of bytes into a symbol-value pair.
+"""
+
+from typing import Iterable, Iterator, List, Tuple, Union
+
+from geneweaver.core.parse.batch import (
+    LINE_PREFIX_KINDS,
+    BatchUploadGeneset,
+    GenesetValueInput,
+    LineKind,
+    ReadMode,
+    check_has_required_header_values,
+    create_geneset,
+    read_header,
+)
+from geneweaver.core.parse.exceptions import InvalidBatchValueLineError
+from geneweaver.core.parse.utils import iter_byte_lines, open_mmap
+from geneweaver.core.types import StringOrPath
+
+# The LINE_PREFIX_KINDS dispatch table, keyed by byte value instead of character.
+BYTE_PREFIX_KINDS = {ord(char): kind for char, kind in LINE_PREFIX_KINDS.items()}
+
+
+def process_batch_file(
+    file_path: StringOrPath, encoding: str = "utf-8"
+) -> List[BatchUploadGeneset]:
+    """Process a batch file on disk into a list of BatchUploadGeneset.
+
+    :param file_path: Path to the batch file.
+    :param encoding: The encoding used to decode header values and gene symbols.
+
+    :returns: A list of genesets created from the processed batch file.
+    """
+    return list(iter_batch_file_genesets(file_path, encoding))
+
+
+def iter_batch_file_genesets(
+    file_path: StringOrPath, encoding: str = "utf-8"
+) -> Iterator[BatchUploadGeneset]:
+    """Lazily parse a batch file on disk by memory-mapping it.
+
+    The file stays mapped (and open) until the iterator is exhausted or closed.
+
+    :param file_path: Path to the batch file.
+    :param encoding: The encoding used to decode header values and gene symbols.
+
+    :returns: An iterator over the genesets in the batch file.
+    """
+    with open_mmap(file_path) as buffer:
+        lines = iter_byte_lines(buffer)
+        try:
+            yield from iter_genesets_from_byte_lines(lines, encoding)
+        finally:
+            # The line iterator holds a reference to the buffer, which must be
+            # released before the buffer can be closed.
+            lines.close()
+
+
+def iter_genesets_from_byte_lines(
+    lines: Iterable[bytes], encoding: str = "utf-8"
+) -> Iterator[BatchUploadGeneset]:
+    """Lazily build BatchUploadGeneset instances from an iterable of byte lines.
+
+    This is the bytes-level equivalent of
+    `geneweaver.core.parse.batch.iter_genesets_from_lines`. Header lines are decoded
+    and handled by `read_header`, while value lines are split and converted without
+    being decoded as a whole.
+
+    :param lines: An iterable of lines from a batch file, without line terminators.
+    :param encoding: The encoding used to decode header values and gene symbols.
+
+    :returns: An iterator over the genesets created from the lines.
+    """
+    genesets, header, current_geneset_values, read_mode = [], {}, [], ReadMode.HEADER
+
+    for line in lines:
+        line_kind = classify_byte_line(line)
+
+        if line_kind is LineKind.VALUE:
+            symbol, value = process_byte_value_line(line, encoding)
+
+            if read_mode is ReadMode.HEADER:
+                check_has_required_header_values(header)
+                read_mode = ReadMode.CONTENT
+
+            current_geneset_values.append(GenesetValueInput(symbol=symbol, value=value))
+
+        elif line_kind is LineKind.HEADER:
+            genesets, current_geneset_values, header, read_mode = read_header(
+                line.decode(encoding),
+                header,
+                current_geneset_values,
+                read_mode,
+                genesets,
+            )
+            if genesets:
+                yield from genesets
+                genesets = []
+
+    yield create_geneset(header, current_geneset_values)
+
+
+def classify_byte_line(line: bytes) -> LineKind:
+    """Classify a line of bytes as a header, value or ignored line.
+
+    This is the bytes-level equivalent of `geneweaver.core.parse.batch.classify_line`.
+
+    :param line: The line to classify.
+
+    :returns: The kind of the line.
+    """
+    line = line.strip()
+
+    if not line:
+        return LineKind.IGNORE
+
+    line_kind = BYTE_PREFIX_KINDS.get(line[0], LineKind.VALUE)
+
+    if line_kind is None:
+        return LineKind.HEADER if line[1:2] in (b" ", b"\t") else LineKind.VALUE
+
+    return line_kind
+
+
+def process_byte_value_line(
+    line: bytes, encoding: str = "utf-8"
+) -> Tuple[str, Union[float, str]]:
+    """Process a value line of bytes into a symbol-value pair.
+
+    Only the symbol is decoded. The value is converted to a float straight from the
+    bytes; if that fails, it is decoded and returned as a string so that
+    GenesetValueInput reports the same validation error as it would for a text line.
+
+    :param line: The line to process.
+    :param encoding: The encoding used to decode the gene symbol.
+
+    :returns: The first value is the gene symbol, the second is the value.
+
+    :raises InvalidBatchValueLineError: If the line does not split into exactly two
+    parts.
+    """
+    split_line = line.split()
+
+    if len(split_line) != 2:
+        raise InvalidBatchValueLineError()
+
+    try:
+        value = float(split_line[1])
+    except ValueError:
+        value = split_line[1].decode(encoding)
+
+    return split_line[0].decode(encoding), value
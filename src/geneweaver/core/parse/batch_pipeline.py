@@ -0,0 +1,385 @@
+"""Parse batch files in a pipeline of concurrent stages, connected by bounded queues.
+
+Ingesting a batch file involves reading it, tokenizing its lines into geneset blocks,
+validating each geneset, and finally consuming it (e.g. writing it to a database). The
+functions in this module run each of these as a separate stage, so that I/O,
+validation and consumption overlap instead of running one after another:
+
+    read (thread) -> tokenize (thread) -> validate (thread or executor) -> consume
+
+Stages are connected by queues of at most `max_queue_size` items. When a later stage
+(e.g. a slow database writer) falls behind, the queues fill up and the earlier stages
+wait, so memory use is bounded by the queue sizes rather than the size of the file.
+
+The genesets, and any error raised, are the same as `process_lines`, in the same
+order. If any stage fails, or the consumer stops early, every stage is stopped before
+returning.
+
+Pipeline Functions:
+- iter_pipeline_genesets: Lazily parse a batch file stream in a pipeline of stages.
+- run_batch_pipeline: Parse a batch file stream in a pipeline, passing each geneset to
+a consumer.
+
+Stage Functions:
+- read_stage: Read chunks from a stream.
+- tokenize_stage: Split chunks into lines, and lines into geneset blocks.
+- validate_stage: Validate geneset blocks into BatchUploadGeneset instances.
+- validate_in_executor: Validate geneset blocks in an executor, in parallel.
+- run_stage: Run a stage, then signal the end of its output (or its error).
+
+Queue Functions:
+- put_item: Put an item in a queue, unless the pipeline is stopped.
+- put_result: Wait for a block to be validated, and put its genesets in a queue.
+- iter_queue: Iterate over the items in a queue, until the end of a stage's output.
+"""
+
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future
+from contextlib import closing
+from functools import partial
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Deque,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Union,
+)
+
+from geneweaver.core.parse.batch import (
+    BatchUploadGeneset,
+    TrustLevel,
+    process_geneset_block,
+    split_geneset_blocks,
+)
+from geneweaver.core.parse.enum import DuplicatePolicy
+from geneweaver.core.parse.exceptions import PipelineStoppedError
+from geneweaver.core.parse.utils import (
+    DEFAULT_CHUNK_SIZE,
+    LineSplitter,
+    is_binary_stream,
+    open_decompressed_stream,
+)
+
+DEFAULT_MAX_QUEUE_SIZE = 8
+
+# How often (in seconds) a stage waiting on a full or empty queue checks whether the
+# pipeline has been stopped.
+POLL_INTERVAL = 0.05
+
+# Marks the end of a stage's output.
+END_OF_STAGE = object()
+
+
+class StageError:
+    """An error raised in a stage, passed downstream in place of its output."""
+
+    def __init__(self: "StageError", error: BaseException) -> None:
+        """Initialize the stage error.
+
+        :param error: The error raised in the stage.
+        """
+        self.error = error
+
+
+def iter_pipeline_genesets(
+    stream: Union[TextIO, BinaryIO],
+    max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+    executor: Optional[Executor] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    encoding: str = "utf-8",
+    columnar: bool = False,
+    trust: TrustLevel = TrustLevel.UNTRUSTED,
+    duplicates: Optional[DuplicatePolicy] = None,
+) -> Iterator[BatchUploadGeneset]:
+    """Lazily parse a batch file stream in a pipeline of concurrent stages.
+
+    Reading, tokenizing and validating run in background threads, while the caller
+    consumes the genesets. If the caller stops iterating early (or the iterator is
+    closed), the background stages are stopped.
+
+    Validation is done in a thread by default. Passing a ProcessPoolExecutor as the
+    executor validates up to `max_queue_size` genesets in parallel, in separate
+    processes, which is faster for files with many genesets on machines with several
+    cores. The validated genesets are pickled back to this process, so it is best
+    combined with `columnar=True`, as lists of GeneValue are slow to pickle.
+
+    :param stream: A readable text or binary file-like object containing a batch file.
+    Binary streams are decoded, after being decompressed if they are compressed (see
+    `geneweaver.core.parse.utils.open_decompressed_stream`).
+    :param max_queue_size: The maximum number of items (chunks, geneset blocks or
+    genesets) held between each pair of stages, and validated at once by an executor.
+    :param executor: An executor to validate genesets in. Defaults to validating them
+    one at a time, in a background thread.
+    :param chunk_size: The number of characters (or bytes) to read at a time.
+    :param encoding: The encoding to use when the stream returns bytes.
+    :param columnar: Whether to collect each geneset's values as compact columns, and
+    yield ColumnarBatchUploadGeneset instances.
+    :param trust: How much the batch file is trusted, see TrustLevel.
+    :param duplicates: How to resolve duplicate gene symbols in each geneset, see
+    `geneweaver.core.parse.duplicates`. By default duplicates are kept.
+
+    :returns: An iterator over the genesets in the batch file.
+    """
+    if is_binary_stream(stream):
+        stream = open_decompressed_stream(stream)
+
+    validate = partial(
+        process_geneset_block, columnar=columnar, trust=trust, duplicates=duplicates
+    )
+    stop = threading.Event()
+    chunks, blocks, genesets = (queue.Queue(max_queue_size) for _ in range(3))
+
+    threads = [
+        threading.Thread(
+            target=run_stage, args=(stage, output, stop, *args), daemon=True
+        )
+        for stage, output, args in (
+            (read_stage, chunks, (stream, chunk_size)),
+            (tokenize_stage, blocks, (chunks, encoding)),
+            (validate_stage, genesets, (blocks, validate, executor, max_queue_size)),
+        )
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        yield from iter_queue(genesets, stop)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+def run_batch_pipeline(
+    stream: Union[TextIO, BinaryIO],
+    consume: Callable[[BatchUploadGeneset], Any],
+    **options: Any,  # noqa: ANN401
+) -> int:
+    """Parse a batch file stream in a pipeline, passing each geneset to a consumer.
+
+    The consumer is called on the calling thread, while the next genesets are read and
+    validated in the background. If the consumer raises, the pipeline is stopped and
+    the error is raised.
+
+        with open("batch.gw", "rb") as f:
+            run_batch_pipeline(f, db_writer.insert_geneset)
+
+    :param stream: A readable text or binary file-like object containing a batch file.
+    :param consume: A function called with each geneset, in file order.
+    :param options: Options for `iter_pipeline_genesets`.
+
+    :returns: The number of genesets consumed.
+    """
+    count = 0
+    with closing(iter_pipeline_genesets(stream, **options)) as genesets:
+        for geneset in genesets:
+            consume(geneset)
+            count += 1
+    return count
+
+
+def read_stage(
+    output: queue.Queue,
+    stop: threading.Event,
+    stream: Union[TextIO, BinaryIO],
+    chunk_size: int,
+) -> None:
+    """Read chunks from a stream.
+
+    :param output: The queue to put chunks in.
+    :param stop: Set when the pipeline has been stopped.
+    :param stream: A readable text or binary file-like object.
+    :param chunk_size: The number of characters (or bytes) to read at a time.
+    """
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        put_item(output, chunk, stop)
+
+
+def tokenize_stage(
+    output: queue.Queue, stop: threading.Event, chunks: queue.Queue, encoding: str
+) -> None:
+    """Split chunks into lines, and lines into geneset blocks.
+
+    See `geneweaver.core.parse.batch.split_geneset_blocks`.
+
+    :param output: The queue to put (inherited header, block lines) tuples in.
+    :param stop: Set when the pipeline has been stopped.
+    :param chunks: The queue to get chunks of text or bytes from.
+    :param encoding: The encoding to use for chunks of bytes.
+    """
+    line_splitter = LineSplitter(encoding)
+
+    def iter_stream_lines() -> Iterator[str]:
+        for chunk in iter_queue(chunks, stop):
+            yield from line_splitter.feed(chunk)
+        yield from line_splitter.close()
+
+    for block in split_geneset_blocks(iter_stream_lines()):
+        put_item(output, block, stop)
+
+
+def validate_stage(
+    output: queue.Queue,
+    stop: threading.Event,
+    blocks: queue.Queue,
+    validate: Callable[[dict, List[str]], List[BatchUploadGeneset]],
+    executor: Optional[Executor],
+    max_in_flight: int,
+) -> None:
+    """Validate geneset blocks into BatchUploadGeneset instances.
+
+    With an executor, up to `max_in_flight` blocks are validated at once, and their
+    genesets are put in the output queue in file order. If an earlier stage fails, the
+    blocks already submitted are finished first, so that the first error in the file
+    is the one raised.
+
+    :param output: The queue to put genesets in.
+    :param stop: Set when the pipeline has been stopped.
+    :param blocks: The queue to get (inherited header, block lines) tuples from.
+    :param validate: A function which validates a block into genesets.
+    :param executor: The executor to validate blocks in, or None to validate them in
+    this thread.
+    :param max_in_flight: The maximum number of blocks submitted to the executor at a
+    time.
+    """
+    if executor is not None:
+        validate_in_executor(output, stop, blocks, validate, executor, max_in_flight)
+        return
+
+    for header, lines in iter_queue(blocks, stop):
+        for geneset in validate(header, lines):
+            put_item(output, geneset, stop)
+
+
+def validate_in_executor(
+    output: queue.Queue,
+    stop: threading.Event,
+    blocks: queue.Queue,
+    validate: Callable[[dict, List[str]], List[BatchUploadGeneset]],
+    executor: Executor,
+    max_in_flight: int,
+) -> None:
+    """Validate geneset blocks in an executor, see `validate_stage`.
+
+    :param output: The queue to put genesets in.
+    :param stop: Set when the pipeline has been stopped.
+    :param blocks: The queue to get (inherited header, block lines) tuples from.
+    :param validate: A function which validates a block into genesets.
+    :param executor: The executor to validate blocks in.
+    :param max_in_flight: The maximum number of blocks submitted at a time.
+    """
+    pending: Deque[Future] = deque()
+    try:
+        try:
+            for header, lines in iter_queue(blocks, stop):
+                pending.append(executor.submit(validate, header, lines))
+                if len(pending) >= max_in_flight:
+                    put_result(output, pending.popleft(), stop)
+        except PipelineStoppedError:
+            raise
+        except Exception:
+            while pending:
+                put_result(output, pending.popleft(), stop)
+            raise
+
+        while pending:
+            put_result(output, pending.popleft(), stop)
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def put_result(output: queue.Queue, future: Future, stop: threading.Event) -> None:
+    """Wait for a block to be validated, and put its genesets in a queue.
+
+    :param output: The queue to put genesets in.
+    :param future: The future result of validating the block.
+    :param stop: Set when the pipeline has been stopped.
+
+    :raises PipelineStoppedError: If the pipeline is stopped.
+    :raises Exception: Any error raised while validating the block.
+    """
+    for geneset in future.result():
+        put_item(output, geneset, stop)
+
+
+def run_stage(
+    stage: Callable[..., None],
+    output: queue.Queue,
+    stop: threading.Event,
+    *args: Any,  # noqa: ANN401
+) -> None:
+    """Run a stage, then signal the end of its output (or its error) downstream.
+
+    :param stage: The stage function, called with the output queue, the stop event and
+    args.
+    :param output: The stage's output queue.
+    :param stop: Set when the pipeline has been stopped.
+    :param args: Other arguments for the stage function.
+    """
+    try:
+        try:
+            stage(output, stop, *args)
+        except PipelineStoppedError:
+            return
+        except BaseException as e:
+            put_item(output, StageError(e), stop)
+            return
+        put_item(output, END_OF_STAGE, stop)
+    except PipelineStoppedError:
+        pass
+
+
+def put_item(
+    output: queue.Queue, item: Any, stop: threading.Event  # noqa: ANN401
+) -> None:
+    """Put an item in a queue, waiting while it is full, unless the pipeline is stopped.
+
+    :param output: The queue.
+    :param item: The item to put in the queue.
+    :param stop: Set when the pipeline has been stopped.
+
+    :raises PipelineStoppedError: If the pipeline is stopped.
+    """
+    while not stop.is_set():
+        try:
+            output.put(item, timeout=POLL_INTERVAL)
+            return
+        except queue.Full:
+            continue
+    raise PipelineStoppedError()
+
+
+def iter_queue(source: queue.Queue, stop: threading.Event) -> Iterator[Any]:
+    """Iterate over the items in a queue, until the end of a stage's output.
+
+    :param source: The queue.
+    :param stop: Set when the pipeline has been stopped.
+
+    :returns: An iterator over the items put in the queue by a stage.
+
+    :raises PipelineStoppedError: If the pipeline is stopped.
+    :raises BaseException: Any error raised in the stage (or an earlier stage).
+    """
+    while True:
+        try:
+            item = source.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            if stop.is_set():
+                raise PipelineStoppedError() from None
+            continue
+
+        if item is END_OF_STAGE:
+            return
+        if isinstance(item, StageError):
+            raise item.error
+        yield item
@@ -0,0 +1,292 @@
+"""Parse the contents of a batch file with whole-buffer regular expressions.
+
+This is the REGEX engine for `geneweaver.core.parse.batch.process_lines` (selected with
+`engine=BatchEngine.REGEX`). Instead of classifying every line in a Python loop, a
+compiled regular expression finds the header, comment and blank lines in the whole
+buffer with `finditer`. The lines between them are blocks of value lines, each of
+which is split and converted in bulk.
+
+Header lines are still processed one at a time by a
+`geneweaver.core.parse.batch.BatchParser`, so header values, required header checks
+and geneset validation are exactly as in the LINES engine. If a value block is not
+simple enough to be read in bulk, or any of its values are invalid, its lines are
+passed to the BatchParser one at a time instead, so that the same error is raised
+for the same line as with the LINES engine.
+
+Most of the time saved is in building each geneset's values, so the REGEX engine is
+fastest with columnar (or vectorized) output. With the default output, creating a
+GenesetValueInput for every value still dominates.
+
+Regex Engine Functions:
+- process_lines_regex: Process the contents of a batch file with the REGEX engine.
+- iter_genesets_regex: Lazily build BatchUploadGeneset instances from the contents of
+a batch file with the REGEX engine.
+- read_value_block: Read a block of value lines into a BatchParser in bulk.
+- split_value_block: Split a block of value lines into gene symbols and raw values.
+- extend_values: Convert the raw values of a block, and add them to the current
+geneset's values.
+"""
+
+import re
+from array import array
+from typing import Iterator, List, Optional, Tuple, Union
+
+from geneweaver.core.parse.batch import (
+    HEADER_CHARACTERS,
+    IGNORE_CHARACTERS,
+    SPACE_SEPARATED_HEADER_CHARACTERS,
+    BatchParser,
+    BatchUploadGeneset,
+    GenesetValueInput,
+    LineKind,
+    ReadMode,
+    TrustLevel,
+    check_has_required_header_values,
+    classify_line,
+    iter_genesets_from_lines,
+)
+from geneweaver.core.parse.duplicates import DuplicateStats
+from geneweaver.core.parse.enum import DuplicatePolicy
+from geneweaver.core.parse.symbols import SymbolTable
+from geneweaver.core.parse.utils import LINE_BOUNDARIES
+from geneweaver.core.parse.values import RawGeneValues, convert_value
+from geneweaver.core.schema.gene import GeneValueColumns
+
+# The start of a line which might not be a value line: a header or ignored line (after
+# stripping whitespace, as in `classify_line`), or a blank line. Space separated header
+# characters are only headers if they are followed by a space or tab. Each candidate
+# is classified with `classify_line`, but value lines are rarely candidates.
+NON_VALUE_LINE_CANDIDATE_PATTERN = re.compile(
+    r"\n(?=[^\S\n]*(?:[{prefixes}\n]|[{spaced_prefixes}][ \t]|\Z))".format(
+        prefixes=re.escape("".join(HEADER_CHARACTERS) + "".join(IGNORE_CHARACTERS)),
+        spaced_prefixes=re.escape("".join(SPACE_SEPARATED_HEADER_CHARACTERS)),
+    )
+)
+
+# A block of value lines, each of which has exactly two whitespace separated fields.
+VALUE_BLOCK_PATTERN = re.compile(
+    r"(?:[^\S\n]*\S+[^\S\n]+\S+[^\S\n]*(?:\n|\Z))*", re.MULTILINE
+)
+
+# Every byte except ASCII whitespace, to be deleted with bytes.translate.
+NON_WHITESPACE_BYTES = bytes(byte for byte in range(256) if not chr(byte).isspace())
+
+# Line boundaries which `str.splitlines` recognises, other than "\n" and "\r". The
+# REGEX engine only handles "\n", "\r\n" and "\r", so contents with any of these are
+# parsed with the LINES engine.
+OTHER_LINE_BOUNDARIES = tuple(sorted(LINE_BOUNDARIES - {"\n", "\r"}))
+
+
+def process_lines_regex(
+    contents: str,
+    columnar: bool = False,
+    trust: TrustLevel = TrustLevel.UNTRUSTED,
+    duplicates: Optional[DuplicatePolicy] = None,
+    vectorized: bool = False,
+    symbols: Optional[SymbolTable] = None,
+    duplicate_stats: Optional[DuplicateStats] = None,
+) -> List[BatchUploadGeneset]:
+    """Process the contents of a batch file with the REGEX engine.
+
+    The result (and any error raised) is the same as
+    `geneweaver.core.parse.batch.process_lines`, see there for the options.
+
+    :param contents: The contents of the batch file to be processed.
+    :param columnar: Whether to return ColumnarBatchUploadGeneset instances.
+    :param trust: How much the batch file is trusted, see TrustLevel.
+    :param duplicates: How to resolve duplicate gene symbols in each geneset.
+    :param vectorized: Whether to convert each geneset's values to floats in bulk.
+    :param symbols: A table to intern gene symbols in.
+    :param duplicate_stats: Where to count the duplicates removed.
+
+    :returns: A list of genesets created from the processed batch file.
+    """
+    return list(
+        iter_genesets_regex(
+            contents,
+            columnar=columnar,
+            trust=trust,
+            duplicates=duplicates,
+            vectorized=vectorized,
+            symbols=symbols,
+            duplicate_stats=duplicate_stats,
+        )
+    )
+
+
+def iter_genesets_regex(
+    contents: str,
+    header: Optional[dict] = None,
+    trust: TrustLevel = TrustLevel.UNTRUSTED,
+    **options,  # noqa: ANN003
+) -> Iterator[BatchUploadGeneset]:
+    """Lazily build BatchUploadGeneset instances from the contents of a batch file.
+
+    :param contents: The contents of the batch file.
+    :param header: The header values to start with, see `iter_genesets_from_lines`.
+    :param trust: How much the batch file is trusted, see TrustLevel.
+    :param options: Other options for the BatchParser (columnar, duplicates,
+    vectorized, symbols and duplicate_stats).
+
+    :returns: An iterator over the genesets created from the contents.
+    """
+    if any(boundary in contents for boundary in OTHER_LINE_BOUNDARIES):
+        yield from iter_genesets_from_lines(
+            contents.splitlines(), header=header, trust=trust, **options
+        )
+        return
+
+    if "\r" in contents:
+        contents = contents.replace("\r\n", "\n").replace("\r", "\n")
+
+    # Every line, including the first, starts after a "\n".
+    contents = "\n" + contents
+    parser = BatchParser(header=header, trust=trust, **options)
+    position, line_number = 1, 1
+
+    for match in NON_VALUE_LINE_CANDIDATE_PATTERN.finditer(contents):
+        start = match.end()
+        end = contents.find("\n", start)
+        end = len(contents) if end == -1 else end
+        line = contents[start:end]
+        if classify_line(line) is LineKind.VALUE:
+            continue
+
+        if start > position:
+            # The value lines between the previous non-value line and this one.
+            block = contents[position : start - 1]
+            read_value_block(parser, block, line_number, trust)
+            line_number += block.count("\n") + 1
+
+        parser.line_number = line_number - 1
+        parser.process_line(line)
+        if parser.genesets:
+            yield from parser.pop_genesets()
+
+        position, line_number = end + 1, line_number + 1
+
+    if position < len(contents):
+        read_value_block(parser, contents[position:], line_number, trust)
+
+    yield from parser.close()
+
+
+def read_value_block(
+    parser: BatchParser, block: str, first_line_number: int, trust: TrustLevel
+) -> None:
+    r"""Read a block of value lines into a BatchParser in bulk.
+
+    If the block cannot be read in bulk (see `split_value_block` and
+    `extend_values`), each of its lines is processed by the parser instead, which
+    raises the same error for the same line as the LINES engine.
+
+    :param parser: The parser.
+    :param block: The value lines, separated by "\n".
+    :param first_line_number: The line number of the first line in the block.
+    :param trust: How much the batch file is trusted, see TrustLevel.
+    """
+    split_block = split_value_block(block)
+
+    if split_block is not None:
+        gene_symbols, raw_values = split_block
+
+        if parser.read_mode is ReadMode.HEADER:
+            check_has_required_header_values(parser.header)
+            parser.read_mode = ReadMode.CONTENT
+
+        if parser.symbols is not None:
+            gene_symbols = list(map(parser.symbols.intern, gene_symbols))
+
+        if extend_values(
+            parser.current_geneset_values, gene_symbols, raw_values, trust
+        ):
+            if isinstance(parser.current_geneset_values, RawGeneValues):
+                parser.current_geneset_values.line_numbers.extend(
+                    range(first_line_number, first_line_number + len(gene_symbols))
+                )
+            parser.line_number = first_line_number + len(gene_symbols) - 1
+            return
+
+    parser.line_number = first_line_number - 1
+    for line in block.split("\n"):
+        parser.process_line(line)
+
+
+def split_value_block(block: str) -> Optional[Tuple[List[str], List[str]]]:
+    r"""Split a block of value lines into gene symbols and raw values.
+
+    :param block: The value lines, separated by "\n".
+
+    :returns: The gene symbols and raw values, or None if any line does not have
+    exactly two fields.
+    """
+    line_count = block.count("\n") + 1
+    fields = block.split()
+
+    if len(fields) != 2 * line_count:
+        return None
+
+    # Most blocks are ASCII, with one tab on each line and no other whitespace, which
+    # is checked by deleting everything but the whitespace. Other blocks are checked
+    # with a (slower) regular expression.
+    if not (
+        block.isascii()
+        and block.encode("ascii").translate(None, NON_WHITESPACE_BYTES)
+        == b"\t\n" * (line_count - 1) + b"\t"
+    ) and not VALUE_BLOCK_PATTERN.fullmatch(block):
+        return None
+
+    return fields[0::2], fields[1::2]
+
+
+def extend_values(
+    current_geneset_values: Union[List[GenesetValueInput], GeneValueColumns],
+    gene_symbols: List[str],
+    raw_values: List[str],
+    trust: TrustLevel,
+) -> bool:
+    """Convert the raw values of a block, and add them to the current geneset's values.
+
+    Values are converted as `read_values` (or `read_trusted_values`) would convert
+    them. Nothing is added if any value is invalid.
+
+    :param current_geneset_values: The current geneset's values (a list of
+    GenesetValueInput, a GeneValueColumns or a RawGeneValues).
+    :param gene_symbols: The gene symbols of the block.
+    :param raw_values: The raw values of the block.
+    :param trust: How much the batch file is trusted, see TrustLevel.
+
+    :returns: Whether the values were added.
+    """
+    if isinstance(current_geneset_values, RawGeneValues):
+        # Vectorized values are converted when the geneset is complete.
+        current_geneset_values.symbols.extend(gene_symbols)
+        current_geneset_values.raw_values.extend(raw_values)
+        return True
+
+    try:
+        if isinstance(current_geneset_values, GeneValueColumns):
+            if trust is TrustLevel.TRUSTED or "".join(raw_values).isascii():
+                values = array("d", map(float, raw_values))
+            else:
+                values = array("d", map(convert_value, raw_values))
+            current_geneset_values.symbols.extend(gene_symbols)
+            current_geneset_values.values.extend(values)  # noqa: PD011
+            return True
+
+        if trust is TrustLevel.TRUSTED:
+            values = list(map(float, raw_values))
+            current_geneset_values.extend(
+                map(GenesetValueInput.from_typed, gene_symbols, values)
+            )
+            return True
+        current_geneset_values.extend(
+            [
+                GenesetValueInput(symbol=symbol, value=value)
+                for symbol, value in zip(gene_symbols, raw_values)  # noqa: B905
+            ]
+        )
+        return True
+    except ValueError:
+        # Includes pydantic's ValidationError.
+        return False
@@ -0,0 +1,195 @@
+"""Split a batch file into shard files, for ingestion across several workers.
+
+The batch file is read once, to build an index of its genesets (see
+`geneweaver.core.parse.batch_index.BatchFileIndex`). The genesets are then divided
+into contiguous runs with roughly equal numbers of values (rather than genesets, since
+a few very large genesets can dominate a file), and each run is written to its own
+shard file.
+
+Each shard is self-contained: every geneset in it starts with its fully resolved header
+(including the values it would otherwise inherit from earlier genesets, such as
+species, score and gene_id_type), followed by its value lines, copied as they are.
+Parsing the shards in order with `geneweaver.core.parse.batch.process_lines` gives
+exactly the same genesets as parsing the original file.
+
+Shard Class:
+- BatchShard: A shard file written by `write_shards`, and the genesets it contains.
+
+Shard Functions:
+- write_shards: Split a batch file into shard files, balanced by value count.
+- plan_shards: Divide genesets into contiguous runs with balanced value counts.
+- format_explicit_header: Format a resolved header as batch file header lines.
+- shard_path: Get the path of a shard of a batch file.
+"""
+
+from bisect import bisect_left
+from itertools import accumulate
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from geneweaver.core.parse.batch import (
+    HEADER_CHARACTERS,
+    SPACE_SEPARATED_HEADER_CHARACTERS,
+)
+from geneweaver.core.parse.batch_index import BatchFileIndex
+from geneweaver.core.types import StringOrPath
+from pydantic import BaseModel
+
+# The header character for each header key.
+HEADER_KEY_CHARACTERS = {
+    key: char
+    for char, key in {
+        **HEADER_CHARACTERS,
+        **SPACE_SEPARATED_HEADER_CHARACTERS,
+    }.items()
+}
+
+
+class BatchShard(BaseModel):
+    """A shard file written by `write_shards`, and the genesets it contains.
+
+    The shard holds the genesets from `first_geneset` (an index into the genesets of
+    the original batch file) up to, but not including, `first_geneset +
+    geneset_count`.
+    """
+
+    path: Path
+    first_geneset: int
+    geneset_count: int
+    value_count: int
+
+
+def write_shards(
+    file_path: StringOrPath,
+    n_shards: int,
+    directory: Optional[StringOrPath] = None,
+    index: Optional[BatchFileIndex] = None,
+) -> List[BatchShard]:
+    """Split a batch file into shard files, balanced by value count.
+
+    :param file_path: Path to the batch file.
+    :param n_shards: The number of shards to write. Fewer shards are written if the
+    file has fewer genesets.
+    :param directory: The directory to write the shards to. Defaults to the directory
+    of the batch file, and is created if needed. Shards are named with `shard_path`.
+    :param index: An index of the batch file, e.g. from
+    `BatchFileIndex.load_or_build`. By default, the file is indexed here.
+
+    :returns: The shards, in the order of the genesets in the batch file.
+
+    :raises MissingRequiredHeaderError: If a geneset's values start before all of its
+    required header values have been given.
+    :raises ValueError: If n_shards is less than 1.
+    """
+    file_path = Path(file_path)
+    directory = file_path.parent if directory is None else Path(directory)
+    index = BatchFileIndex.build(file_path) if index is None else index
+    directory.mkdir(parents=True, exist_ok=True)
+
+    plan = plan_shards([block.value_count for block in index.genesets], n_shards)
+    shards = []
+
+    with open(file_path, "rb") as source:
+        for shard_idx, geneset_range in enumerate(plan):
+            path = shard_path(file_path, shard_idx, len(plan), directory)
+            blocks = index.genesets[geneset_range.start : geneset_range.stop]
+
+            with open(path, "wb") as shard:
+                for block in blocks:
+                    source.seek(block.value_start)
+                    values = source.read(block.value_end - block.value_start)
+                    shard.write(
+                        format_explicit_header(block.header).encode(index.encoding)
+                    )
+                    shard.write(values)
+                    if values and values[-1:] not in (b"\n", b"\r"):
+                        shard.write(b"\n")
+
+            shards.append(
+                BatchShard(
+                    path=path,
+                    first_geneset=geneset_range.start,
+                    geneset_count=len(geneset_range),
+                    value_count=sum(block.value_count for block in blocks),
+                )
+            )
+
+    return shards
+
+
+def plan_shards(value_counts: Sequence[int], n_shards: int) -> List[range]:
+    """Divide genesets into contiguous runs with balanced value counts.
+
+    Each shard boundary is placed between the two genesets where the running total of
+    values is closest to an equal split, so no shard is further from an equal share
+    than about one geneset's values.
+
+    :param value_counts: The number of values in each geneset, in file order.
+    :param n_shards: The number of shards to divide the genesets into. Fewer shards are
+    returned if there are fewer genesets, so that no shard is empty.
+
+    :returns: The range of geneset indexes in each shard.
+
+    :raises ValueError: If n_shards is less than 1.
+    """
+    if n_shards < 1:
+        raise ValueError("The number of shards must be at least 1.")
+
+    n_shards = max(min(n_shards, len(value_counts)), 1)
+    totals = list(accumulate(value_counts, initial=0))
+    boundaries = [0]
+
+    for shard_idx in range(1, n_shards):
+        target = totals[-1] * shard_idx / n_shards
+        # The boundary must leave at least one geneset for each shard on either side.
+        low, high = boundaries[-1] + 1, len(value_counts) - (n_shards - shard_idx)
+        boundary = min(max(bisect_left(totals, target, low, high), low), high)
+        if boundary > low and target - totals[boundary - 1] < totals[boundary] - target:
+            boundary -= 1
+        boundaries.append(boundary)
+
+    boundaries.append(len(value_counts))
+    return [
+        range(start, stop)
+        for start, stop in zip(boundaries, boundaries[1:])  # noqa: B905
+    ]
+
+
+def format_explicit_header(header: dict) -> str:
+    """Format a resolved header as batch file header lines.
+
+    Parsing the lines gives back the same header values (the leading space which
+    `update_header` gives a description is restored when it is parsed).
+
+    :param header: The resolved header, e.g. from a `GenesetBlockIndex`.
+
+    :returns: One header line (with a trailing newline) for each header value.
+    """
+    return "".join(
+        f"{HEADER_KEY_CHARACTERS[key]} {value}\n" for key, value in header.items()
+    )
+
+
+def shard_path(
+    file_path: StringOrPath,
+    shard_idx: int,
+    n_shards: int,
+    directory: Optional[StringOrPath] = None,
+) -> Path:
+    """Get the path of a shard of a batch file.
+
+    :param file_path: Path to the batch file.
+    :param shard_idx: The index of the shard, from 0.
+    :param n_shards: The total number of shards.
+    :param directory: The directory of the shard. Defaults to the directory of the
+    batch file.
+
+    :returns: The path, e.g. "batch.shard-02-of-10.gw" for "batch.gw".
+    """
+    file_path = Path(file_path)
+    directory = file_path.parent if directory is None else Path(directory)
+    width = len(str(n_shards))
+    return directory / (
+        f"{file_path.stem}.shard-{shard_idx + 1:0{width}d}-of-{n_shards}"
+        f"{file_path.suffix}"
+    )
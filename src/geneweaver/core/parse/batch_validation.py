@@ -0,0 +1,301 @@
+r"""Validate a whole batch file in one pass, collecting every problem found.
+
+`geneweaver.core.parse.batch.process_lines` stops at the first error, so fixing a
+batch file with several problems means re-parsing it once per problem. The functions
+in this module walk the file once, carry on past each error, and return a
+BatchValidationReport listing every problem, with its line number, the byte offset of
+the start of its line, and the index of the geneset it belongs to.
+
+The header state machine is shared with `geneweaver.core.parse.batch`, so a file with
+no issues is one that `process_lines` would parse without error. Lines are split on
+"\n", "\r" and "\r\n", and line numbers start at 1.
+
+Validation Functions:
+- validate_batch_file: Validate a batch file on disk.
+- validate_batch_buffer: Validate the contents of a batch file held in memory.
+- iter_batch_issues: Lazily find the issues in the contents of a batch file.
+
+Check Functions:
+- check_first_value_line: Check a geneset's header values, once its first value line
+is read.
+- check_geneset_header: Check the header values of a geneset.
+- check_value_line: Check a value line.
+- missing_required_header_values: List the required header values which are missing.
+"""
+
+from typing import Iterator, List, Tuple, Union
+
+from geneweaver.core.parse.batch import (
+    HEADER_CHARACTERS,
+    REQUIRED_HEADERS,
+    BatchUploadGeneset,
+    GenesetValueInput,
+    LineKind,
+    ReadMode,
+    classify_line,
+    process_header_line,
+    process_value_line,
+    reset_required_header_values,
+    update_header,
+)
+from geneweaver.core.parse.exceptions import (
+    InvalidBatchValueLineError,
+    InvalidScoreThresholdError,
+    MissingRequiredHeaderError,
+    MultiLineStringError,
+)
+from geneweaver.core.parse.utils import iter_byte_line_spans, open_mmap
+from geneweaver.core.schema.batch import BatchValidationIssue, BatchValidationReport
+from geneweaver.core.types import StringOrPath
+from pydantic import ValidationError
+
+DEFAULT_MAX_ERRORS = 1000
+
+INVALID_VALUE_LINE_MESSAGE = (
+    "Value lines must contain exactly two fields: a gene identifier and a value."
+)
+
+
+def validate_batch_file(
+    file_path: StringOrPath,
+    max_errors: int = DEFAULT_MAX_ERRORS,
+    encoding: str = "utf-8",
+) -> BatchValidationReport:
+    """Validate a batch file on disk.
+
+    :param file_path: Path to the batch file.
+    :param max_errors: Stop validating once this many issues have been found.
+    :param encoding: The encoding of the batch file.
+
+    :returns: A report of every issue found (up to max_errors).
+    """
+    with open_mmap(file_path) as buffer:
+        return validate_batch_buffer(buffer, max_errors, encoding)
+
+
+def validate_batch_buffer(
+    buffer: Union[bytes, bytearray, memoryview],
+    max_errors: int = DEFAULT_MAX_ERRORS,
+    encoding: str = "utf-8",
+) -> BatchValidationReport:
+    """Validate the contents of a batch file held in memory.
+
+    Value lines are checked individually, and each geneset's header values (score
+    type, species, gene identifier type, etc.) are checked once its values have all
+    been read. If a geneset's values start before all of its required header values
+    are given, that is reported once, on its first value line.
+
+    :param buffer: The contents of the batch file (e.g. bytes or an mmap).
+    :param max_errors: The most issues to report. If any more are found, validation
+    stops and the report is marked as truncated. The issues kept are always the
+    first max_errors in the file.
+    :param encoding: The encoding of the batch file.
+
+    :returns: A report of every issue found (up to max_errors), in file order.
+    """
+    report = BatchValidationReport()
+
+    issues = iter_batch_issues(buffer, report, encoding)
+    try:
+        for issue in issues:
+            # Only truncated if there is an issue beyond the first max_errors.
+            if len(report.issues) >= max_errors:
+                report.truncated = True
+                break
+            report.issues.append(issue)
+    finally:
+        # Release any view of the buffer (e.g. an mmap) before it is closed.
+        issues.close()
+
+    return report
+
+
+def iter_batch_issues(
+    buffer: Union[bytes, bytearray, memoryview],
+    report: BatchValidationReport,
+    encoding: str = "utf-8",
+) -> Iterator[BatchValidationIssue]:
+    """Lazily find the issues in the contents of a batch file.
+
+    Issues are yielded in file order. A geneset's header values are reported against
+    its first line, but can only be checked once its first value line is read, so any
+    issues found in its header lines are held back until then.
+
+    :param buffer: The contents of the batch file (e.g. bytes or an mmap).
+    :param report: The report whose line and geneset counts are kept up to date.
+    :param encoding: The encoding of the batch file.
+
+    :returns: An iterator of the issues found.
+    """
+    header, read_mode = {}, ReadMode.HEADER
+    geneset_start, pending = (1, 0), []
+    report.geneset_count = 1
+
+    for line_number, (start, end, _) in enumerate(
+        iter_byte_line_spans(buffer), start=1
+    ):
+        report.line_count = line_number
+        try:
+            line = bytes(buffer[start:end]).decode(encoding)
+        except UnicodeDecodeError as e:
+            issue = issue_at(report, line_number, start, type(e).__name__, str(e))
+            if read_mode is ReadMode.HEADER:
+                pending.append(issue)
+            else:
+                yield issue
+            continue
+
+        line_kind = classify_line(line)
+
+        if line_kind is LineKind.HEADER:
+            if read_mode is ReadMode.CONTENT:
+                header = reset_required_header_values(header)
+                read_mode = ReadMode.HEADER
+                report.geneset_count += 1
+                geneset_start = (line_number, start)
+
+            header = update_header(*process_header_line(line), header)
+
+        elif line_kind is LineKind.VALUE:
+            if read_mode is ReadMode.HEADER:
+                read_mode = ReadMode.CONTENT
+                yield from check_first_value_line(
+                    report, header, geneset_start, pending, line_number, start
+                )
+                pending = []
+
+            yield from check_value_line(report, line, line_number, start)
+
+    if read_mode is ReadMode.HEADER:
+        # The final geneset has no values.
+        yield from check_geneset_header(report, header, *geneset_start)
+        yield from pending
+
+
+def check_first_value_line(
+    report: BatchValidationReport,
+    header: dict,
+    geneset_start: Tuple[int, int],
+    pending: List[BatchValidationIssue],
+    line_number: int,
+    offset: int,
+) -> Iterator[BatchValidationIssue]:
+    """Check a geneset's header values, once its first value line is read.
+
+    The issues are yielded in file order: the header values (against the start of the
+    geneset), then the issues held back from its header lines, then any missing
+    required header values (against the first value line).
+
+    :param report: The report the issues will be added to.
+    :param header: The geneset's header values.
+    :param geneset_start: The line number and byte offset of the start of the geneset.
+    :param pending: The issues found in the geneset's header lines.
+    :param line_number: The line number of the first value line.
+    :param offset: The byte offset of the start of the first value line.
+
+    :returns: An iterator of the issues found.
+    """
+    missing = missing_required_header_values(header)
+    # The geneset's header values are not checked on top of missing ones.
+    if not missing:
+        yield from check_geneset_header(report, header, *geneset_start)
+    yield from pending
+    if missing:
+        yield issue_at(
+            report,
+            line_number,
+            offset,
+            MissingRequiredHeaderError.__name__,
+            f"Missing required header values: {', '.join(missing)}.",
+        )
+
+
+def check_geneset_header(
+    report: BatchValidationReport, header: dict, line_number: int, offset: int
+) -> Iterator[BatchValidationIssue]:
+    """Check the header values of a geneset.
+
+    :param report: The report the issue will be added to.
+    :param header: The geneset's header values.
+    :param line_number: The line number of the start of the geneset.
+    :param offset: The byte offset of the start of the geneset.
+
+    :returns: An iterator of the issue found, if any.
+    """
+    try:
+        BatchUploadGeneset(values=[], **header)
+    except ValidationError as e:
+        yield issue_at(report, line_number, offset, type(e).__name__, str(e))
+    except (KeyError, ValueError, InvalidScoreThresholdError) as e:
+        # The species, gene identifier type and score validators can raise these
+        # directly, rather than as a ValidationError.
+        yield issue_at(
+            report,
+            line_number,
+            offset,
+            type(e).__name__,
+            f"Invalid header values: {e!r}",
+        )
+
+
+def check_value_line(
+    report: BatchValidationReport, line: str, line_number: int, offset: int
+) -> Iterator[BatchValidationIssue]:
+    """Check a value line.
+
+    :param report: The report the issue will be added to.
+    :param line: The value line.
+    :param line_number: The line number of the value line.
+    :param offset: The byte offset of the start of the value line.
+
+    :returns: An iterator of the issue found, if any.
+    """
+    try:
+        symbol, value = process_value_line(line)
+        GenesetValueInput(symbol=symbol, value=value)
+    except (InvalidBatchValueLineError, MultiLineStringError) as e:
+        yield issue_at(
+            report, line_number, offset, type(e).__name__, INVALID_VALUE_LINE_MESSAGE
+        )
+    except ValidationError as e:
+        yield issue_at(report, line_number, offset, type(e).__name__, str(e))
+
+
+def missing_required_header_values(header: dict) -> List[str]:
+    """List the required header values which are missing from a header dictionary.
+
+    :param header: The header dictionary.
+
+    :returns: The missing header values, described by name and prefix character.
+    """
+    return [
+        f"{HEADER_CHARACTERS[key]} ({key})"
+        for key in REQUIRED_HEADERS
+        if HEADER_CHARACTERS[key] not in header
+    ]
+
+
+def issue_at(
+    report: BatchValidationReport,
+    line_number: int,
+    offset: int,
+    error: str,
+    message: str,
+) -> BatchValidationIssue:
+    """Create an issue in the geneset currently being validated.
+
+    :param report: The report whose geneset count gives the current geneset.
+    :param line_number: The line number of the issue.
+    :param offset: The byte offset of the start of the issue's line.
+    :param error: The name of the error.
+    :param message: A description of the error.
+
+    :returns: The issue.
+    """
+    return BatchValidationIssue(
+        line_number=line_number,
+        offset=offset,
+        geneset_index=report.geneset_count - 1,
+        error=error,
+        message=message,
+    )
@@ -0,0 +1,279 @@
+"""Cache parse results on local disk, keyed by the content that was parsed.
+
+The same files are often parsed several times (e.g. retries, dry runs and then the
+real upload). A ParseCache stores each parse result in a local directory under a key
+made from the SHA-256 of the input bytes, the parser (and its options), and the
+version of this package, so a repeated parse of identical content is a single file
+read. The directory is kept under a size budget by evicting the least recently used
+results.
+
+Batch files are parsed into columnar genesets (see `ColumnarBatchUploadGeneset`) for
+storage, which is both the fastest form to parse and the most compact to store.
+
+Results are stored with pickle, so the cache directory must only be writable by
+trusted users.
+
+Cache Class:
+- ParseCache: A size-bounded, least recently used, on-disk cache of parse results.
+
+Cache Functions:
+- make_cache_key: Make the cache key for parsing some content with some options.
+"""
+
+import contextlib
+import hashlib
+import importlib.metadata
+import os
+import pickle
+import tempfile
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TypeVar, Union
+
+from geneweaver.core.parse import csv, xlsx
+from geneweaver.core.parse.batch import process_lines
+from geneweaver.core.schema.batch import BatchUploadGeneset
+from geneweaver.core.types import StringOrPath
+
+T = TypeVar("T")
+
+# Bump this if the format of cached results changes, so that old results are ignored.
+PARSE_CACHE_VERSION = 1
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+CACHE_FILE_SUFFIX = ".pickle"
+
+# The types of option which can be part of a cache key, as their repr is stable.
+CACHE_KEY_OPTION_TYPES = (type(None), bool, int, float, str, bytes, Enum)
+
+# Options of `batch.process_lines` which share state with the caller, which a cached
+# result would never update.
+UNCACHEABLE_BATCH_OPTIONS = ("symbols", "duplicate_stats")
+
+try:
+    PACKAGE_VERSION = importlib.metadata.version("geneweaver-core")
+except importlib.metadata.PackageNotFoundError:
+    PACKAGE_VERSION = "unknown"
+
+
+class ParseCache:
+    """A size-bounded, least recently used, on-disk cache of parse results.
+
+    Each result is stored in its own file, and a file's modification time records when
+    it was last used. Whenever a result is stored, the least recently used results are
+    removed until the directory is back under `max_bytes`.
+    """
+
+    def __init__(
+        self: "ParseCache", directory: StringOrPath, max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        """Initialize the cache, creating its directory if needed.
+
+        :param directory: The directory to store results in.
+        :param max_bytes: The maximum total size of the stored results.
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def get_or_parse(
+        self: "ParseCache",
+        data: bytes,
+        parse: Callable[[], T],
+        parser: str,
+        **options: Any,  # noqa: ANN401
+    ) -> T:
+        """Get a cached parse result, or parse the data and cache the result.
+
+        A stored result which cannot be loaded is treated as a miss, and replaced.
+
+        :param data: The bytes which are parsed.
+        :param parse: A function which parses the data, called on a cache miss.
+        :param parser: The name of the parser, which is part of the cache key.
+        :param options: Options which change the result of the parser, which are part of
+        the cache key, see `make_cache_key`.
+
+        :returns: The parse result.
+
+        :raises ValueError: If an option cannot be part of the cache key.
+        """
+        key = make_cache_key(data, parser, **options)
+        path = self.directory / f"{key}{CACHE_FILE_SUFFIX}"
+
+        try:
+            with open(path, "rb") as f:
+                result = pickle.load(f)  # noqa: S301
+            os.utime(path)
+            self.hits += 1
+            return result
+        except FileNotFoundError:
+            pass
+        except Exception:
+            # Any other failure to load a result (e.g. a corrupt file, or a stale
+            # pickle of a class which has since been renamed) is a miss, and the result
+            # is removed so that it is replaced.
+            with contextlib.suppress(OSError):
+                path.unlink(missing_ok=True)
+
+        self.misses += 1
+        result = parse()
+        self._store(path, result)
+        return result
+
+    def process_lines(
+        self: "ParseCache",
+        contents: str,
+        columnar: bool = False,
+        **options: Any,  # noqa: ANN401
+    ) -> List[BatchUploadGeneset]:
+        """Process the contents of a batch file, see `batch.process_lines`.
+
+        :param contents: The contents of the batch file to be processed.
+        :param columnar: Whether to return ColumnarBatchUploadGeneset instances, which
+        are much faster to load from the cache.
+        :param options: Other options for `batch.process_lines`, except for `symbols`
+        and `duplicate_stats`, which are not updated when the result is cached.
+
+        :returns: A list of genesets created from the processed batch file.
+
+        :raises ValueError: If an option cannot be cached.
+        """
+        uncacheable = sorted(set(options).intersection(UNCACHEABLE_BATCH_OPTIONS))
+        if uncacheable:
+            raise ValueError(f"The {', '.join(uncacheable)} options can't be cached.")
+
+        genesets = self.get_or_parse(
+            contents.encode("utf-8"),
+            lambda: process_lines(contents, columnar=True, **options),
+            "batch.process_lines",
+            **options,
+        )
+        if columnar:
+            return genesets
+        return [geneset.to_geneset() for geneset in genesets]
+
+    def read_csv_to_dict(
+        self: "ParseCache", file_path: StringOrPath, start_row: int = 0
+    ) -> List[Dict[str, Union[str, int]]]:
+        """Read a CSV file into a list of dictionaries, see `csv.read_to_dict`.
+
+        :param file_path: Path to the CSV file.
+        :param start_row: The row number to start reading from (0-indexed).
+
+        :returns: List of dictionaries representing the CSV file.
+        """
+        return self.get_or_parse(
+            Path(file_path).read_bytes(),
+            lambda: csv.read_to_dict(file_path, start_row),
+            "csv.read_to_dict",
+            start_row=start_row,
+        )
+
+    def read_xlsx_to_dict(
+        self: "ParseCache",
+        file_path: StringOrPath,
+        start_row: int = 0,
+        sheet_name: Optional[str] = None,
+    ) -> List[Dict[str, Union[str, int]]]:
+        """Read an Excel file into a list of dictionaries, see `xlsx.read_to_dict`.
+
+        :param file_path: Path to the Excel file.
+        :param start_row: The row number to start reading from (0-indexed).
+        :param sheet_name: Name of the sheet to read from. Defaults to the active sheet.
+
+        :returns: A list of dictionaries, where each dictionary represents a row.
+        """
+        return self.get_or_parse(
+            Path(file_path).read_bytes(),
+            lambda: xlsx.read_to_dict(file_path, start_row, sheet_name),
+            "xlsx.read_to_dict",
+            start_row=start_row,
+            sheet_name=sheet_name,
+        )
+
+    def size(self: "ParseCache") -> int:
+        """Get the total size of the stored results.
+
+        :returns: The total size, in bytes.
+        """
+        return sum(path.stat().st_size for path in self._cache_files())
+
+    def evict(self: "ParseCache") -> int:
+        """Remove the least recently used results until the cache is within budget.
+
+        :returns: The number of results removed.
+        """
+        entries = []
+        for path in self._cache_files():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total, removed = sum(size for _, size, _ in entries), 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+
+        return removed
+
+    def clear(self: "ParseCache") -> None:
+        """Remove every stored result."""
+        for path in self._cache_files():
+            path.unlink(missing_ok=True)
+
+    def _cache_files(self: "ParseCache") -> List[Path]:
+        return list(self.directory.glob(f"*{CACHE_FILE_SUFFIX}"))
+
+    def _store(self: "ParseCache", path: Path, result: Any) -> None:  # noqa: ANN401
+        # Write to a temporary file first, so that readers never see a partial result.
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+
+def make_cache_key(data: bytes, parser: str, **options: Any) -> str:  # noqa: ANN401
+    """Make the cache key for parsing some content with some options.
+
+    :param data: The bytes which are parsed.
+    :param parser: The name of the parser.
+    :param options: Options which change the result of the parser. They must be None,
+    booleans, numbers, strings, bytes or enums, whose repr is stable, so that equal
+    options make the same key.
+
+    :returns: A hex SHA-256 digest, which changes if the data, the parser, its
+    options, or the version of this package or cache format change.
+
+    :raises ValueError: If an option is of any other type.
+    """
+    for name, value in options.items():
+        if not isinstance(value, CACHE_KEY_OPTION_TYPES):
+            raise ValueError(
+                f"The {name} option ({type(value).__name__}) can't be part of a cache "
+                "key, as its repr is not stable."
+            )
+
+    digest = hashlib.sha256()
+    for part in (
+        str(PARSE_CACHE_VERSION),
+        PACKAGE_VERSION,
+        parser,
+        repr(sorted(options.items())),
+    ):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    digest.update(data)
+    return digest.hexdigest()
@@ -1,10 +1,15 @@
-"""Utility functions to parse CSV documents."""
+"""Utility functions to parse CSV documents.
+
+Compressed CSV files are decompressed transparently, see
+`geneweaver.core.parse.utils.open_file`.
+"""
 
 import csv
 import itertools
 from typing import Dict, List, TextIO, Tuple, Union
 
 from geneweaver.core.parse.exceptions import EmptyFileError
+from geneweaver.core.parse.utils import open_file
 from geneweaver.core.types import StringOrPath
 
 
@@ -27,7 +32,7 @@ def find_header(
     :returns: First index - True if a header row is found, False otherwise.
               Second index - The index of the header row if found, otherwise -1.
     """
-    with open(file_path, "r") as f:
+    with open_file(file_path, "r") as f:
         reader = csv.reader(f)
         for i, row in enumerate(reader):
             if i >= max_rows_to_check:
@@ -83,7 +88,7 @@ def read_row(file_path: StringOrPath, row_idx: int = 0) -> List[str]:
     :raises ValueError: If the file is empty or does not contain enough rows.
     """
     row = []
-    with open(file_path, newline="") as f:
+    with open_file(file_path, newline="") as f:
         reader = csv.reader(f)
         for i, r in enumerate(reader):
             if i == row_idx:
@@ -129,7 +134,7 @@ def read_to_dict(
 
     :returns: List of dictionaries representing the CSV file.
     """
-    with open(file_path, mode="r") as infile:
+    with open_file(file_path, mode="r") as infile:
         dict_reader = get_csv_dict_reader(infile, start_row)
         data = [dict(row) for row in dict_reader]
     return data
@@ -152,7 +157,7 @@ def read_to_dict_n_rows(
     :returns: A list of dictionaries, where each dictionary represents a row from the
     CSV file.
     """
-    with open(file_path, mode="r") as infile:
+    with open_file(file_path, mode="r") as infile:
         dict_reader = get_csv_dict_reader(infile, start_row)
         data = list(itertools.islice(dict_reader, n))
         if len(data) == 0:
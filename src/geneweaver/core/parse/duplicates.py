@@ -0,0 +1,146 @@
+"""Resolve duplicate gene symbols in a geneset.
+
+GeneValue compares and hashes on its symbol alone, so a geneset can hold several values
+for the same gene. The functions in this module remove those duplicates in a single
+pass, keeping one value per symbol according to a DuplicatePolicy:
+
+- KEEP_FIRST: Keep the first value for each symbol.
+- KEEP_LAST: Keep the last value for each symbol.
+- MIN_VALUE: Keep the smallest value for each symbol (e.g. the best p-value).
+- MAX_ABS_VALUE: Keep the value with the largest magnitude (e.g. the largest effect).
+- ERROR: Raise a DuplicateGeneError on the first duplicate.
+
+Values are kept in the order in which their symbols first appear. When values tie
+the earlier value is kept. NaN is treated as the worst value by MIN_VALUE and
+MAX_ABS_VALUE, so it is only kept if every value for the symbol is NaN.
+
+The number of duplicates removed while parsing can be collected in a DuplicateStats,
+e.g. `process_lines(contents, duplicates=policy, duplicate_stats=stats)`.
+
+Deduplication Class:
+- DuplicateStats: Counts of the duplicate gene symbols removed while parsing.
+
+Deduplication Functions:
+- deduplicate_gene_values: Remove duplicate symbols from a list (or columns) of gene
+values.
+- duplicate_indices_to_keep: Find the positions of the values to keep.
+"""
+
+from math import isnan
+from typing import Dict, List, Sequence, Tuple, TypeVar, Union
+
+from geneweaver.core.parse.enum import DuplicatePolicy
+from geneweaver.core.parse.exceptions import DuplicateGeneError
+from geneweaver.core.schema.gene import GeneValue, GeneValueColumns
+
+GeneValues = TypeVar("GeneValues", List[GeneValue], GeneValueColumns)
+
+
+class DuplicateStats:
+    """Counts of the duplicate gene symbols removed while parsing.
+
+    Pass the same instance to several parses to count the duplicates removed from all
+    of them.
+    """
+
+    __slots__ = ("removed", "genesets")
+
+    def __init__(self: "DuplicateStats") -> None:
+        """Initialize the counts at zero."""
+        self.removed = 0
+        self.genesets = 0
+
+    def add(self: "DuplicateStats", removed: int) -> None:
+        """Count the duplicates removed from a geneset.
+
+        :param removed: The number of duplicates removed from the geneset.
+        """
+        self.removed += removed
+        if removed:
+            self.genesets += 1
+
+    def __repr__(self: "DuplicateStats") -> str:
+        """Return the counts."""
+        return f"DuplicateStats(removed={self.removed}, genesets={self.genesets})"
+
+
+def deduplicate_gene_values(
+    gene_values: GeneValues,
+    policy: Union[DuplicatePolicy, str] = DuplicatePolicy.KEEP_FIRST,
+) -> Tuple[GeneValues, int]:
+    """Remove duplicate symbols from a list (or columns) of gene values.
+
+    :param gene_values: A list of GeneValue instances, or a GeneValueColumns.
+    :param policy: How to choose which value to keep for each symbol.
+
+    :returns: A tuple containing:
+        0. the deduplicated gene values, of the same type as gene_values, and
+        1. the number of duplicates removed.
+
+    :raises DuplicateGeneError: If the policy is ERROR and there are duplicates.
+    """
+    if isinstance(gene_values, GeneValueColumns):
+        symbols, values = gene_values.symbols, gene_values.values  # noqa: PD011
+    else:
+        symbols = [gene_value.symbol for gene_value in gene_values]
+        values = [gene_value.value for gene_value in gene_values]
+
+    keep = duplicate_indices_to_keep(symbols, values, policy)
+    removed = len(symbols) - len(keep)
+
+    if not removed:
+        return gene_values, 0
+
+    if isinstance(gene_values, GeneValueColumns):
+        return (
+            GeneValueColumns(
+                [symbols[idx] for idx in keep], [values[idx] for idx in keep]
+            ),
+            removed,
+        )
+    return [gene_values[idx] for idx in keep], removed
+
+
+def duplicate_indices_to_keep(
+    symbols: Sequence[str],
+    values: Sequence[float],
+    policy: Union[DuplicatePolicy, str] = DuplicatePolicy.KEEP_FIRST,
+) -> List[int]:
+    """Find the positions of the values to keep, one for each distinct symbol.
+
+    :param symbols: The gene symbols.
+    :param values: The gene values, in the same order as the symbols.
+    :param policy: How to choose which value to keep for each symbol.
+
+    :returns: The positions of the values to keep, in the order in which their symbols
+    first appear.
+
+    :raises DuplicateGeneError: If the policy is ERROR and there are duplicates.
+    """
+    policy = DuplicatePolicy(policy)
+    # The position in `keep` of each symbol seen so far.
+    slots: Dict[str, int] = {}
+    keep: List[int] = []
+
+    for idx, symbol in enumerate(symbols):
+        slot = slots.get(symbol)
+
+        if slot is None:
+            slots[symbol] = len(keep)
+            keep.append(idx)
+
+        elif policy is DuplicatePolicy.ERROR:
+            raise DuplicateGeneError(symbol)
+
+        elif policy is DuplicatePolicy.KEEP_LAST:
+            keep[slot] = idx
+
+        elif policy is not DuplicatePolicy.KEEP_FIRST:
+            value, kept = values[idx], values[keep[slot]]
+            if policy is DuplicatePolicy.MAX_ABS_VALUE:
+                value, kept = -abs(value), -abs(kept)
+            # NaN is never smaller than a value, but a value replaces a kept NaN.
+            if value < kept or (isnan(kept) and not isnan(value)):
+                keep[slot] = idx
+
+    return keep
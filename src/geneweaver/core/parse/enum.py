@@ -17,3 +17,29 @@ class GeneweaverFileType(str, Enum):
 
     BATCH = "batch"
     VALUES = "values"
+
+
+class DuplicatePolicy(str, Enum):
+    """Enum for how to resolve duplicate gene symbols in a geneset."""
+
+    KEEP_FIRST = "keep_first"
+    KEEP_LAST = "keep_last"
+    MIN_VALUE = "min_value"
+    MAX_ABS_VALUE = "max_abs_value"
+    ERROR = "error"
+
+
+class Compression(str, Enum):
+    """Enum for the compression formats which can be read transparently."""
+
+    GZIP = "gz"
+    BZ2 = "bz2"
+    XZ = "xz"
+    ZSTD = "zst"
+
+
+class BatchEngine(str, Enum):
+    """Enum for the engines which can parse the contents of a batch file."""
+
+    LINES = "lines"
+    REGEX = "regex"
@@ -1,5 +1,7 @@
 """Exceptions related to file parsing."""
 
+from typing import Any, List, Tuple
+
 
 class UnsupportedFileTypeError(Exception):
     """Custom exception for when a file type is not supported."""
@@ -64,3 +66,38 @@ class InvalidScoreThresholdError(Exception):
     """Raised when a score threshold is invalid."""
 
     pass
+
+
+class DuplicateGeneError(Exception):
+    """Raised when a gene symbol appears more than once in a geneset."""
+
+    def __init__(self: "DuplicateGeneError", symbol: str) -> None:
+        """Initialize the exception."""
+        self.symbol = symbol
+        super().__init__(f"Duplicate gene symbol: {symbol}")
+
+
+class PipelineStoppedError(Exception):
+    """Raised in a pipeline stage when the pipeline has been stopped."""
+
+    pass
+
+
+class ValueConversionError(ValueError):
+    """Raised when gene values cannot be converted to floats."""
+
+    def __init__(self: "ValueConversionError", failures: List[Tuple[int, Any]]) -> None:
+        """Initialize the exception.
+
+        :param failures: The line number and raw value of each value which could not
+        be converted.
+        """
+        self.failures = failures
+        examples = ", ".join(
+            f"{raw_value!r} (line {line_number})"
+            for line_number, raw_value in failures[:5]
+        )
+        super().__init__(
+            f"Could not convert {len(failures)} value(s) to float: {examples}"
+            + (", ..." if len(failures) > 5 else "")
+        )
@@ -0,0 +1,148 @@
+"""Intern gene symbols, so that identical symbols share one string object.
+
+In a large batch import, the same few thousand gene symbols recur millions of times,
+but every value line is split into new string objects. Passing a SymbolTable to the
+batch parser (e.g. `process_lines(contents, symbols=SymbolTable())`) replaces each
+gene symbol with the first string seen with the same contents, so that each distinct
+symbol is only held in memory once, however many genesets it appears in. A table can
+be shared between several parses (e.g. every file in an import), but not between
+threads or processes.
+
+A SymbolTable also gives each distinct symbol a small integer ID, in order of first
+appearance, which can be used to encode symbols compactly (e.g. as an array).
+
+Symbol Table Classes:
+- SymbolTable: A table of interned gene symbols, with integer IDs.
+- SymbolTableStats: Memory statistics for a SymbolTable.
+"""
+
+import sys
+from array import array
+from typing import Dict, Iterable, List
+
+from pydantic import BaseModel
+
+
+class SymbolTableStats(BaseModel):
+    """Memory statistics for a SymbolTable."""
+
+    unique_symbols: int
+    duplicates: int
+    table_bytes: int
+    bytes_saved: int
+
+
+class SymbolTable:
+    """A table of interned gene symbols, with integer IDs.
+
+    `intern` is called once per value line, so it is kept to a single dictionary
+    lookup. The memory statistics are estimated from counts kept as symbols are
+    interned, see `stats`.
+    """
+
+    __slots__ = ("_ids", "symbols", "duplicates", "duplicate_chars")
+
+    def __init__(self: "SymbolTable", symbols: Iterable[str] = ()) -> None:
+        """Initialize the table.
+
+        :param symbols: Symbols to add to the table up front, e.g. every known symbol
+        for a species, so they are given the same IDs every time.
+        """
+        self._ids: Dict[str, int] = {}
+        self.symbols: List[str] = []
+        self.duplicates = 0
+        self.duplicate_chars = 0
+        for symbol in symbols:
+            self.id_of(symbol)
+
+    def intern(self: "SymbolTable", symbol: str) -> str:
+        """Get the interned string with the same contents as a symbol.
+
+        :param symbol: The gene symbol.
+
+        :returns: The first string added to the table with the same contents (which is
+        the symbol itself, if it is new).
+        """
+        symbol_id = self._ids.get(symbol)
+        if symbol_id is None:
+            self._ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            return symbol
+
+        interned = self.symbols[symbol_id]
+        if interned is not symbol:
+            self.duplicates += 1
+            self.duplicate_chars += len(symbol)
+        return interned
+
+    def id_of(self: "SymbolTable", symbol: str) -> int:
+        """Get the integer ID of a symbol, adding it to the table if it is new.
+
+        :param symbol: The gene symbol.
+
+        :returns: The symbol's ID. IDs count up from 0, in order of first appearance.
+        """
+        symbol_id = self._ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = self._ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return symbol_id
+
+    def symbol_of(self: "SymbolTable", symbol_id: int) -> str:
+        """Get the symbol with an integer ID.
+
+        :param symbol_id: The ID.
+
+        :returns: The interned symbol.
+
+        :raises IndexError: If there is no symbol with the ID.
+        """
+        if symbol_id < 0:
+            raise IndexError(f"Invalid symbol ID: {symbol_id}")
+        return self.symbols[symbol_id]
+
+    def encode(self: "SymbolTable", symbols: Iterable[str]) -> array:
+        """Encode symbols as their integer IDs, adding any new symbols to the table.
+
+        :param symbols: The gene symbols.
+
+        :returns: The IDs, as an unsigned integer array (4 bytes per symbol).
+        """
+        return array("I", map(self.id_of, symbols))
+
+    def decode(self: "SymbolTable", symbol_ids: Iterable[int]) -> List[str]:
+        """Decode integer IDs into their interned symbols.
+
+        :param symbol_ids: The IDs.
+
+        :returns: The symbols.
+        """
+        return [self.symbols[symbol_id] for symbol_id in symbol_ids]
+
+    def stats(self: "SymbolTable") -> SymbolTableStats:
+        """Get memory statistics for the table.
+
+        :returns: The number of unique symbols; the number of duplicate strings which
+        `intern` replaced with an interned string (and so could be freed); the
+        approximate size of the table itself; and the approximate size of the
+        duplicate strings (exact for ASCII symbols).
+        """
+        table_bytes = (
+            sys.getsizeof(self._ids)
+            + sys.getsizeof(self.symbols)
+            + sum(sys.getsizeof(symbol) for symbol in self.symbols)
+        )
+        return SymbolTableStats(
+            unique_symbols=len(self.symbols),
+            duplicates=self.duplicates,
+            table_bytes=table_bytes,
+            bytes_saved=self.duplicates * sys.getsizeof("") + self.duplicate_chars,
+        )
+
+    def __len__(self: "SymbolTable") -> int:
+        """Return the number of unique symbols."""
+        return len(self.symbols)
+
+    def __contains__(self: "SymbolTable", symbol: str) -> bool:
+        """Check whether a symbol is in the table."""
+        return symbol in self._ids
@@ -1,15 +1,59 @@
 """Utility functions for the parser module."""
 
+import bz2
+import codecs
+import gzip
+import importlib
+import io
+import lzma
+import mmap
+import re
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List
+from typing import (
+    IO,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+)
 
-from geneweaver.core.parse.enum import FileType
+from geneweaver.core.parse.enum import Compression, FileType
 from geneweaver.core.types import StringOrPath
 
+# The number of characters (or bytes, for binary streams) to read at a time when
+# lazily splitting a stream into lines.
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Characters which `str.splitlines` treats as line boundaries.
+LINE_BOUNDARIES = frozenset("\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029")
+
+# Line boundaries recognised by `bytes.splitlines`.
+BYTE_LINE_BOUNDARY_PATTERN = re.compile(rb"\r\n|\r|\n")
+
+# The magic bytes at the start of each compressed file format.
+COMPRESSION_MAGIC = {
+    b"\x1f\x8b": Compression.GZIP,
+    b"BZh": Compression.BZ2,
+    b"\xfd7zXZ\x00": Compression.XZ,
+    b"\x28\xb5\x2f\xfd": Compression.ZSTD,
+}
+COMPRESSION_MAGIC_LENGTH = max(len(magic) for magic in COMPRESSION_MAGIC)
+
+# File extensions which only give a file's compression, e.g. the ".gz" of ".csv.gz".
+COMPRESSION_EXTENSIONS = {f".{compression.value}" for compression in Compression}
+
 
 def get_file_type(file_path: StringOrPath) -> FileType:
     """Determine if a file at a given path is a csv or xlsx file.
 
+    Compression extensions are skipped, so e.g. "genes.csv.gz" is a CSV file.
+
     :param file_path: Path to the file.
 
     :returns: The file type.
@@ -20,6 +64,8 @@ def get_file_type(file_path: StringOrPath) -> FileType:
     """
     file_path = Path(file_path)  # convert to Path object if not already
     extension = file_path.suffix.lower()
+    if extension in COMPRESSION_EXTENSIONS:
+        extension = Path(file_path.stem).suffix.lower()
 
     if extension == ".csv":
         return FileType.CSV
@@ -34,6 +80,8 @@ def get_file_type(file_path: StringOrPath) -> FileType:
 def read_file_content(file_path: StringOrPath) -> str:
     """Read the content of the file at a given path.
 
+    Compressed files are decompressed transparently, see `open_file`.
+
     :param file_path: Path to the file.
 
     :returns: The content of the file as a string.
@@ -42,12 +90,300 @@ def read_file_content(file_path: StringOrPath) -> str:
     :raises IsADirectoryError: If the path points to a directory.
     :raises PermissionError: If the file is not readable.
     """
-    with open(file_path, "r") as f:
+    with open_file(file_path, "r") as f:
         content = f.read()
 
     return content
 
 
+def open_file(
+    file_path: StringOrPath,
+    mode: str = "r",
+    encoding: Optional[str] = None,
+    newline: Optional[str] = None,
+) -> IO:
+    """Open a file for reading, decompressing it transparently if it is compressed.
+
+    The compression format (gzip, bz2, xz or zstd) is detected from the magic bytes at
+    the start of the file, not from its extension, and the file is decompressed as it
+    is read. Reading zstd files requires the optional `zstandard` package.
+
+    :param file_path: Path to the file.
+    :param mode: "r" (or "rt") to read text, or "rb" to read bytes.
+    :param encoding: The encoding to use in text mode, as for `open`.
+    :param newline: The newline handling to use in text mode, as for `open`.
+
+    :returns: A readable file object.
+
+    :raises ValueError: If the mode is not a read mode.
+    :raises ImportError: If the file is zstd compressed, and `zstandard` is not
+    installed.
+    """
+    if mode not in ("r", "rt", "rb"):
+        raise ValueError(f"Unsupported mode {mode!r}, files can only be read.")
+
+    kwargs = {} if mode == "rb" else {"encoding": encoding, "newline": newline}
+    compression = detect_compression(file_path)
+
+    if compression is None:
+        return open(file_path, mode, **kwargs)
+
+    if mode == "r":
+        mode = "rt"
+
+    return get_decompressing_opener(compression)(file_path, mode, **kwargs)
+
+
+def open_decompressed_stream(stream: BinaryIO) -> BinaryIO:
+    """Wrap a binary stream so that it is decompressed as it is read, if needed.
+
+    The compression format is detected from the magic bytes at the current position of
+    the stream, which must either support `peek` (e.g. `io.BufferedReader`) or be
+    seekable. Other streams are returned unchanged.
+
+    :param stream: A readable binary stream.
+
+    :returns: The stream itself if it is not compressed, otherwise a binary stream of
+    its decompressed contents.
+
+    :raises ImportError: If the stream is zstd compressed, and `zstandard` is not
+    installed.
+    """
+    if hasattr(stream, "peek"):
+        prefix = stream.peek(COMPRESSION_MAGIC_LENGTH)[:COMPRESSION_MAGIC_LENGTH]
+    elif stream.seekable():
+        start = stream.tell()
+        prefix = stream.read(COMPRESSION_MAGIC_LENGTH)
+        stream.seek(start)
+    else:
+        return stream
+
+    compression = compression_from_magic(prefix)
+
+    if compression is None:
+        return stream
+
+    return get_decompressing_opener(compression)(stream, "rb")
+
+
+def is_binary_stream(stream: Union[TextIO, BinaryIO]) -> bool:
+    """Check whether a stream is read from or written to with bytes.
+
+    Binary streams are detected positively, since many text streams (e.g. the wrappers
+    returned by `tempfile.NamedTemporaryFile` and `tempfile.SpooledTemporaryFile`) are
+    not instances of io.TextIOBase.
+
+    :param stream: A text or binary file-like object.
+
+    :returns: Whether the stream is a raw or buffered binary stream, or was opened in
+    binary mode.
+    """
+    if isinstance(stream, (io.RawIOBase, io.BufferedIOBase)):
+        return True
+    if isinstance(stream, io.TextIOBase):
+        return False
+    mode = getattr(stream, "mode", "")
+    return isinstance(mode, str) and "b" in mode
+
+
+def detect_compression(file_path: StringOrPath) -> Optional[Compression]:
+    """Detect how a file is compressed from its magic bytes.
+
+    :param file_path: Path to the file.
+
+    :returns: The compression format of the file, or None if it is not compressed.
+    """
+    with open(file_path, "rb") as f:
+        return compression_from_magic(f.read(COMPRESSION_MAGIC_LENGTH))
+
+
+def compression_from_magic(prefix: bytes) -> Optional[Compression]:
+    """Detect a compression format from the first bytes of a file.
+
+    :param prefix: The first bytes of the file (at least COMPRESSION_MAGIC_LENGTH bytes,
+    unless the file is shorter).
+
+    :returns: The compression format, or None if the bytes are not compressed.
+    """
+    for magic, compression in COMPRESSION_MAGIC.items():
+        if prefix.startswith(magic):
+            return compression
+    return None
+
+
+def get_decompressing_opener(compression: Compression) -> Callable[..., IO]:
+    """Get the `open` function of the module which reads a compression format.
+
+    Each opener takes a path or binary file object and a mode, and (in text mode)
+    encoding and newline keyword arguments.
+
+    :param compression: The compression format.
+
+    :returns: The `open` function of gzip, bz2, lzma or zstandard.
+
+    :raises ImportError: If the format is zstd, and `zstandard` is not installed.
+    """
+    if compression is Compression.ZSTD:
+        try:
+            return importlib.import_module("zstandard").open
+        except ImportError:
+            raise ImportError(
+                "Reading zstd compressed files requires the zstandard package."
+            ) from None
+
+    return {
+        Compression.GZIP: gzip.open,
+        Compression.BZ2: bz2.open,
+        Compression.XZ: lzma.open,
+    }[compression]
+
+
+class LineSplitter:
+    """Incrementally split chunks of text or bytes into lines.
+
+    Chunks are passed to `feed` as they arrive, and each call returns the lines which
+    were completed by that chunk. Lines are split using the same rules as
+    `str.splitlines`, so feeding a document in chunks of any size yields exactly the
+    same lines as `document.splitlines()`, even when a line terminator (or a multibyte
+    character) is split across two chunks.
+    """
+
+    def __init__(self: "LineSplitter", encoding: str = "utf-8") -> None:
+        """Initialize the line splitter.
+
+        :param encoding: The encoding to use for chunks of bytes.
+        """
+        self.encoding = encoding
+        self._decoder = None
+        self._remainder = ""
+
+    def feed(self: "LineSplitter", chunk: Union[str, bytes]) -> List[str]:
+        """Add a chunk of text or bytes, and return the lines it completed.
+
+        :param chunk: The next chunk of the document. Chunks of bytes are decoded
+        incrementally, so multibyte characters may span chunk boundaries.
+
+        :returns: The completed lines, without line terminators.
+        """
+        if not isinstance(chunk, str):
+            if self._decoder is None:
+                self._decoder = codecs.getincrementaldecoder(self.encoding)()
+            chunk = self._decoder.decode(chunk)
+
+        lines = (self._remainder + chunk).splitlines(keepends=True)
+
+        # The last line is only complete if it ends with a line break. A trailing "\r"
+        # might be the first half of a "\r\n" pair, so we hold on to it as well.
+        self._remainder = lines.pop() if lines else ""
+        if self._remainder[-1:] in LINE_BOUNDARIES and self._remainder[-1] != "\r":
+            lines.append(self._remainder)
+            self._remainder = ""
+
+        return [line[:-2] if line.endswith("\r\n") else line[:-1] for line in lines]
+
+    def close(self: "LineSplitter") -> List[str]:
+        """Signal the end of the document, and return any remaining lines.
+
+        :returns: The remaining lines, without line terminators.
+        """
+        if self._decoder is not None:
+            self._remainder += self._decoder.decode(b"", final=True)
+            self._decoder = None
+
+        lines, self._remainder = self._remainder.splitlines(), ""
+        return lines
+
+
+def iter_lines(
+    stream: Union[TextIO, BinaryIO],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    encoding: str = "utf-8",
+) -> Iterator[str]:
+    """Lazily split a text or binary stream into lines.
+
+    Lines are split using the same rules as `str.splitlines`, so iterating over a
+    stream yields exactly the same lines as `stream.read().splitlines()` would, but only
+    one chunk (plus any partial line) is held in memory at a time.
+
+    :param stream: A readable text or binary file-like object. Binary streams are
+    decoded incrementally, so multibyte characters may span chunk boundaries.
+    :param chunk_size: The number of characters (or bytes) to read at a time.
+    :param encoding: The encoding to use when the stream returns bytes.
+
+    :returns: An iterator over the lines of the stream, without line terminators.
+    """
+    line_splitter = LineSplitter(encoding)
+
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield from line_splitter.feed(chunk)
+
+    yield from line_splitter.close()
+
+
+@contextmanager
+def open_mmap(file_path: StringOrPath) -> Iterator[Union[bytes, mmap.mmap]]:
+    """Memory-map a file for reading, as a context manager.
+
+    Empty files cannot be memory-mapped, so an empty bytes object is returned for
+    them instead. Any iterators over the mapping (e.g. from `iter_byte_lines`) must
+    be closed before the context exits.
+
+    :param file_path: Path to the file.
+
+    :returns: A read-only memory map of the file, or b"" if the file is empty.
+    """
+    with open(file_path, "rb") as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            yield b""
+            return
+
+        with buffer:
+            yield buffer
+
+
+def iter_byte_lines(buffer: Union[bytes, mmap.mmap]) -> Iterator[bytes]:
+    r"""Lazily split a bytes-like buffer into lines.
+
+    Lines are split using the same rules as `bytes.splitlines` (i.e. on "\n", "\r"
+    and "\r\n"), but the line boundaries are found with a compiled pattern that
+    runs directly over the buffer. Only one line is copied out of the buffer at a time,
+    which makes this suitable for memory-mapped files.
+
+    :param buffer: The bytes, or memory-mapped file, to split.
+
+    :returns: An iterator over the lines of the buffer, without line terminators.
+    """
+    for start, end, _ in iter_byte_line_spans(buffer):
+        yield buffer[start:end]
+
+
+def iter_byte_line_spans(
+    buffer: Union[bytes, mmap.mmap]
+) -> Iterator[Tuple[int, int, int]]:
+    """Lazily find the offsets of each line in a bytes-like buffer.
+
+    Lines are split in the same way as `iter_byte_lines`.
+
+    :param buffer: The bytes, or memory-mapped file, to split.
+
+    :returns: An iterator of tuples, where the first value is the offset of the start
+    of the line, the second is the offset of the end of the line (excluding the line
+    terminator) and the third is the offset of the start of the next line.
+    """
+    start = 0
+    for match in BYTE_LINE_BOUNDARY_PATTERN.finditer(buffer):
+        yield start, match.start(), match.end()
+        start = match.end()
+
+    if start < len(buffer):
+        yield start, len(buffer), len(buffer)
+
+
 def replace_keys(
     data: List[Dict[str, str]], new_keys: List[str]
 ) -> List[Dict[str, str]]:
@@ -0,0 +1,335 @@
+"""Convert columns of raw gene values to floats in bulk.
+
+Parsing normally converts each value string to a float on its own, as each
+GenesetValueInput (or GeneValueColumns.append) is validated. The functions in this
+module instead collect a whole column of raw values and convert it with a single NumPy
+call, reporting any values which could not be converted as a mask, along with their
+line numbers.
+
+Values are converted exactly as GeneValue converts them: scientific notation (e.g.
+"1e-5"), "nan" and "inf" / "Infinity" (in any case, with an optional sign) are
+accepted. "NA" and other missing value markers are rejected, unless they are given as
+`na_values`, in which case they are converted to NaN and reported in the `na` mask.
+NA_VALUES is a typical set of missing value markers. An empty Excel cell (None) is
+treated as "".
+
+Conversion Class:
+- ValueConversion: The result of converting a column of raw values.
+
+Column Class:
+- RawGeneValues: Gene symbols and their raw values, collected for bulk conversion
+(used by `geneweaver.core.parse.batch.BatchParser` when vectorized).
+
+Conversion Functions:
+- convert_values: Convert a column of raw values to floats.
+- convert_each: Convert each value in a column on its own, to find which ones fail.
+- convert_value: Convert a single raw value to a float.
+- is_ascii: Check that every string in a column of raw values is ASCII.
+- convert_dict_column: Convert a column of the rows read by `csv.read_to_dict` or
+`xlsx.read_to_dict`.
+- dict_rows_to_gene_values: Convert the rows read by `csv.read_to_dict` or
+`xlsx.read_to_dict` to GeneValueColumns.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from geneweaver.core.parse.exceptions import ValueConversionError
+from geneweaver.core.schema.gene import GeneValue, GeneValueColumns
+
+# Typical missing value markers, which can be passed as `na_values`.
+NA_VALUES = ("NA", "N/A", "#N/A", "NULL", "")
+
+
+class ValueConversion:
+    """The result of converting a column of raw values to floats.
+
+    `values` holds the converted float64 values. Values which could not be converted
+    are NaN in `values`, and True in the `failed` mask. Missing values (see
+    `na_values`) are NaN in `values`, and True in the `na` mask.
+    """
+
+    __slots__ = ("raw_values", "values", "failed", "na", "line_numbers")
+
+    def __init__(
+        self: "ValueConversion",
+        raw_values: np.ndarray,
+        values: np.ndarray,
+        failed: np.ndarray,
+        na: np.ndarray,
+        line_numbers: np.ndarray,
+    ) -> None:
+        """Initialize the conversion result.
+
+        :param raw_values: The raw values, as an object array.
+        :param values: The converted values, as a float64 array.
+        :param failed: A boolean mask of the values which could not be converted.
+        :param na: A boolean mask of the missing values.
+        :param line_numbers: The line number of each value.
+        """
+        self.raw_values = raw_values
+        self.values = values
+        self.failed = failed
+        self.na = na
+        self.line_numbers = line_numbers
+
+    def __len__(self: "ValueConversion") -> int:
+        """Return the number of values."""
+        return len(self.values)  # noqa: PD011
+
+    @property
+    def ok(self: "ValueConversion") -> bool:
+        """Whether every value was converted (or was a missing value)."""
+        return not self.failed.any()
+
+    @property
+    def failed_line_numbers(self: "ValueConversion") -> List[int]:
+        """The line numbers of the values which could not be converted."""
+        return self.line_numbers[self.failed].tolist()
+
+    def raise_for_failures(self: "ValueConversion") -> None:
+        """Raise an error if any value could not be converted.
+
+        :raises ValueConversionError: If any value could not be converted, listing the
+        line number and raw value of each one.
+        """
+        if not self.ok:
+            raise ValueConversionError(
+                list(
+                    zip(  # noqa: B905
+                        self.failed_line_numbers, self.raw_values[self.failed].tolist()
+                    )
+                )
+            )
+
+
+class RawGeneValues:
+    """Gene symbols and their raw values, collected for bulk conversion.
+
+    This is filled in the same way as a GeneValueColumns, but the values are kept as
+    strings (with the line number of each one) until `to_columns` converts them all at
+    once.
+    """
+
+    __slots__ = ("symbols", "raw_values", "line_numbers", "na_values")
+
+    def __init__(self: "RawGeneValues", na_values: Iterable[str] = ()) -> None:
+        """Initialize the raw values.
+
+        :param na_values: Raw values which mark a missing value, see `convert_values`.
+        """
+        self.symbols = []
+        self.raw_values = []
+        self.line_numbers = []
+        self.na_values = tuple(na_values)
+
+    def append(self: "RawGeneValues", symbol: str, value: str) -> None:
+        """Add a gene value to the end of the raw values.
+
+        The line number of the value must be added to `line_numbers` separately.
+
+        :param symbol: The gene symbol.
+        :param value: The raw gene value.
+        """
+        self.symbols.append(symbol)
+        self.raw_values.append(value)
+
+    def to_columns(self: "RawGeneValues") -> GeneValueColumns:
+        """Convert the raw values, see `convert_values`.
+
+        :returns: The gene values, as columns.
+
+        :raises ValueConversionError: If any value could not be converted.
+        """
+        conversion = convert_values(
+            self.raw_values, self.line_numbers or None, self.na_values
+        )
+        conversion.raise_for_failures()
+
+        # The float64 bytes are copied straight into the columns' array("d").
+        values = conversion.values.tobytes()  # noqa: PD011
+        return GeneValueColumns(self.symbols, values)
+
+    def __len__(self: "RawGeneValues") -> int:
+        """Return the number of gene values."""
+        return len(self.symbols)
+
+    def __getitem__(self: "RawGeneValues", idx: slice) -> "RawGeneValues":
+        """Get a slice of the raw values, with the same NA values.
+
+        :param idx: The slice.
+
+        :returns: The sliced raw values.
+        """
+        sliced = RawGeneValues(self.na_values)
+        sliced.symbols = self.symbols[idx]
+        sliced.raw_values = self.raw_values[idx]
+        sliced.line_numbers = self.line_numbers[idx]
+        return sliced
+
+
+def convert_values(
+    raw_values: Sequence[Any],
+    line_numbers: Optional[Sequence[int]] = None,
+    na_values: Iterable[str] = (),
+) -> ValueConversion:
+    """Convert a column of raw values to floats.
+
+    The column is converted with a single NumPy call. Only if that fails (or a value
+    is a string that float() and GeneValue might disagree on) is each value converted
+    on its own, to find which ones failed.
+
+    :param raw_values: The raw values, usually strings. Numbers are also accepted, as
+    read from an Excel file.
+    :param line_numbers: The line number of each value, used to report failures.
+    Defaults to the position of each value, starting at 1.
+    :param na_values: Raw values which mark a missing value. These are converted to
+    NaN, and reported in the `na` mask. By default there are no missing value markers,
+    as in GeneValue, see NA_VALUES.
+
+    :returns: The converted values, and masks of the failed and missing values.
+    """
+    raw = np.empty(len(raw_values), dtype=object)
+    raw[:] = raw_values
+    line_numbers = (
+        np.arange(1, len(raw) + 1)
+        if line_numbers is None
+        else np.asarray(line_numbers, dtype=np.int64)
+    )
+
+    # An empty Excel cell is converted (or rejected) as "", which NumPy would
+    # otherwise convert to NaN. The raw values are kept as they were for reporting.
+    cleaned = raw
+    empty = np.fromiter((value is None for value in raw), dtype=bool, count=len(raw))
+    if empty.any():
+        cleaned = raw.copy()
+        cleaned[empty] = ""
+
+    na = np.zeros(len(raw), dtype=bool)
+    na_values = frozenset(na_values)
+    if na_values:
+        na = np.fromiter(
+            (value in na_values for value in cleaned), dtype=bool, count=len(raw)
+        )
+
+    to_convert = cleaned[~na] if na.any() else cleaned
+    try:
+        if not is_ascii(to_convert):
+            raise ValueError("Non-ASCII values are converted one at a time.")
+        converted = to_convert.astype(np.float64)
+        converted_failed = np.zeros(len(converted), dtype=bool)
+    except (TypeError, ValueError, OverflowError):
+        converted, converted_failed = convert_each(to_convert)
+
+    values = np.full(len(raw), np.nan)
+    failed = np.zeros(len(raw), dtype=bool)
+    values[~na], failed[~na] = converted, converted_failed
+
+    return ValueConversion(raw, values, failed, na, line_numbers)
+
+
+def convert_each(raw_values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Convert each raw value on its own, see `convert_value`.
+
+    :param raw_values: The raw values, as an object array.
+
+    :returns: A tuple of the converted values (NaN where conversion failed), and a
+    boolean mask of the values which could not be converted.
+    """
+    values = np.full(len(raw_values), np.nan)
+    failed = np.zeros(len(raw_values), dtype=bool)
+    for idx, raw_value in enumerate(raw_values):
+        try:
+            values[idx] = convert_value(raw_value)
+        except ValueError:
+            failed[idx] = True
+    return values, failed
+
+
+def convert_value(raw_value: Any) -> float:  # noqa: ANN401
+    """Convert a single raw value to a float, exactly as GeneValue converts it.
+
+    :param raw_value: The raw value.
+
+    :returns: The value, as a float.
+
+    :raises ValueError: If the value cannot be converted (a pydantic ValidationError,
+    which is a ValueError).
+    """
+    # float() accepts the same ASCII strings and numbers as GeneValue, and is much
+    # faster. Any other input is converted (or rejected) by GeneValue itself.
+    if (isinstance(raw_value, str) and raw_value.isascii()) or type(raw_value) in (
+        int,
+        float,
+    ):
+        try:
+            return float(raw_value)
+        except (ValueError, OverflowError):
+            pass
+    return GeneValue(symbol="", value=raw_value).value
+
+
+def is_ascii(raw_values: np.ndarray) -> bool:
+    """Check that every string in an array of raw values is ASCII.
+
+    :param raw_values: The raw values, as an object array.
+
+    :returns: False if any value is a non-ASCII string, True otherwise.
+    """
+    try:
+        return "".join(raw_values).isascii()
+    except TypeError:
+        return all(value.isascii() for value in raw_values if isinstance(value, str))
+
+
+def convert_dict_column(
+    rows: List[Dict[str, Any]],
+    key: str,
+    start_row: int = 0,
+    na_values: Iterable[str] = (),
+) -> ValueConversion:
+    """Convert a column of the rows read by `csv.read_to_dict` or `xlsx.read_to_dict`.
+
+    :param rows: The rows, as read by `read_to_dict`.
+    :param key: The column to convert.
+    :param start_row: The `start_row` the rows were read with, so that failures are
+    reported with the line number of their row in the file (or sheet).
+    :param na_values: Raw values which mark a missing value, see `convert_values`.
+
+    :returns: The converted values, and masks of the failed and missing values.
+    """
+    # The header is on line start_row + 1, so the first row is on start_row + 2.
+    first_line_number = start_row + 2
+    return convert_values(
+        [row.get(key) for row in rows],
+        range(first_line_number, first_line_number + len(rows)),
+        na_values,
+    )
+
+
+def dict_rows_to_gene_values(
+    rows: List[Dict[str, Any]],
+    symbol_key: str,
+    value_key: str,
+    start_row: int = 0,
+    na_values: Iterable[str] = (),
+) -> GeneValueColumns:
+    """Convert the rows read by `csv.read_to_dict` or `xlsx.read_to_dict` to columns.
+
+    :param rows: The rows, as read by `read_to_dict`.
+    :param symbol_key: The column containing the gene symbols.
+    :param value_key: The column containing the gene values.
+    :param start_row: The `start_row` the rows were read with, see
+    `convert_dict_column`.
+    :param na_values: Raw values which mark a missing value, see `convert_values`.
+
+    :returns: The gene values, as columns.
+
+    :raises ValueConversionError: If any value could not be converted, listing the line
+    number and raw value of each one.
+    """
+    conversion = convert_dict_column(rows, value_key, start_row, na_values)
+    conversion.raise_for_failures()
+
+    values = conversion.values.tobytes()  # noqa: PD011
+    return GeneValueColumns([str(row[symbol_key]) for row in rows], values)
@@ -1,7 +1,26 @@
 """Batch upload file rendering."""
 
-from typing import List
+import codecs
+import io
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    TextIO,
+    Union,
+)
 
+from geneweaver.core.parse.utils import is_binary_stream
+from geneweaver.core.render.chunks import DEFAULT_CHUNK_SIZE, iter_encoded_chunks
+from geneweaver.core.render.gene_list import (
+    ROWS_PER_PIECE,
+    gene_list_str,
+    iter_gene_list_pieces,
+    rows_per_chunk,
+)
 from geneweaver.core.schema.batch import (
     HEADER_CHARACTERS,
     IGNORE_CHARACTERS,
@@ -13,18 +32,111 @@ from geneweaver.core.schema.batch import (
 CHAR_MAP = HEADER_CHARACTERS | SPACE_SEPARATED_HEADER_CHARACTERS | IGNORE_CHARACTERS
 
 
-def format_batch_file(genesets: List[BatchUploadGeneset]) -> str:
+def format_batch_file(genesets: Iterable[BatchUploadGeneset]) -> str:
     """Format a batch upload file from a list of genesets.
 
     :param genesets: A list of genesets to format.
 
     :return: A string containing the genesets in batch upload format.
     """
-    data_str = ""
+    output = io.StringIO()
+    write_batch_file(genesets, output)
+    return output.getvalue()
+
+
+def write_batch_file(
+    genesets: Iterable[BatchUploadGeneset],
+    fileobj: Union[TextIO, BinaryIO],
+    encoding: str = "utf-8",
+) -> int:
+    """Write genesets to a text or binary stream in batch upload format.
+
+    Each geneset is formatted and written as soon as it is taken from `genesets`, so a
+    generator of genesets can be exported while only holding one geneset in memory.
+
+    :param genesets: An iterable of genesets to write.
+    :param fileobj: A writable text or binary file-like object.
+    :param encoding: The encoding to use for binary streams.
+
+    :return: The number of genesets written.
+    """
+    write = text_writer(fileobj, encoding)
+    count = 0
     for geneset in genesets:
-        data_str += format_geneset(geneset)
-        data_str += "\n"
-    return data_str
+        write(format_geneset(geneset))
+        write("\n")
+        count += 1
+    return count
+
+
+def iter_batch_file_chunks(
+    genesets: Iterable[BatchUploadGeneset],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    value_format: Optional[str] = None,
+) -> Iterator[bytes]:
+    """Format a batch upload file from genesets, as UTF-8 encoded chunks.
+
+    The chunks join up to the same text as `format_batch_file`, but each geneset's
+    values are formatted as the chunks are read, so memory stays bounded however large
+    the genesets are.
+
+    :param genesets: An iterable of genesets to format.
+    :param chunk_size: The approximate size of each chunk, see `iter_encoded_chunks`.
+    :param value_format: A printf-style format for the values, see
+    `format_gene_columns`.
+
+    :return: An iterator over the encoded chunks.
+    """
+    return iter_encoded_chunks(
+        iter_batch_file_pieces(genesets, value_format, rows_per_chunk(chunk_size)),
+        chunk_size,
+    )
+
+
+def iter_batch_file_pieces(
+    genesets: Iterable[BatchUploadGeneset],
+    value_format: Optional[str] = None,
+    rows_per_piece: int = ROWS_PER_PIECE,
+) -> Iterator[str]:
+    """Format a batch upload file from genesets, one piece at a time.
+
+    :param genesets: An iterable of genesets to format.
+    :param value_format: A printf-style format for the values, see
+    `format_gene_columns`.
+    :param rows_per_piece: The maximum number of value lines in each piece.
+
+    :return: An iterator over the geneset metadata and blocks of value lines, which
+    join up to the same text as `format_batch_file`.
+    """
+    for geneset in genesets:
+        yield format_geneset_metadata(geneset)
+        yield from iter_gene_list_pieces(
+            geneset.values, "\t", value_format, rows_per_piece  # noqa: PD011
+        )
+        yield "\n"
+
+
+def text_writer(
+    fileobj: Union[TextIO, BinaryIO], encoding: str = "utf-8"
+) -> Callable[[str], Any]:
+    """Get a function which writes strings to a text or binary stream.
+
+    :param fileobj: A writable text or binary file-like object.
+    :param encoding: The encoding to use for binary streams.
+
+    :return: A function which encodes each string before writing it for binary
+    streams, otherwise the stream's write method.
+    """
+    if not is_binary_stream(fileobj):
+        return fileobj.write
+
+    # An incremental encoder only writes a byte order mark (if any) once.
+    encode = codecs.getincrementalencoder(encoding)().encode
+
+    def write_encoded(data: str) -> Any:  # noqa: ANN401
+        return fileobj.write(encode(data))
+
+    return write_encoded
 
 
 def format_geneset_metadata(geneset: BatchUploadGeneset) -> str:
@@ -45,14 +157,18 @@ def format_geneset_metadata(geneset: BatchUploadGeneset) -> str:
     return data_str
 
 
-def format_geneset_values(geneset: BatchUploadGeneset) -> str:
+def format_geneset_values(
+    geneset: BatchUploadGeneset, value_format: Optional[str] = None
+) -> str:
     """Format geneset values for a batch upload file.
 
     :param geneset: The geneset to format.
+    :param value_format: A printf-style format for the values, e.g. "%.6g", see
+    `format_gene_columns`.
 
     :return: A string containing the geneset values in batch upload format.
     """
-    return "\n".join((str(gene_value) for gene_value in geneset.values))  # noqa: PD011
+    return gene_list_str(geneset.values, "\t", value_format)  # noqa: PD011
 
 
 def format_geneset(geneset: BatchUploadGeneset) -> str:
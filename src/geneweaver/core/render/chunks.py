@@ -0,0 +1,31 @@
+"""Render output as a stream of encoded chunks, e.g. for HTTP streaming responses."""
+
+from typing import Iterable, Iterator
+
+# The default (approximate) size of each chunk.
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def iter_encoded_chunks(
+    pieces: Iterable[str], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Coalesce pieces of text into UTF-8 encoded chunks.
+
+    Pieces are buffered until they add up to at least `chunk_size` characters, so each
+    chunk is roughly `chunk_size` bytes for ASCII text. A single piece is never split,
+    so a chunk may be larger if a piece is.
+
+    :param pieces: The pieces of text, in order.
+    :param chunk_size: The number of characters to buffer before yielding a chunk.
+
+    :return: An iterator over the UTF-8 encoded chunks.
+    """
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+    if size:
+        yield "".join(buffer).encode("utf-8")
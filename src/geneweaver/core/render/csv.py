@@ -1,26 +1,67 @@
 """Render data as CSV files."""
 
-from geneweaver.core.render.gene_list import gene_list_str
+from itertools import chain
+from typing import Iterator, Optional
+
+from geneweaver.core.render.chunks import DEFAULT_CHUNK_SIZE, iter_encoded_chunks
+from geneweaver.core.render.gene_list import (
+    gene_list_str,
+    iter_gene_list_pieces,
+    rows_per_chunk,
+)
 from geneweaver.core.schema.batch import BatchUploadGeneset
 
 
 def format_csv_file(
-    geneset: BatchUploadGeneset, sep: str = ",", header_prefix: str = "#"
+    geneset: BatchUploadGeneset,
+    sep: str = ",",
+    header_prefix: str = "#",
+    value_format: Optional[str] = None,
 ) -> str:
     """Format a geneset for a CSV file.
 
     :param geneset: The geneset to format.
     :param sep: The separator to use between values.
     :param header_prefix: The prefix to use for the header lines.
+    :param value_format: A printf-style format for the values, e.g. "%.6g", see
+    `format_gene_columns`.
 
     :return: A string containing the geneset in CSV format.
     """
     data_str = format_csv_metadata(geneset, sep, header_prefix)
     data_str += f"gene{sep}value\n"
-    data_str += gene_list_str(geneset.values, sep)
+    data_str += gene_list_str(geneset.values, sep, value_format)
     return data_str
 
 
+def iter_csv_file_chunks(
+    geneset: BatchUploadGeneset,
+    sep: str = ",",
+    header_prefix: str = "#",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    value_format: Optional[str] = None,
+) -> Iterator[bytes]:
+    """Format a geneset for a CSV file, as UTF-8 encoded chunks.
+
+    The chunks join up to the same text as `format_csv_file`, but the values are
+    formatted as the chunks are read, rather than all at once.
+
+    :param geneset: The geneset to format.
+    :param sep: The separator to use between values.
+    :param header_prefix: The prefix to use for the header lines.
+    :param chunk_size: The approximate size of each chunk, see `iter_encoded_chunks`.
+    :param value_format: A printf-style format for the values, see
+    `format_gene_columns`.
+
+    :return: An iterator over the encoded chunks.
+    """
+    header = format_csv_metadata(geneset, sep, header_prefix) + f"gene{sep}value\n"
+    values = iter_gene_list_pieces(
+        geneset.values, sep, value_format, rows_per_chunk(chunk_size)
+    )
+    return iter_encoded_chunks(chain((header,), values), chunk_size)
+
+
 def format_csv_metadata(
     geneset: BatchUploadGeneset, sep: str = ",", header_prefix: str = "#"
 ) -> str:
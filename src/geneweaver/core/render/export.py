@@ -0,0 +1,311 @@
+"""Export genesets to one file each, rendered and written across a process pool."""
+
+import os
+import tempfile
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from enum import Enum
+from functools import partial
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Set, Tuple
+
+from geneweaver.core.render.batch import iter_batch_file_pieces
+from geneweaver.core.render.csv import format_csv_file
+from geneweaver.core.render.gene_list import gene_list_str
+from geneweaver.core.schema.batch import BatchUploadGeneset
+from geneweaver.core.types import StringOrPath
+
+# The default number of genesets exported by each task, and maximum number of tasks
+# submitted to the executor at once.
+DEFAULT_CHUNKSIZE = 16
+DEFAULT_MAX_IN_FLIGHT = 8
+
+# The default number of times a failed write is retried, and the delay before the
+# first retry (which doubles after each attempt).
+DEFAULT_RETRIES = 2
+DEFAULT_RETRY_DELAY = 0.1
+
+
+class ExportFormat(str, Enum):
+    """Enum for the file formats genesets can be exported to."""
+
+    BATCH = "batch"
+    CSV = "csv"
+    GENE_LIST = "gene_list"
+
+
+def export_genesets(
+    genesets: Iterable[BatchUploadGeneset],
+    filename_template: str,
+    export_format: ExportFormat = ExportFormat.BATCH,
+    directory: Optional[StringOrPath] = None,
+    max_workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    retries: int = DEFAULT_RETRIES,
+    progress: Optional[Callable[[int, Path], Any]] = None,
+    value_format: Optional[str] = None,
+) -> List[Path]:
+    """Export each geneset to its own file, in parallel.
+
+    Genesets are sent to the workers in tasks of `chunksize` genesets, and are only
+    taken from `genesets` as earlier tasks finish, so that at most `max_in_flight *
+    chunksize` genesets are held at once. Each file is written atomically, so a failed
+    or interrupted export never leaves a partial file.
+
+    Genesets are pickled to the worker processes, so ColumnarBatchUploadGeneset
+    instances are much faster to export than lists of GeneValue.
+
+    :param genesets: An iterable of genesets to export.
+    :param filename_template: A `str.format` template for each file name, relative to
+    the directory. It is formatted with the geneset's index (`{index}`) and its fields,
+    e.g. "{index:05d}-{abbreviation}.gw".
+    :param export_format: The format to render each geneset in.
+    :param directory: The directory to write the files to, which is created if needed.
+    Defaults to the current directory.
+    :param max_workers: The maximum number of processes to use, when no executor is
+    given. Defaults to the number of processors on the machine.
+    :param executor: An executor to render and write the files in. Defaults to a new
+    ProcessPoolExecutor.
+    :param chunksize: The number of genesets to export in each task. Increasing this
+    reduces overhead for many small genesets.
+    :param max_in_flight: The maximum number of tasks submitted to the executor at once.
+    :param retries: The number of times to retry writing a file, after an OSError.
+    :param progress: A function called as each file is written, with the number of
+    files written so far and the path of the file.
+    :param value_format: A printf-style format for the values, e.g. "%.6g", see
+    `geneweaver.core.render.gene_list.format_gene_columns`.
+
+    :return: The path of each file, in the order of the genesets.
+
+    :raises ValueError: If chunksize or max_in_flight is less than 1, or a file name is
+    outside of the directory or is the same as another geneset's.
+    :raises OSError: If a file could not be written after retrying.
+    """
+    if chunksize < 1 or max_in_flight < 1:
+        raise ValueError(
+            "The chunksize and maximum tasks in flight must be at least 1."
+        )
+
+    directory = Path.cwd() if directory is None else Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    export = partial(
+        export_geneset_chunk,
+        export_format=ExportFormat(export_format),
+        retries=retries,
+        value_format=value_format,
+    )
+    jobs = iter_export_jobs(genesets, filename_template, directory)
+    options = (chunksize, max_in_flight, progress)
+
+    if executor is not None:
+        return run_export_jobs(executor, export, jobs, *options)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return run_export_jobs(executor, export, jobs, *options)
+
+
+def run_export_jobs(
+    executor: Executor,
+    export: Callable[[List[Tuple[BatchUploadGeneset, Path]]], List[Path]],
+    jobs: Iterable[Tuple[BatchUploadGeneset, Path]],
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    progress: Optional[Callable[[int, Path], Any]] = None,
+) -> List[Path]:
+    """Run export jobs in an executor, in chunks, with a bounded number in flight.
+
+    If any chunk fails, the chunks which have not started are cancelled, and its error
+    is raised.
+
+    :param executor: The executor to run the chunks of jobs in.
+    :param export: The function which exports a chunk of genesets to their paths.
+    :param jobs: An iterable of genesets and the paths to export them to.
+    :param chunksize: The number of jobs in each chunk.
+    :param max_in_flight: The maximum number of chunks submitted to the executor at
+    once.
+    :param progress: A function called as each job finishes, with the number of jobs
+    finished so far and the path of the file.
+
+    :return: The path of each job, in the order of the jobs.
+    """
+    jobs = iter(jobs)
+    paths: List[Path] = []
+    pending: Set[Future] = set()
+    finished = 0
+
+    def collect() -> None:
+        nonlocal finished
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            pending.remove(future)
+            for path in future.result():
+                finished += 1
+                if progress is not None:
+                    progress(finished, path)
+
+    try:
+        for chunk in iter(lambda: list(islice(jobs, chunksize)), []):
+            if len(pending) >= max_in_flight:
+                collect()
+            pending.add(executor.submit(export, chunk))
+            paths.extend(path for _, path in chunk)
+        while pending:
+            collect()
+    finally:
+        for future in pending:
+            future.cancel()
+
+    return paths
+
+
+def iter_export_jobs(
+    genesets: Iterable[BatchUploadGeneset], filename_template: str, directory: Path
+) -> Iterator[Tuple[BatchUploadGeneset, Path]]:
+    """Pair each geneset with the path to export it to.
+
+    :param genesets: An iterable of genesets.
+    :param filename_template: A `str.format` template for each file name, see
+    `export_genesets`.
+    :param directory: The directory of the files.
+
+    :return: An iterator over the genesets and their paths.
+
+    :raises ValueError: If a file name is outside of the directory, or is the same as
+    another geneset's.
+    """
+    seen_paths = set()
+    for index, geneset in enumerate(genesets):
+        path = export_path(geneset, index, filename_template, directory)
+        if path in seen_paths:
+            raise ValueError(f"More than one geneset would be exported to {path}.")
+        seen_paths.add(path)
+        yield geneset, path
+
+
+def export_path(
+    geneset: BatchUploadGeneset,
+    index: int,
+    filename_template: str,
+    directory: Path,
+) -> Path:
+    """Get the path to export a geneset to.
+
+    :param geneset: The geneset.
+    :param index: The index of the geneset.
+    :param filename_template: A `str.format` template for the file name, see
+    `export_genesets`.
+    :param directory: The directory of the file. Any subdirectories in the file name
+    are created.
+
+    :return: The path of the file.
+
+    :raises ValueError: If the file name is outside of the directory.
+    """
+    fields = {key: value for key, value in geneset if key != "values"}
+    filename = Path(filename_template.format(index=index, **fields))
+    if not filename.name or filename.is_absolute() or ".." in filename.parts:
+        raise ValueError(
+            f"Export file name {str(filename)!r} is outside of {directory}."
+        )
+    path = directory / filename
+    if filename.parent != Path():
+        path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def export_geneset_chunk(
+    jobs: List[Tuple[BatchUploadGeneset, Path]],
+    export_format: ExportFormat = ExportFormat.BATCH,
+    retries: int = DEFAULT_RETRIES,
+    value_format: Optional[str] = None,
+) -> List[Path]:
+    """Export a chunk of genesets, each to its own file, see `export_geneset`.
+
+    :param jobs: The genesets, and the paths to export them to.
+    :param export_format: The format to render the genesets in.
+    :param retries: The number of times to retry writing each file.
+    :param value_format: A printf-style format for the values.
+
+    :return: The path of each file.
+    """
+    return [
+        export_geneset(geneset, path, export_format, retries, value_format)
+        for geneset, path in jobs
+    ]
+
+
+def export_geneset(
+    geneset: BatchUploadGeneset,
+    path: Path,
+    export_format: ExportFormat = ExportFormat.BATCH,
+    retries: int = DEFAULT_RETRIES,
+    value_format: Optional[str] = None,
+) -> Path:
+    """Render a geneset, and write it to a file atomically.
+
+    The geneset is only rendered once. Writing it is retried (after a short, doubling
+    delay) if it raises an OSError, e.g. on a busy network file system.
+
+    :param geneset: The geneset to export.
+    :param path: The path of the file.
+    :param export_format: The format to render the geneset in.
+    :param retries: The number of times to retry writing the file.
+    :param value_format: A printf-style format for the values.
+
+    :return: The path of the file.
+    """
+    data = render_geneset(geneset, export_format, value_format).encode("utf-8")
+    for attempt in range(retries + 1):
+        try:
+            write_file_atomic(path, data)
+            return path
+        except OSError:
+            if attempt == retries:
+                raise
+            time.sleep(DEFAULT_RETRY_DELAY * 2**attempt)
+    return path
+
+
+def render_geneset(
+    geneset: BatchUploadGeneset,
+    export_format: ExportFormat = ExportFormat.BATCH,
+    value_format: Optional[str] = None,
+) -> str:
+    """Render a geneset as the contents of a file.
+
+    :param geneset: The geneset to render.
+    :param export_format: The format to render the geneset in.
+    :param value_format: A printf-style format for the values.
+
+    :return: The same text as `format_batch_file`, `format_csv_file` or
+    `gene_list_str` for the geneset.
+    """
+    if export_format is ExportFormat.CSV:
+        return format_csv_file(geneset, value_format=value_format)
+    if export_format is ExportFormat.GENE_LIST:
+        return gene_list_str(geneset.values, "\t", value_format)  # noqa: PD011
+    return "".join(iter_batch_file_pieces([geneset], value_format))
+
+
+def write_file_atomic(path: Path, data: bytes) -> None:
+    """Write a file atomically, so that readers never see a partial file.
+
+    :param path: The path of the file, which is replaced if it exists.
+    :param data: The contents of the file.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
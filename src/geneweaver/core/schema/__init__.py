@@ -2,7 +2,7 @@
 
 # ruff: noqa: F401
 from .api_response import CollectionResponse, Paging, PagingLinks
-from .gene import Gene, GeneValue
+from .gene import Gene, GeneValue, GeneValueColumns
 from .geneset import Geneset, GenesetGenes, GenesetUpload
 from .group import Group, UserAdminGroup
 from .project import Project, ProjectCreate
@@ -5,7 +5,7 @@ from typing import Any, List, Optional, Type, Union
 
 from geneweaver.core.enum import GeneIdentifierInt, MicroarrayInt, SpeciesInt
 from geneweaver.core.parse.score import parse_score
-from geneweaver.core.schema.gene import GeneValue
+from geneweaver.core.schema.gene import GeneValue, GeneValueColumns
 from geneweaver.core.schema.messages import MessageResponse
 from geneweaver.core.schema.score import GenesetScoreType
 from pydantic import BaseModel, field_validator, model_validator
@@ -144,3 +144,58 @@ class BatchUploadGeneset(BaseModel):
             # It should default to private if not specified.
             self.curation_id = 5 if self.private else 4
         return self
+
+
+class ColumnarBatchUploadGeneset(BatchUploadGeneset):
+    """Class for defining a batch upload geneset with its values stored as columns.
+
+    The values can be read like a list of GeneValue, which are materialized on demand.
+    """
+
+    values: GeneValueColumns
+
+    def to_geneset(self) -> BatchUploadGeneset:
+        """Materialize the values, as a regular BatchUploadGeneset."""
+        return BatchUploadGeneset.model_construct(
+            _fields_set=self.model_fields_set,
+            **{**dict(self), "values": self.values.to_gene_values()},
+        )
+
+
+class BatchGenesetSummary(BaseModel):
+    """Class for summarising a geneset in a batch file, without its values.
+
+    Header values are kept as they appear in the batch file, and are not validated.
+    """
+
+    abbreviation: str
+    name: str
+    description: str = ""
+    species: Optional[str] = None
+    score: Optional[str] = None
+    gene_id_type: Optional[str] = None
+    value_count: int
+
+
+class BatchValidationIssue(BaseModel):
+    """Class for defining a single problem found while validating a batch file."""
+
+    line_number: int
+    offset: int
+    geneset_index: int
+    error: str
+    message: str
+
+
+class BatchValidationReport(BaseModel):
+    """Class for defining the result of validating a whole batch file."""
+
+    issues: List[BatchValidationIssue] = []
+    geneset_count: int = 0
+    line_count: int = 0
+    truncated: bool = False
+
+    @property
+    def is_valid(self) -> bool:
+        """Whether the batch file is free of issues."""
+        return not self.issues
@@ -1,10 +1,16 @@
 """Gene schema."""
 
 import datetime
-from typing import Any, List, Optional
+from array import array
+from typing import Any, Iterable, Iterator, List, Optional, Type, Union, overload
 
 from geneweaver.core.enum import GeneIdentifier, Species
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, GetCoreSchemaHandler
+from pydantic_core import core_schema
+
+# Bound once, as GeneValue.from_typed is called for every gene of a trusted batch file.
+_object_new = object.__new__
+_object_setattr = object.__setattr__
 
 
 class Gene(BaseModel):
@@ -37,6 +43,26 @@ class GeneValue(BaseModel):
     value: float
     model_config = ConfigDict(frozen=True)
 
+    @classmethod
+    def from_typed(cls: Type["GeneValue"], symbol: str, value: float) -> "GeneValue":
+        """Build a gene value from a str symbol and a float value, without validation.
+
+        This sets the same attributes as `model_construct`, but skips its handling of
+        defaults and aliases (which GeneValue does not have), so it is much faster. The
+        symbol and value must already have the right types.
+
+        :param symbol: The gene symbol.
+        :param value: The gene value.
+
+        :returns: The gene value.
+        """
+        gene_value = _object_new(cls)
+        _object_setattr(gene_value, "__dict__", {"symbol": symbol, "value": value})
+        _object_setattr(gene_value, "__pydantic_fields_set__", {"symbol", "value"})
+        _object_setattr(gene_value, "__pydantic_extra__", None)
+        _object_setattr(gene_value, "__pydantic_private__", None)
+        return gene_value
+
     def __str__(self: "GeneValue") -> str:
         """Return the gene symbol."""
         return f"{self.symbol}\t{self.value}"
@@ -53,6 +79,151 @@ class GeneValue(BaseModel):
         return False
 
 
+class GeneValueColumns:
+    """A compact, column-oriented sequence of gene values.
+
+    Symbols are kept in a list and values in an `array("d")` of float64, rather than
+    as one GeneValue model per gene. Indexing or iterating materializes GeneValue
+    objects on demand, so this can be used wherever a sequence of GeneValue is read.
+
+    Unlike GeneValue (and so lists of GeneValue), which compare gene symbols only,
+    columns are equal only if their symbols and values are all equal. Columns are never
+    equal to a list of GeneValue; compare `model_dump()` output of genesets (or
+    `to_gene_values()` as pairs) to compare the two forms.
+    """
+
+    __slots__ = ("symbols", "values")
+
+    def __init__(
+        self: "GeneValueColumns",
+        symbols: Optional[List[str]] = None,
+        values: Optional[Iterable[float]] = None,
+    ) -> None:
+        """Initialize the columns.
+
+        :param symbols: The gene symbols.
+        :param values: The gene values, in the same order as the symbols.
+
+        :raises ValueError: If there are not the same number of symbols and values.
+        """
+        self.symbols = [] if symbols is None else symbols
+        self.values = array("d", () if values is None else values)
+        if len(self.symbols) != len(self.values):
+            raise ValueError("Gene symbols and values must have the same length.")
+
+    @classmethod
+    def from_gene_values(
+        cls: Type["GeneValueColumns"], gene_values: Iterable[GeneValue]
+    ) -> "GeneValueColumns":
+        """Create columns from gene values.
+
+        :param gene_values: The gene values.
+
+        :returns: The gene values, as columns.
+        """
+        columns = cls()
+        for gene_value in gene_values:
+            columns.symbols.append(gene_value.symbol)
+            columns.values.append(gene_value.value)  # noqa: PD011
+        return columns
+
+    def append(self: "GeneValueColumns", symbol: str, value: Union[str, float]) -> None:
+        """Add a gene value to the end of the columns.
+
+        The value is converted to a float as GeneValue would convert it.
+
+        :param symbol: The gene symbol.
+        :param value: The gene value, as a number or a string.
+
+        :raises ValidationError: If the value cannot be converted to a float.
+        """
+        # float() accepts the same ASCII strings as GeneValue, and is much faster. Any
+        # other input is converted (or rejected) by GeneValue itself.
+        try:
+            if not (isinstance(value, str) and value.isascii()):
+                raise TypeError()
+            value = float(value)
+        except (TypeError, ValueError):
+            value = GeneValue(symbol=symbol, value=value).value
+        self.symbols.append(symbol)
+        self.values.append(value)
+
+    def to_gene_values(self: "GeneValueColumns") -> List[GeneValue]:
+        """Materialize every gene value.
+
+        :returns: A list of GeneValue instances.
+        """
+        return list(self)
+
+    def __len__(self: "GeneValueColumns") -> int:
+        """Return the number of gene values."""
+        return len(self.symbols)
+
+    @overload
+    def __getitem__(self: "GeneValueColumns", idx: int) -> GeneValue: ...
+
+    @overload
+    def __getitem__(self: "GeneValueColumns", idx: slice) -> "GeneValueColumns": ...
+
+    def __getitem__(
+        self: "GeneValueColumns", idx: Union[int, slice]
+    ) -> Union[GeneValue, "GeneValueColumns"]:
+        """Materialize a single gene value, or slice the columns."""
+        if isinstance(idx, slice):
+            return GeneValueColumns(self.symbols[idx], self.values[idx])
+        return GeneValue.model_construct(
+            symbol=self.symbols[idx], value=self.values[idx]
+        )
+
+    def __iter__(self: "GeneValueColumns") -> Iterator[GeneValue]:
+        """Materialize each gene value in turn."""
+        for symbol, value in zip(self.symbols, self.values):
+            yield GeneValue.model_construct(symbol=symbol, value=value)
+
+    def __eq__(self: "GeneValueColumns", other: Any) -> bool:  # noqa: ANN401
+        """Compare the symbols and values, unlike GeneValue which ignores values."""
+        if isinstance(other, GeneValueColumns):
+            other_values = other.values  # noqa: PD011
+            return self.symbols == other.symbols and self.values == other_values
+        return NotImplemented
+
+    def __repr__(self: "GeneValueColumns") -> str:
+        """Return a short representation of the columns."""
+        return f"GeneValueColumns(<{len(self)} gene values>)"
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls: Type["GeneValueColumns"],
+        source: Any,  # noqa: ANN401
+        handler: GetCoreSchemaHandler,
+    ) -> core_schema.CoreSchema:
+        """Accept columns as they are, or build them from a list of gene values.
+
+        Columns are serialized as a list of gene values.
+        """
+        return core_schema.no_info_after_validator_function(
+            cls._validate,
+            core_schema.union_schema(
+                [
+                    core_schema.is_instance_schema(cls),
+                    handler.generate_schema(List[GeneValue]),
+                ]
+            ),
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda columns: [
+                    {"symbol": symbol, "value": value}
+                    for symbol, value in zip(columns.symbols, columns.values)
+                ]
+            ),
+        )
+
+    @classmethod
+    def _validate(
+        cls: Type["GeneValueColumns"], v: Union["GeneValueColumns", List[GeneValue]]
+    ) -> "GeneValueColumns":
+        return v if isinstance(v, cls) else cls.from_gene_values(v)
+
+
 class GeneDatabase(BaseModel):
     """Gene database schema."""
 
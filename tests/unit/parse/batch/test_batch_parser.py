@@ -0,0 +1,170 @@
+"""Test the BatchParser class."""
+
+# ruff: noqa: ANN001, ANN201, PD011
+import pytest
+from geneweaver.core.parse.batch import (
+    BatchParser,
+    InvalidBatchValueLineError,
+    process_lines,
+)
+from geneweaver.core.parse.enum import DuplicatePolicy
+from geneweaver.core.parse.exceptions import DuplicateGeneError, ValueConversionError
+from pydantic import ValidationError
+
+TWO_GENESETS = (
+    "! Binary\n@ Mus musculus\n% Gene Symbol\n"
+    ": GS1\n= G1\n+ D1\nGene1\t1\n"
+    ": GS2\n= G2\n+ D2\nGene2\t1\n"
+)
+
+
+def feed_in_chunks(parser: BatchParser, contents, chunk_size: int) -> list:
+    """Feed contents to the parser in chunks, and collect all the genesets."""
+    genesets = []
+    for idx in range(0, len(contents), chunk_size):
+        genesets.extend(parser.feed(contents[idx : idx + chunk_size]))
+    genesets.extend(parser.close())
+    return genesets
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024, 1_000_000])
+@pytest.mark.parametrize("as_bytes", [True, False])
+def test_batch_parser_matches_process_lines(
+    example_batch_file_contents, chunk_size, as_bytes
+):
+    """Feeding any chunk size gives the same result as process_lines."""
+    contents = example_batch_file_contents
+    if as_bytes:
+        contents = contents.encode("utf-8")
+
+    result = feed_in_chunks(BatchParser(), contents, chunk_size)
+
+    assert [geneset.model_dump() for geneset in result] == [
+        geneset.model_dump() for geneset in process_lines(example_batch_file_contents)
+    ]
+
+
+def test_batch_parser_returns_genesets_as_they_complete():
+    """Each geneset is returned by the feed call which completes it."""
+    parser = BatchParser()
+
+    assert parser.feed(TWO_GENESETS[:60]) == []
+    (first,) = parser.feed(TWO_GENESETS[60:])
+    assert first.abbreviation == "GS1"
+
+    (second,) = parser.close()
+    assert second.abbreviation == "GS2"
+
+
+def test_batch_parser_line_split_across_chunks():
+    """A value line split across chunks is reassembled before it is parsed."""
+    parser = BatchParser()
+    parser.feed(TWO_GENESETS + "Gen")
+    parser.feed(b"e3\t0.")
+    parser.feed("5\r")
+    parser.feed("\n")
+
+    genesets = parser.close()
+
+    assert [v.symbol for v in genesets[-1].values] == [
+        "Gene2",
+        "Gene3",
+    ]
+
+
+def test_batch_parser_errors_raised_by_feed():
+    """Errors are raised as soon as the offending line is complete."""
+    parser = BatchParser()
+    parser.feed(TWO_GENESETS + "Gene3 1 extra")
+
+    with pytest.raises(InvalidBatchValueLineError):
+        parser.feed("\n")
+
+
+def test_batch_parser_validates_final_geneset_on_close():
+    """The final geneset is only validated on close."""
+    parser = BatchParser()
+    assert parser.feed("# Only a comment\n") == []
+
+    with pytest.raises(ValidationError):
+        parser.close()
+
+
+def test_batch_parser_closed():
+    """A closed parser cannot be fed, or closed again."""
+    parser = BatchParser()
+    parser.feed(TWO_GENESETS)
+    parser.close()
+
+    assert parser.closed
+    with pytest.raises(ValueError, match="closed"):
+        parser.feed("Gene3\t1\n")
+    with pytest.raises(ValueError, match="closed"):
+        parser.close()
+
+
+def test_batch_parser_columnar():
+    """Columnar parsers collect each geneset's values in fresh columns."""
+    parser = BatchParser(columnar=True)
+
+    first, second = feed_in_chunks(parser, TWO_GENESETS + "Gene3\t0.5\n", 7)
+
+    assert first.values.symbols == ["Gene1"]
+    assert second.values.symbols == ["Gene2", "Gene3"]
+    assert list(second.values.values) == [1.0, 0.5]
+
+
+@pytest.mark.parametrize("columnar", [True, False])
+def test_batch_parser_duplicates(columnar):
+    """Duplicate gene symbols are resolved in each geneset, and counted."""
+    parser = BatchParser(columnar=columnar, duplicates=DuplicatePolicy.KEEP_LAST)
+    contents = TWO_GENESETS.replace("Gene1\t1\n", "Gene1\t1\nGene1\t2\nGene1\t3\n")
+
+    first, second = feed_in_chunks(parser, contents + "Gene2\t0.5\n", 7)
+
+    assert [(v.symbol, v.value) for v in first.values] == [("Gene1", 3.0)]
+    assert [(v.symbol, v.value) for v in second.values] == [("Gene2", 0.5)]
+    assert parser.duplicates_removed == 3
+
+
+def test_batch_parser_duplicates_error():
+    """The ERROR policy raises when the geneset with duplicates is completed."""
+    parser = BatchParser(duplicates=DuplicatePolicy.ERROR)
+
+    with pytest.raises(DuplicateGeneError):
+        parser.feed(TWO_GENESETS.replace("Gene1\t1\n", "Gene1\t1\nGene1\t2\n"))
+
+
+def test_batch_parser_vectorized():
+    """Vectorized parsers convert each geneset's values, with its own NA values."""
+    parser = BatchParser(vectorized=True, na_values=("NA",))
+    contents = TWO_GENESETS.replace("Gene2\t1\n", "Gene2\tNA\nGene3\t-inf\n")
+
+    first, second = feed_in_chunks(parser, contents, 7)
+
+    assert first.values.symbols == ["Gene1"]
+    assert list(first.values.values) == [1.0]
+    assert second.values.symbols == ["Gene2", "Gene3"]
+    assert str(list(second.values.values)) == "[nan, -inf]"
+
+
+def test_batch_parser_vectorized_line_numbers():
+    """Failed values are reported with their line number in the whole file."""
+    parser = BatchParser(vectorized=True)
+    contents = TWO_GENESETS.replace("Gene2\t1\n", "Gene2\t1\nGene3\tone\n")
+
+    parser.feed(contents)
+    with pytest.raises(ValueConversionError, match="'one' \\(line 12\\)"):
+        parser.close()
+
+
+def test_batch_parser_does_not_mutate_header():
+    """The header passed to the parser is copied, not updated in place."""
+    header = {"species": "Mus musculus", "score": "Binary"}
+    original = dict(header)
+    parser = BatchParser(header=header)
+
+    parser.feed("% Gene Symbol\n: GS1\n= G1\n+ D1\nGene1\t1\n")
+    parser.close()
+
+    assert header == original
@@ -0,0 +1,53 @@
+"""Test the classify_line function."""
+
+# ruff: noqa: ANN001, ANN201
+import pytest
+from geneweaver.core.parse.batch import (
+    HEADER_CHARACTERS,
+    SPACE_SEPARATED_HEADER_CHARACTERS,
+    IgnoreLineError,
+    LineKind,
+    NotAHeaderRowError,
+    classify_line,
+    process_header_line,
+)
+
+
+def reference_line_kind(line: str) -> LineKind:
+    """Classify a line the way process_lines did before classify_line existed."""
+    try:
+        process_header_line(line)
+    except IgnoreLineError:
+        return LineKind.IGNORE
+    except NotAHeaderRowError:
+        return LineKind.VALUE
+    return LineKind.HEADER
+
+
+@pytest.mark.parametrize(
+    "line",
+    [f"{key} sample line" for key in HEADER_CHARACTERS]
+    + [f"{key}sample line" for key in HEADER_CHARACTERS]
+    + [f"  {key}\tsample line" for key in HEADER_CHARACTERS]
+    + [f"{key} sample line" for key in SPACE_SEPARATED_HEADER_CHARACTERS]
+    + [f"{key}\tsample line" for key in SPACE_SEPARATED_HEADER_CHARACTERS]
+    + [f"{key}sample\t1" for key in SPACE_SEPARATED_HEADER_CHARACTERS]
+    + [f"{key} " for key in SPACE_SEPARATED_HEADER_CHARACTERS]
+    + [f"{key}" for key in SPACE_SEPARATED_HEADER_CHARACTERS]
+    + [":", "#comment", "# comment", "", " ", "\t \t", "Gene1\t0.5", " Gene1 1"],
+)
+def test_classify_line_matches_process_header_line(line):
+    """The dispatch table makes the same decision as process_header_line."""
+    assert classify_line(line) is reference_line_kind(line)
+
+
+def test_classify_line_example_batch_file(example_batch_file_contents):
+    """Every line of the example batch files is classified as before."""
+    for line in example_batch_file_contents.splitlines():
+        assert classify_line(line) is reference_line_kind(line)
+
+
+def test_classify_line_does_not_raise_for_invalid_value_lines():
+    """Invalid value lines are left to process_value_line to report."""
+    assert classify_line("Gene1 0.5 extra") is LineKind.VALUE
+    assert classify_line("Gene1") is LineKind.VALUE
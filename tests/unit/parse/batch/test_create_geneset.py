@@ -0,0 +1,54 @@
+"""Test the create_geneset function."""
+
+# ruff: noqa: ANN001, ANN201, PD011
+import pytest
+from geneweaver.core.parse.batch import TrustLevel, create_geneset
+from geneweaver.core.schema.batch import ColumnarBatchUploadGeneset
+from geneweaver.core.schema.gene import GeneValue, GeneValueColumns
+from pydantic import ValidationError
+
+HEADER = {
+    "score": "Binary",
+    "species": "Mus musculus",
+    "gene_id_type": "Gene Symbol",
+    "abbreviation": "GS1",
+    "name": "G1",
+    "description": "D1",
+}
+
+
+def make_values(columnar: bool):
+    """Make the values of a geneset, as a list or as columns."""
+    values = [
+        GeneValue(symbol="Gene1", value=1.0),
+        GeneValue(symbol="Gene2", value=0.5),
+    ]
+    return GeneValueColumns.from_gene_values(values) if columnar else values
+
+
+@pytest.mark.parametrize("columnar", [True, False])
+def test_create_geneset_trusted_matches_untrusted(columnar):
+    """Trusted genesets are the same as fully validated ones."""
+    trusted = create_geneset(dict(HEADER), make_values(columnar), TrustLevel.TRUSTED)
+    untrusted = create_geneset(dict(HEADER), make_values(columnar))
+
+    assert isinstance(trusted, ColumnarBatchUploadGeneset) == columnar
+    assert type(trusted) is type(untrusted)
+    assert trusted.model_dump() == untrusted.model_dump()
+    assert trusted.model_fields_set == untrusted.model_fields_set
+
+
+@pytest.mark.parametrize("columnar", [True, False])
+def test_create_geneset_trusted_attaches_values(columnar):
+    """Trusted values are attached as they are, without validating them again."""
+    values = make_values(columnar)
+
+    geneset = create_geneset(dict(HEADER), values, TrustLevel.TRUSTED)
+
+    assert geneset.values is values
+
+
+def test_create_geneset_trusted_validates_header():
+    """The header of a trusted geneset is still validated."""
+    with pytest.raises(ValidationError):
+        create_geneset({**HEADER, "curation_id": "x"}, [], TrustLevel.TRUSTED)
@@ -6,6 +6,7 @@ from unittest.mock import patch
 import pytest
 from geneweaver.core.parse.batch import (
     MissingRequiredHeaderError,
+    TrustLevel,
     check_has_required_header_values,
     finalize_processed_geneset,
 )
@@ -81,7 +82,9 @@ def test_finalize_processed_geneset_with_mocks(header):
         ) = finalize_processed_geneset(genesets, header, current_geneset_values)
 
         mock_check.assert_called_once_with(header)
-        mock_create.assert_called_once_with(header, current_geneset_values)
+        mock_create.assert_called_once_with(
+            header, current_geneset_values, TrustLevel.UNTRUSTED
+        )
         mock_reset.assert_called_once_with(header)
 
         assert updated_genesets == [created_geneset]
@@ -0,0 +1,96 @@
+"""Test the iter_batch_genesets function."""
+
+# ruff: noqa: ANN001, ANN201
+import gzip
+import io
+import tempfile
+import types
+
+import pytest
+from geneweaver.core.parse.batch import iter_batch_genesets, process_lines
+from geneweaver.core.parse.duplicates import DuplicateStats
+from geneweaver.core.parse.enum import DuplicatePolicy
+
+
+def dump(genesets) -> list:
+    """Dump genesets including their values, which GeneValue equality ignores."""
+    return [geneset.model_dump() for geneset in genesets]
+
+
+@pytest.mark.parametrize("as_bytes", [True, False])
+def test_iter_batch_genesets_matches_process_lines(
+    example_batch_file_contents, as_bytes
+):
+    """Streaming the file yields the same genesets as process_lines."""
+    if as_bytes:
+        stream = io.BytesIO(example_batch_file_contents.encode("utf-8"))
+    else:
+        stream = io.StringIO(example_batch_file_contents, newline="")
+
+    result = iter_batch_genesets(stream)
+
+    assert isinstance(result, types.GeneratorType)
+    assert dump(result) == dump(process_lines(example_batch_file_contents))
+
+
+def test_iter_batch_genesets_from_file(tmp_path, example_batch_file_contents):
+    """A file opened in binary mode can be streamed directly."""
+    file_path = tmp_path / "batch.gw"
+    file_path.write_bytes(example_batch_file_contents.encode("utf-8"))
+
+    with open(file_path, "rb") as f:
+        result = list(iter_batch_genesets(f))
+
+    assert dump(result) == dump(process_lines(example_batch_file_contents))
+
+
+def test_iter_batch_genesets_compressed(tmp_path, example_batch_file_contents):
+    """A compressed binary stream is decompressed as it is read."""
+    file_path = tmp_path / "batch.gw.gz"
+    file_path.write_bytes(gzip.compress(example_batch_file_contents.encode("utf-8")))
+
+    with open(file_path, "rb") as stream:
+        result = list(iter_batch_genesets(stream))
+
+    assert dump(result) == dump(process_lines(example_batch_file_contents))
+
+
+@pytest.mark.parametrize(
+    "make_stream",
+    [
+        lambda: tempfile.SpooledTemporaryFile(mode="w+"),
+        lambda: tempfile.NamedTemporaryFile(mode="w+"),
+    ],
+)
+def test_iter_batch_genesets_wrapped_text_stream(
+    example_batch_file_contents, make_stream
+):
+    """Text streams which are not io.TextIOBase are read as text."""
+    with make_stream() as stream:
+        stream.write(example_batch_file_contents)
+        stream.seek(0)
+        assert not isinstance(stream, io.TextIOBase)
+
+        result = list(iter_batch_genesets(stream))
+
+    assert dump(result) == dump(process_lines(example_batch_file_contents))
+
+
+def test_iter_batch_genesets_counts_duplicates_removed():
+    """The duplicates removed are counted as each geneset is yielded."""
+    contents = (
+        "! Binary\n@ Mus musculus\n% Gene Symbol\n: GS1\n= G1\n+ D1\n"
+        "Gene1\t1\nGene1\t0\n: GS2\n= G2\n+ D2\nGene2\t1\nGene2\t1\nGene2\t0\n"
+    )
+    stats = DuplicateStats()
+
+    genesets = iter_batch_genesets(
+        io.StringIO(contents),
+        duplicates=DuplicatePolicy.KEEP_FIRST,
+        duplicate_stats=stats,
+    )
+
+    next(genesets)
+    assert stats.removed == 1
+    next(genesets)
+    assert (stats.removed, stats.genesets) == (3, 2)
@@ -0,0 +1,70 @@
+"""Test the iter_genesets_from_lines function."""
+
+# ruff: noqa: ANN001, ANN201, PD011
+from typing import Iterator
+
+import pytest
+from geneweaver.core.parse.batch import (
+    MissingRequiredHeaderError,
+    iter_genesets_from_lines,
+)
+
+TWO_GENESET_LINES = [
+    "! Binary",
+    "@ Mus musculus",
+    "% Gene Symbol",
+    ": GS1",
+    "= Geneset One",
+    "+ The first geneset.",
+    "Gene1\t1",
+    "Gene2\t1",
+    ": GS2",
+    "= Geneset Two",
+    "+ The second geneset.",
+    "Gene3\t1",
+]
+
+
+def test_iter_genesets_from_lines_yields_each_geneset_when_complete():
+    """The first geneset is yielded before the second geneset's values are read."""
+    consumed = []
+
+    def lines() -> Iterator[str]:
+        for line in TWO_GENESET_LINES:
+            consumed.append(line)
+            yield line
+
+    genesets = iter_genesets_from_lines(lines())
+
+    first = next(genesets)
+    assert first.abbreviation == "GS1"
+    assert [v.symbol for v in first.values] == ["Gene1", "Gene2"]
+    assert "Gene3" not in consumed
+
+    second = next(genesets)
+    assert second.abbreviation == "GS2"
+    assert [v.symbol for v in second.values] == ["Gene3"]
+
+    with pytest.raises(StopIteration):
+        next(genesets)
+
+
+def test_iter_genesets_from_lines_carries_over_header_values():
+    """Non-required header values are inherited by the following genesets."""
+    first, second = iter_genesets_from_lines(TWO_GENESET_LINES)
+
+    assert second.species == first.species
+    assert second.gene_id_type == first.gene_id_type
+    assert second.score == first.score
+    assert second.description == " The second geneset."
+
+
+def test_iter_genesets_from_lines_missing_required_header():
+    """Errors are raised lazily, when the offending line is reached."""
+    genesets = iter_genesets_from_lines(
+        TWO_GENESET_LINES[:8] + ["! Binary", "Gene3\t1"]
+    )
+
+    assert next(genesets).abbreviation == "GS1"
+    with pytest.raises(MissingRequiredHeaderError):
+        next(genesets)
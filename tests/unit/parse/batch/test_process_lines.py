@@ -6,11 +6,17 @@ from unittest.mock import patch
 import pytest
 from geneweaver.core.parse.batch import (
     BatchUploadGeneset,
-    IgnoreLineError,
-    NotAHeaderRowError,
+    LineKind,
     ReadMode,
+    TrustLevel,
     process_lines,
 )
+from geneweaver.core.parse.duplicates import DuplicateStats
+from geneweaver.core.parse.enum import BatchEngine, DuplicatePolicy
+from geneweaver.core.parse.exceptions import ValueConversionError
+from geneweaver.core.schema.batch import ColumnarBatchUploadGeneset
+from geneweaver.core.schema.gene import GeneValue, GeneValueColumns
+from pydantic import ValidationError
 
 
 def test_process_lines_with_batch_file_contents(example_batch_file_contents):
@@ -36,10 +42,10 @@ def test_process_lines_with_batch_file_contents(example_batch_file_contents):
     ],
 )
 @pytest.mark.parametrize(
-    "read_header_error",
+    "first_line_kind",
     [
-        IgnoreLineError,
-        NotAHeaderRowError,
+        LineKind.IGNORE,
+        LineKind.VALUE,
     ],
 )
 @pytest.mark.parametrize(
@@ -57,23 +63,23 @@ def test_process_lines_with_batch_file_contents(example_batch_file_contents):
         ["geneset1", "geneset2"],
     ],
 )
+@patch("geneweaver.core.parse.batch.classify_line")
 @patch("geneweaver.core.parse.batch.read_header")
 @patch("geneweaver.core.parse.batch.read_values")
 @patch("geneweaver.core.parse.batch.create_geneset")
-def test_process_lines_header_error(
+def test_process_lines_dispatches_on_line_kind(
     mock_create_geneset,
     mock_read_values,
     mock_read_header,
+    mock_classify_line,
     contents,
-    read_header_error,
+    first_line_kind,
     read_mode,
     starting_genesets,
 ):
-    """Test that process_lines calls read_header and create_geneset."""
-    mock_read_header.side_effect = [
-        read_header_error(),
-        ([] + starting_genesets, [], {}, read_mode),
-    ]
+    """Test that process_lines calls read_header, read_values and create_geneset."""
+    mock_classify_line.side_effect = [first_line_kind, LineKind.HEADER]
+    mock_read_header.return_value = ([] + starting_genesets, [], {}, read_mode)
     mock_create_geneset.return_value = "geneset"
     mock_read_values.return_value = (
         [("key1", "value1"), ("key2", "value2")],
@@ -82,10 +88,122 @@ def test_process_lines_header_error(
 
     result = process_lines(contents)
 
-    assert mock_read_header.call_count == 2
+    assert mock_classify_line.call_count == 2
+    assert mock_read_header.call_count == 1
     assert mock_create_geneset.call_count == 1
-    if read_header_error is IgnoreLineError:
+    if first_line_kind is LineKind.IGNORE:
         assert mock_read_values.call_count == 0
     else:
         assert mock_read_values.call_count == 1
     assert result == starting_genesets + ["geneset"]
+
+
+def test_process_lines_columnar_matches_process_lines(example_batch_file_contents):
+    """Columnar genesets have the same headers and values as the regular genesets."""
+    expected = process_lines(example_batch_file_contents)
+    result = process_lines(example_batch_file_contents, columnar=True)
+
+    assert len(result) == len(expected)
+    for columnar, geneset in zip(result, expected):
+        assert isinstance(columnar, ColumnarBatchUploadGeneset)
+        assert isinstance(columnar.values, GeneValueColumns)
+        assert columnar.model_dump() == geneset.model_dump()
+        assert columnar.to_geneset().model_dump() == geneset.model_dump()
+
+
+def test_process_lines_columnar_invalid_value():
+    """Invalid values raise the same error when collected as columns."""
+    contents = "! Binary\n@ Mus musculus\n% Gene Symbol\n: GS1\n= G1\n+ D1\nGene1\tx\n"
+
+    with pytest.raises(ValidationError):
+        process_lines(contents, columnar=True)
+
+
+@pytest.mark.parametrize("columnar", [True, False])
+def test_process_lines_trusted_matches_process_lines(
+    example_batch_file_contents, columnar
+):
+    """Trusted parsing gives the same genesets as full validation on valid input."""
+    expected = process_lines(example_batch_file_contents)
+    result = process_lines(
+        example_batch_file_contents, columnar=columnar, trust=TrustLevel.TRUSTED
+    )
+
+    assert [geneset.model_dump() for geneset in result] == [
+        geneset.model_dump() for geneset in expected
+    ]
+
+
+@pytest.mark.parametrize("engine", list(BatchEngine))
+@pytest.mark.parametrize("columnar", [True, False])
+def test_process_lines_trusted_skips_value_validation(
+    example_batch_file_contents, engine, columnar
+):
+    """Trusted parsing never validates a GeneValue for each value line."""
+    with patch.object(GeneValue, "__init__", side_effect=AssertionError):
+        result = process_lines(
+            example_batch_file_contents,
+            columnar=columnar,
+            trust=TrustLevel.TRUSTED,
+            engine=engine,
+        )
+
+    assert [geneset.model_dump() for geneset in result] == [
+        geneset.model_dump() for geneset in process_lines(example_batch_file_contents)
+    ]
+
+
+def test_process_lines_trusted_still_validates_header():
+    """Trusted parsing still validates the header values."""
+    contents = "! Binary\n@ Not a species\n% Gene Symbol\n: GS1\n= G1\n+ D1\nGene1\t1\n"
+
+    with pytest.raises(KeyError):
+        process_lines(contents, trust=TrustLevel.TRUSTED)
+
+
+def test_process_lines_vectorized_matches_process_lines(example_batch_file_contents):
+    """Vectorized parsing gives the same genesets as converting each value."""
+    expected = process_lines(example_batch_file_contents)
+    result = process_lines(example_batch_file_contents, vectorized=True)
+
+    assert all(isinstance(g, ColumnarBatchUploadGeneset) for g in result)
+    assert [geneset.model_dump() for geneset in result] == [
+        geneset.model_dump() for geneset in expected
+    ]
+
+
+def test_process_lines_vectorized_reports_every_invalid_value():
+    """Every value of a geneset which cannot be converted is reported at once."""
+    contents = (
+        "! Binary\n@ Mus musculus\n% Gene Symbol\n: GS1\n= G1\n+ D1\n"
+        "Gene1\tx\nGene2\t1e-3\nGene3\tNA\n"
+    )
+
+    with pytest.raises(ValueConversionError) as exc_info:
+        process_lines(contents, vectorized=True)
+
+    assert exc_info.value.failures == [(7, "x"), (9, "NA")]
+
+
+@pytest.mark.parametrize("engine", list(BatchEngine))
+@pytest.mark.parametrize("columnar", [True, False])
+def test_process_lines_counts_duplicates_removed(engine, columnar):
+    """The duplicates removed from every geneset are counted in duplicate_stats."""
+    header = "! Binary\n@ Mus musculus\n% Gene Symbol\n"
+    contents = (
+        f"{header}: GS1\n= G1\n+ D1\nGene1\t1\nGene1\t0\nGene2\t1\nGene1\t1\n"
+        ": GS2\n= G2\n+ D2\nGene1\t1\nGene2\t0\n"
+        ": GS3\n= G3\n+ D3\nGene3\t1\nGene3\t1\n"
+    )
+    stats = DuplicateStats()
+
+    genesets = process_lines(
+        contents,
+        columnar=columnar,
+        duplicates=DuplicatePolicy.MIN_VALUE,
+        engine=engine,
+        duplicate_stats=stats,
+    )
+
+    assert [len(geneset.values) for geneset in genesets] == [2, 2, 1]
+    assert (stats.removed, stats.genesets) == (3, 2)
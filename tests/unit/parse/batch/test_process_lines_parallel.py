@@ -0,0 +1,61 @@
+"""Test the process_lines_parallel function."""
+
+# ruff: noqa: ANN001, ANN201
+import pytest
+from geneweaver.core.parse.batch import (
+    InvalidBatchValueLineError,
+    MissingRequiredHeaderError,
+    process_lines,
+    process_lines_parallel,
+)
+from pydantic import ValidationError
+
+VALID_CONTENTS = "\n".join(
+    [
+        "! Binary",
+        "@ Mus musculus",
+        "% Gene Symbol",
+        ": GS1",
+        "= Geneset One",
+        "+ The first geneset.",
+        "Gene1\t1",
+        ": GS2",
+        "= Geneset Two",
+        "+ The second geneset.",
+        "Gene2\t1",
+    ]
+)
+
+
+def test_process_lines_parallel_matches_process_lines(example_batch_file_contents):
+    """The parallel parse returns the same genesets, in the same order."""
+    result = process_lines_parallel(example_batch_file_contents, max_workers=2)
+
+    assert [g.model_dump() for g in result] == [
+        g.model_dump() for g in process_lines(example_batch_file_contents)
+    ]
+
+
+@pytest.mark.parametrize(
+    ("contents", "expected_error"),
+    [
+        # The first error in the file is raised, even if later genesets also fail.
+        (
+            VALID_CONTENTS + "\n: GS3\nGene3\t1\n: GS4\n= G4\n+ D4\nGene4 1 extra",
+            MissingRequiredHeaderError,
+        ),
+        (
+            VALID_CONTENTS + "\nGene3 1 extra\n: GS3\nGene3\t1",
+            InvalidBatchValueLineError,
+        ),
+        (VALID_CONTENTS + "\nGene3\tnot_a_number", ValidationError),
+        ("# Only a comment", ValidationError),
+    ],
+)
+def test_process_lines_parallel_error_semantics(contents, expected_error):
+    """The parallel parse raises the same errors as the serial parse."""
+    with pytest.raises(expected_error):
+        process_lines(contents)
+
+    with pytest.raises(expected_error):
+        process_lines_parallel(contents, max_workers=2)
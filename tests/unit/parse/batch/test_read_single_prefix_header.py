@@ -24,11 +24,11 @@ from geneweaver.core.parse.batch import (
         ("#", "#\t\tsample line", ("sample_key", "sample line")),
     ],
 )
-def test_read_single_prefix_header_success(prefix, line, expected):
+def test_read_single_prefix_header_success(prefix, line, expected, monkeypatch):
     """Test that read_single_prefix_header returns the expected value."""
-    HEADER_CHARACTERS.update({prefix: expected[0]})
+    # monkeypatch restores (rather than removes) any existing header character.
+    monkeypatch.setitem(HEADER_CHARACTERS, prefix, expected[0])
     assert read_single_prefix_header(prefix, line) == expected
-    HEADER_CHARACTERS.pop(prefix)  # cleaning up after test
 
 
 @pytest.mark.parametrize(
@@ -0,0 +1,47 @@
+"""Test the read_trusted_values function."""
+
+# ruff: noqa: ANN001, ANN201, PD011
+import pytest
+from geneweaver.core.parse.batch import (
+    MissingRequiredHeaderError,
+    ReadMode,
+    read_trusted_values,
+)
+from geneweaver.core.schema.gene import GeneValue, GeneValueColumns
+
+HEADER = {"abbreviation": "GS1", "name": "G1", "description": "D1"}
+
+
+def test_read_trusted_values_list():
+    """Values are appended as GeneValue instances, and the read mode is updated."""
+    values, read_mode = read_trusted_values("Gene1\t0.5", HEADER, [], ReadMode.HEADER)
+
+    assert read_mode is ReadMode.CONTENT
+    assert [(v.symbol, v.value) for v in values] == [("Gene1", 0.5)]
+    assert isinstance(values[0], GeneValue)
+
+
+def test_read_trusted_values_columns():
+    """Values are appended to columns, without building GeneValue instances."""
+    columns = GeneValueColumns()
+    values, read_mode = read_trusted_values(
+        "Gene1  1e-3", HEADER, columns, ReadMode.CONTENT
+    )
+
+    assert values is columns
+    assert read_mode is ReadMode.CONTENT
+    assert columns.symbols == ["Gene1"]
+    assert list(columns.values) == [1e-3]
+
+
+@pytest.mark.parametrize("line", ["Gene1", "Gene1 1 2", "Gene1 x"])
+def test_read_trusted_values_malformed_line(line):
+    """Malformed lines raise a bare ValueError."""
+    with pytest.raises(ValueError):  # noqa: PT011
+        read_trusted_values(line, HEADER, [], ReadMode.CONTENT)
+
+
+def test_read_trusted_values_missing_header():
+    """The required header values are still checked."""
+    with pytest.raises(MissingRequiredHeaderError):
+        read_trusted_values("Gene1\t1", {}, [], ReadMode.HEADER)
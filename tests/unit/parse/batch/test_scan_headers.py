@@ -0,0 +1,97 @@
+"""Test the scan_headers and scan_batch_headers functions."""
+
+# ruff: noqa: ANN001, ANN201
+import gzip
+import io
+from unittest.mock import patch
+
+import pytest
+from geneweaver.core.parse.batch import (
+    MissingRequiredHeaderError,
+    process_lines,
+    scan_batch_headers,
+    scan_headers,
+)
+from geneweaver.core.schema.batch import BatchGenesetSummary
+from pydantic import ValidationError
+
+
+def test_scan_headers_matches_process_lines(example_batch_file_contents):
+    """Summaries agree with the genesets built by process_lines."""
+    genesets = process_lines(example_batch_file_contents)
+
+    summaries = list(scan_headers(example_batch_file_contents.splitlines()))
+
+    assert len(summaries) == len(genesets)
+    for summary, geneset in zip(summaries, genesets):
+        assert isinstance(summary, BatchGenesetSummary)
+        assert summary.abbreviation == geneset.abbreviation
+        assert summary.name == geneset.name
+        assert summary.description == geneset.description
+        assert summary.value_count == len(geneset.values)
+
+
+def test_scan_headers_keeps_raw_header_values():
+    """Header values are carried over, and kept as they appear in the file."""
+    lines = [
+        "! P-Value < 0.001",
+        "@ Mus musculus",
+        "% Gene Symbol",
+        ": GS1",
+        "= G1",
+        "+ D1",
+        "Gene1\t1",
+        "# comment",
+        "Gene2\t1",
+        ": GS2",
+        "= G2",
+        "+ D2",
+    ]
+
+    first, second = scan_headers(lines)
+
+    assert first.value_count == 2
+    assert second.value_count == 0
+    assert second.species == "Mus musculus"
+    assert second.score == "P-Value < 0.001"
+    assert second.gene_id_type == "Gene Symbol"
+
+
+def test_scan_headers_does_not_build_values():
+    """Value lines are counted without being validated or built."""
+    lines = ["! Binary", ": GS1", "= G1", "+ D1", "Gene1\tnot_a_number", "Gene2 1 2"]
+
+    with patch("geneweaver.core.parse.batch.GenesetValueInput") as mock_value_input:
+        (summary,) = scan_headers(lines)
+
+    assert summary.value_count == 2
+    mock_value_input.assert_not_called()
+
+
+def test_scan_headers_errors():
+    """Missing required headers are still reported."""
+    with pytest.raises(MissingRequiredHeaderError):
+        list(scan_headers([": GS1", "Gene1\t1"]))
+
+    with pytest.raises(ValidationError):
+        list(scan_headers(["# Only a comment"]))
+
+
+def test_scan_batch_headers_stream(example_batch_file_contents):
+    """Binary streams can be scanned directly."""
+    stream = io.BytesIO(example_batch_file_contents.encode("utf-8"))
+
+    assert list(scan_batch_headers(stream)) == list(
+        scan_headers(example_batch_file_contents.splitlines())
+    )
+
+
+def test_scan_batch_headers_compressed(tmp_path, example_batch_file_contents):
+    """Compressed binary streams are decompressed, as iter_batch_genesets does."""
+    file_path = tmp_path / "batch.gw.gz"
+    file_path.write_bytes(gzip.compress(example_batch_file_contents.encode("utf-8")))
+
+    with open(file_path, "rb") as stream:
+        summaries = list(scan_batch_headers(stream))
+
+    assert summaries == list(scan_headers(example_batch_file_contents.splitlines()))
@@ -0,0 +1,103 @@
+"""Test the sniff_file_type function."""
+
+# ruff: noqa: ANN001, ANN101, ANN201
+import bz2
+import io
+
+import pytest
+from geneweaver.core.parse.batch import (
+    GeneweaverFileType,
+    UnsupportedFileTypeError,
+    is_batch_file,
+    sniff_file_type,
+)
+
+VALUES_CONTENTS = "# A comment\n\nGene1\t0.5\nGene2\t0.1\n"
+
+
+class CountingStream(io.BytesIO):
+    """A BytesIO which records how many bytes have been read from it."""
+
+    bytes_read = 0
+
+    def read(self, size=-1) -> bytes:
+        """Read from the stream, and count the bytes read."""
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+def test_sniff_file_type_matches_is_batch_file(example_batch_file_contents):
+    """Sniffing a stream makes the same decision as is_batch_file."""
+    stream = io.BytesIO(example_batch_file_contents.encode("utf-8"))
+
+    assert sniff_file_type(stream) == is_batch_file(example_batch_file_contents)
+    assert sniff_file_type(stream) == GeneweaverFileType.BATCH
+
+
+@pytest.mark.parametrize("as_path", [True, False])
+def test_sniff_file_type_path(tmp_path, as_path):
+    """A path, given as a str or Path, can be sniffed."""
+    file_path = tmp_path / "values.txt"
+    file_path.write_text(VALUES_CONTENTS)
+
+    source = file_path if as_path else str(file_path)
+
+    assert sniff_file_type(source) == GeneweaverFileType.VALUES
+
+
+def test_sniff_file_type_compressed_path(tmp_path, example_batch_file_contents):
+    """A compressed file is sniffed by its decompressed contents."""
+    file_path = tmp_path / "batch.gw.bz2"
+    file_path.write_bytes(bz2.compress(example_batch_file_contents.encode("utf-8")))
+
+    assert sniff_file_type(file_path) == GeneweaverFileType.BATCH
+
+
+def test_sniff_file_type_text_stream():
+    """Text streams can be sniffed as well as binary streams."""
+    assert sniff_file_type(io.StringIO(VALUES_CONTENTS)) == GeneweaverFileType.VALUES
+
+
+def test_sniff_file_type_reads_only_a_prefix():
+    """Only the start of the file is read, not the whole file."""
+    stream = CountingStream(("! Binary\n" + "Gene1\t1\n" * 1_000_000).encode("utf-8"))
+
+    assert sniff_file_type(stream) == GeneweaverFileType.BATCH
+    assert stream.bytes_read < 100_000
+
+
+def test_sniff_file_type_restores_stream_position():
+    """Seekable streams are returned to where they started."""
+    stream = io.BytesIO(b"xx" + VALUES_CONTENTS.encode("utf-8"))
+    stream.seek(2)
+
+    sniff_file_type(stream)
+
+    assert stream.tell() == 2
+
+
+def test_sniff_file_type_budget_exceeded():
+    """An error is raised if no decisive line is found within max_bytes."""
+    stream = CountingStream(b"# comment\n" * 1000 + b"Gene1\t1\n")
+
+    with pytest.raises(UnsupportedFileTypeError, match="100 bytes"):
+        sniff_file_type(stream, max_bytes=100)
+
+    assert stream.bytes_read <= 101
+
+
+def test_sniff_file_type_budget_exactly_file_size():
+    """A file which is exactly max_bytes long can still be sniffed."""
+    contents = b"# comment\nGene1\t1"
+
+    assert sniff_file_type(io.BytesIO(contents), max_bytes=len(contents)) == (
+        GeneweaverFileType.VALUES
+    )
+
+
+@pytest.mark.parametrize("contents", [b"", b"# only comments\n#\n", b"Gene1 1 2\n"])
+def test_sniff_file_type_unsupported(contents):
+    """Files without a decisive line, or with an invalid first line, are rejected."""
+    with pytest.raises(UnsupportedFileTypeError):
+        sniff_file_type(io.BytesIO(contents))
@@ -0,0 +1,84 @@
+"""Test the split_geneset_blocks and process_geneset_block functions."""
+
+# ruff: noqa: ANN001, ANN201
+from geneweaver.core.parse.batch import (
+    process_geneset_block,
+    process_lines,
+    split_geneset_blocks,
+)
+
+LINES = [
+    "# comment",
+    "! Binary",
+    "@ Mus musculus",
+    "% Gene Symbol",
+    ": GS1",
+    "= Geneset One",
+    "+ The first geneset.",
+    "Gene1\t1",
+    "# comment between values",
+    "Gene2\t1",
+    ": GS2",
+    "= Geneset Two",
+    "+ The second geneset.",
+    "@ Homo sapiens",
+    "Gene3\t1",
+    ": GS3",
+    "= Geneset Three",
+    "+ The third geneset.",
+    "Gene4\t1",
+]
+
+
+def test_split_geneset_blocks_boundaries():
+    """A new block starts at each header line following a value line."""
+    blocks = [block for _, block in split_geneset_blocks(LINES)]
+
+    assert blocks == [LINES[:10], LINES[10:15], LINES[15:]]
+
+
+def test_split_geneset_blocks_inherited_headers():
+    """Each block is paired with the header values carried over to it."""
+    headers = [header for header, _ in split_geneset_blocks(LINES)]
+
+    assert headers[0] == {}
+    assert headers[1] == {
+        "score": "Binary",
+        "species": "Mus musculus",
+        "gene_id_type": "Gene Symbol",
+    }
+    assert headers[2] == {
+        "score": "Binary",
+        "species": "Homo sapiens",
+        "gene_id_type": "Gene Symbol",
+    }
+
+
+def test_split_geneset_blocks_no_values():
+    """A file without value lines is a single block."""
+    assert list(split_geneset_blocks(LINES[:7])) == [({}, LINES[:7])]
+
+
+def test_process_geneset_block_matches_process_lines(example_batch_file_contents):
+    """Processing each block independently gives the same result as process_lines."""
+    result = [
+        geneset
+        for header, block in split_geneset_blocks(
+            example_batch_file_contents.splitlines()
+        )
+        for geneset in process_geneset_block(header, block)
+    ]
+
+    assert [g.model_dump() for g in result] == [
+        g.model_dump() for g in process_lines(example_batch_file_contents)
+    ]
+
+
+def test_process_geneset_block_does_not_modify_header():
+    """The inherited header is copied before it is updated."""
+    header, block = list(split_geneset_blocks(LINES))[1]
+    header_copy = dict(header)
+
+    process_geneset_block(header, block)
+
+    assert header == header_copy
@@ -0,0 +1,84 @@
+"""Tests for the asyncio batch parser module."""
+
+# ruff: noqa: ANN001, ANN201
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, List, Union
+from unittest.mock import patch
+
+import pytest
+from geneweaver.core.parse.batch import (
+    BatchParser,
+    BatchUploadGeneset,
+    InvalidBatchValueLineError,
+    process_lines,
+)
+from geneweaver.core.parse.batch_async import aparse_batch
+
+
+async def async_chunks(
+    contents: Union[str, bytes], chunk_size: int
+) -> AsyncIterator[Union[str, bytes]]:
+    """Asynchronously yield contents in chunks, like a request body stream."""
+    for idx in range(0, len(contents), chunk_size):
+        await asyncio.sleep(0)
+        yield contents[idx : idx + chunk_size]
+
+
+def collect(stream, executor=None) -> List[BatchUploadGeneset]:
+    """Run aparse_batch over the stream to completion and return the genesets."""
+
+    async def _collect() -> List[BatchUploadGeneset]:
+        return [geneset async for geneset in aparse_batch(stream, executor)]
+
+    return asyncio.run(_collect())
+
+
+def dump(genesets: List[BatchUploadGeneset]) -> List[dict]:
+    """Dump genesets including their values, which GeneValue equality ignores."""
+    return [geneset.model_dump() for geneset in genesets]
+
+
+@pytest.mark.parametrize("chunk_size", [13, 4096])
+def test_aparse_batch_matches_process_lines(example_batch_file_contents, chunk_size):
+    """Parsing an async byte stream gives the same result as process_lines."""
+    stream = async_chunks(example_batch_file_contents.encode("utf-8"), chunk_size)
+
+    assert dump(collect(stream)) == dump(process_lines(example_batch_file_contents))
+
+
+def test_aparse_batch_str_chunks(example_batch_file_contents):
+    """Async streams of str chunks are also supported."""
+    stream = async_chunks(example_batch_file_contents, 100)
+
+    assert dump(collect(stream)) == dump(process_lines(example_batch_file_contents))
+
+
+def test_aparse_batch_parses_off_the_event_loop(example_batch_file_contents):
+    """Chunks are parsed in the executor, not on the event loop thread."""
+    loop_thread = threading.get_ident()
+    parse_threads = set()
+    original_feed = BatchParser.feed
+
+    def recording_feed(self, chunk) -> List[BatchUploadGeneset]:
+        parse_threads.add(threading.get_ident())
+        return original_feed(self, chunk)
+
+    stream = async_chunks(example_batch_file_contents, 1000)
+    with patch.object(BatchParser, "feed", recording_feed), ThreadPoolExecutor(
+        max_workers=1
+    ) as executor:
+        result = collect(stream, executor=executor)
+
+    assert dump(result) == dump(process_lines(example_batch_file_contents))
+    assert parse_threads
+    assert loop_thread not in parse_threads
+
+
+def test_aparse_batch_raises_errors():
+    """Errors raised while parsing are propagated to the async iterator."""
+    contents = "! Binary\n@ Mus musculus\n% Gene Symbol\n: GS1\n= G1\n+ D1\nGene1 1 2\n"
+
+    with pytest.raises(InvalidBatchValueLineError):
+        collect(async_chunks(contents, 10))
@@ -0,0 +1,138 @@
+"""Tests for incrementally re-parsing an edited batch file."""
+
+# ruff: noqa: ANN001, ANN201, PD011
+import random
+import time
+
+import pytest
+from geneweaver.core.parse.batch import process_lines
+from geneweaver.core.parse.batch_incremental import BatchDocument
+from pydantic import ValidationError
+
+CONTENTS = (
+    "# A comment\n! Binary\n@ Mus musculus\n% Gene Symbol\n"
+    ": GS1\n= G1\n+ D1\nGene1\t1\nGene2\t1\n\n"
+    ": GS2\n= G2\n+ D2\n@ Homo sapiens\r\nGene3\t1\r\n"
+    ": GS3\n= G3\n+ D3\nGene4\t1\nGene5\t1\nGene6\t1"
+)
+
+EDIT_TEXTS = [
+    "",
+    "\n",
+    "\r",
+    "Gene7\t0.5\n",
+    "x",
+    "1",
+    ": GS4\n= G4\n+ D4\n",
+    "@ Homo sapiens\n",
+    "@ Mus musculus\n",
+    "! Binary\n",
+    "# Comment\n",
+    "P 1234\n",
+]
+
+
+def parse(contents):
+    """Parse contents with process_lines, returning the dumped genesets or the error."""
+    try:
+        return [geneset.model_dump() for geneset in process_lines(contents)]
+    except Exception as error:  # noqa: BLE001
+        return type(error), str(error)
+
+
+def document_genesets(document):
+    """Get the dumped genesets of a document, or the error it raises."""
+    try:
+        return [geneset.model_dump() for geneset in document.genesets]
+    except Exception as error:  # noqa: BLE001
+        return type(error), str(error)
+
+
+def test_batch_document_matches_process_lines(example_batch_file_contents):
+    """A new document has the same genesets as process_lines."""
+    document = BatchDocument(example_batch_file_contents)
+
+    assert document.contents == example_batch_file_contents
+    assert document_genesets(document) == parse(example_batch_file_contents)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_batch_document_random_edits_match_process_lines(seed):
+    """After each of a series of random edits, the genesets match a full re-parse."""
+    rng = random.Random(seed)
+    document, contents = BatchDocument(CONTENTS), CONTENTS
+
+    for _ in range(30):
+        start = rng.randint(0, len(contents))
+        end = rng.randint(start, min(start + 20, len(contents)))
+        text = rng.choice(EDIT_TEXTS)
+
+        document.edit(start, end, text)
+        contents = contents[:start] + text + contents[end:]
+
+        assert document.contents == contents
+        assert document_genesets(document) == parse(contents)
+
+
+def test_batch_document_edit_reparses_only_affected_blocks():
+    """Only the edited block, its neighbours and any dependent blocks are parsed."""
+    document = BatchDocument(CONTENTS)
+    value_offset = CONTENTS.index("Gene4\t1")
+
+    reparsed = document.edit(value_offset + len("Gene4\t"), value_offset + 7, "2")
+
+    assert reparsed == range(1, 3)
+    assert document.genesets[2].values[0].value == 2
+
+
+def test_batch_document_edit_reparses_blocks_with_changed_headers():
+    """Changing an inherited header value re-parses every block which inherits it."""
+    contents = CONTENTS.replace("@ Homo sapiens\r\n", "")
+    document = BatchDocument(contents)
+    species_offset = contents.index("Mus musculus")
+
+    reparsed = document.edit(species_offset, species_offset + 12, "Homo sapiens")
+
+    assert reparsed == range(0, 3)
+    assert document_genesets(document) == parse(document.contents)
+    assert len({geneset.species for geneset in document.genesets}) == 1
+
+
+def test_batch_document_edit_keeps_errors_until_fixed():
+    """An invalid edit raises the same error as process_lines, until it is fixed."""
+    document = BatchDocument(CONTENTS)
+    value_offset = CONTENTS.index("Gene3\t1") + len("Gene3\t")
+
+    document.edit(value_offset, value_offset + 1, "x")
+    with pytest.raises(ValidationError):
+        _ = document.genesets
+    assert parse(document.contents)[0] is ValidationError
+
+    document.edit(value_offset, value_offset + 1, "1")
+    assert document_genesets(document) == parse(CONTENTS)
+
+
+def test_batch_document_edit_outside_document():
+    """Edits must be within the document."""
+    document = BatchDocument(CONTENTS)
+
+    with pytest.raises(ValueError, match="outside"):
+        document.edit(len(CONTENTS), len(CONTENTS) + 1, "")
+
+
+def test_batch_document_edit_is_fast_for_large_documents():
+    """Editing one geneset of a large document does not re-parse the others."""
+    geneset = "".join(f"Gene{idx}\t{idx}\n" for idx in range(20))
+    contents = "! Binary\n@ Mus musculus\n% Gene Symbol\n" + "".join(
+        f": GS{idx}\n= G{idx}\n+ D{idx}\n{geneset}" for idx in range(5000)
+    )
+    document = BatchDocument(contents)
+    offset = contents.index(": GS2500\n")
+
+    started = time.perf_counter()
+    reparsed = document.edit(offset + 2, offset + 8, "New")
+    elapsed = time.perf_counter() - started
+
+    assert len(reparsed) == 3
+    assert document.genesets[2500].abbreviation == "New"
+    assert elapsed < 0.05
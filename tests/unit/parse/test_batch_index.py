@@ -0,0 +1,175 @@
+"""Tests for the batch file index module."""
+
+# ruff: noqa: ANN001, ANN201
+import os
+
+import pytest
+from geneweaver.core.parse.batch import MissingRequiredHeaderError, process_lines
+from geneweaver.core.parse.batch_index import (
+    BatchFileIndex,
+    default_sidecar_path,
+)
+from pydantic import ValidationError
+
+MULTI_GENESET_CONTENTS = (
+    "# A comment\n! Binary\n@ Mus musculus\n% Gene Symbol\n"
+    ": GS1\n= G1\n+ D1\nGene1\t1\nGene2\t1\n\n"
+    ": GS2\n= G2\n+ D2\n@ Homo sapiens\r\nGene3\t1\r\n"
+    ": GS3\n= G3\n+ D3\nGene4\t1\nGene5\t1\nGene6\t1"
+)
+
+
+@pytest.fixture()
+def batch_file(tmp_path):
+    """Write the multi-geneset batch file to a temporary path."""
+    file_path = tmp_path / "batch.gw"
+    file_path.write_bytes(MULTI_GENESET_CONTENTS.encode("utf-8"))
+    return file_path
+
+
+def test_batch_file_index_matches_process_lines(tmp_path, example_batch_file_contents):
+    """Every geneset loaded through the index matches process_lines."""
+    file_path = tmp_path / "batch.gw"
+    file_path.write_bytes(example_batch_file_contents.encode("utf-8"))
+    expected = process_lines(example_batch_file_contents)
+
+    index = BatchFileIndex.build(file_path)
+
+    assert len(index) == len(expected)
+    assert [geneset.model_dump() for geneset in index.get_genesets()] == [
+        geneset.model_dump() for geneset in expected
+    ]
+    for idx, geneset in enumerate(expected):
+        assert index.get_geneset(idx).model_dump() == geneset.model_dump()
+        assert index.genesets[idx].value_count == len(geneset.values)
+
+
+def test_batch_file_index_offsets_and_headers(batch_file):
+    """The index records block offsets, value counts and resolved headers."""
+    index = BatchFileIndex.build(batch_file)
+    contents = batch_file.read_bytes()
+
+    assert [block.value_count for block in index.genesets] == [2, 1, 3]
+    assert index.total_value_count == 6
+    assert contents[index.genesets[1].header_start :].startswith(b": GS2")
+    assert contents[index.genesets[1].value_start :].startswith(b"Gene3")
+    assert index.genesets[1].value_end == index.genesets[2].header_start
+    assert index.genesets[2].value_end == len(contents)
+    assert index.genesets[1].header == {
+        "score": "Binary",
+        "species": "Homo sapiens",
+        "gene_id_type": "Gene Symbol",
+        "abbreviation": "GS2",
+        "name": "G2",
+        "description": " D2",
+    }
+    assert index.genesets[2].header["species"] == "Homo sapiens"
+
+
+def test_batch_file_index_pagination(batch_file):
+    """Pages of genesets can be loaded without parsing the rest of the file."""
+    index = BatchFileIndex.build(batch_file)
+
+    assert [g.abbreviation for g in index.get_genesets(1, 3)] == ["GS2", "GS3"]
+    assert [g.abbreviation for g in index.get_genesets(2)] == ["GS3"]
+    assert index.get_geneset(-1).abbreviation == "GS3"
+    with pytest.raises(IndexError):
+        index.get_geneset(3)
+
+
+def test_batch_file_index_trailing_header_block(tmp_path):
+    """A trailing block of headers without values is indexed like process_lines."""
+    contents = MULTI_GENESET_CONTENTS + "\n: GS4\n= G4\n+ D4\n# trailing comment\n"
+    file_path = tmp_path / "batch.gw"
+    file_path.write_text(contents)
+
+    index = BatchFileIndex.build(file_path)
+
+    assert index.genesets[-1].value_count == 0
+    assert (
+        index.get_geneset(-1).model_dump() == process_lines(contents)[-1].model_dump()
+    )
+
+
+@pytest.mark.parametrize(
+    ("contents", "build_error", "get_error"),
+    [
+        ("Gene1\t1\n", MissingRequiredHeaderError, None),
+        ("", None, ValidationError),
+        (
+            "! Binary\n@ Mus musculus\n% Gene Symbol\n: G\n= G\n+ G\nG1 x",
+            None,
+            ValidationError,
+        ),
+    ],
+)
+def test_batch_file_index_errors(tmp_path, contents, build_error, get_error):
+    """Header errors are raised when building, and value errors when loading."""
+    file_path = tmp_path / "batch.gw"
+    file_path.write_text(contents)
+
+    if build_error:
+        with pytest.raises(build_error):
+            BatchFileIndex.build(file_path)
+    else:
+        index = BatchFileIndex.build(file_path)
+        with pytest.raises(get_error):
+            index.get_geneset(0)
+
+
+def test_batch_file_index_sidecar_round_trip(batch_file):
+    """An index can be saved as a sidecar file and loaded again."""
+    index = BatchFileIndex.build(batch_file)
+
+    sidecar_path = index.save()
+
+    assert sidecar_path == default_sidecar_path(batch_file)
+    assert sidecar_path.name == "batch.gw.index.json"
+    assert BatchFileIndex.load(batch_file) == index
+
+
+def test_batch_file_index_stale_sidecar(batch_file):
+    """A sidecar is rejected (and rebuilt) when the batch file changes."""
+    BatchFileIndex.build(batch_file).save()
+    batch_file.write_text(MULTI_GENESET_CONTENTS + "\nGene7\t1\n")
+    os.utime(batch_file, ns=(0, 0))
+
+    with pytest.raises(ValueError, match="out of date"):
+        BatchFileIndex.load(batch_file)
+
+    index = BatchFileIndex.load_or_build(batch_file)
+    assert index.genesets[-1].value_count == 4
+    assert BatchFileIndex.load(batch_file) == index
+
+
+def test_batch_file_index_load_or_build_without_saving(batch_file):
+    """load_or_build can skip saving the sidecar."""
+    BatchFileIndex.load_or_build(batch_file, save=False)
+
+    assert not default_sidecar_path(batch_file).exists()
+
+
+def test_batch_file_index_load_or_build_encoding(tmp_path):
+    """load_or_build indexes with the given encoding, and rebuilds for another one."""
+    file_path = tmp_path / "batch.gw"
+    contents = MULTI_GENESET_CONTENTS.replace("+ D1", "+ Gène")
+    file_path.write_bytes(contents.encode("latin-1"))
+
+    index = BatchFileIndex.load_or_build(file_path, encoding="latin-1")
+
+    assert index.encoding == "latin-1"
+    assert index.genesets[0].header["description"] == " Gène"
+    assert index.get_geneset(0).description == " Gène"
+    assert BatchFileIndex.load(file_path, encoding="latin1") == index
+    with pytest.raises(ValueError, match="encoding"):
+        BatchFileIndex.load(file_path, encoding="utf-8")
+
+
+def test_batch_file_index_load_or_build_rebuilds_for_encoding(batch_file):
+    """A saved index built with another encoding is rebuilt, and saved again."""
+    BatchFileIndex.build(batch_file).save()
+
+    index = BatchFileIndex.load_or_build(batch_file, encoding="latin-1")
+
+    assert index.encoding == "latin-1"
+    assert BatchFileIndex.load(batch_file).encoding == "latin-1"
@@ -0,0 +1,124 @@
+"""Tests for the memory-mapped batch parser module."""
+
+# ruff: noqa: ANN001, ANN201
+from pathlib import Path
+
+import pytest
+from geneweaver.core.parse.batch import (
+    InvalidBatchValueLineError,
+    LineKind,
+    MissingRequiredHeaderError,
+    classify_line,
+    process_lines,
+)
+from geneweaver.core.parse.batch_mmap import (
+    classify_byte_line,
+    iter_batch_file_genesets,
+    process_batch_file,
+    process_byte_value_line,
+)
+from pydantic import ValidationError
+
+MINIMAL_HEADER = "! Binary\n@ Mus musculus\n% Gene Symbol\n: GS1\n= G1\n+ D1\n"
+
+
+@pytest.fixture()
+def write_batch_file(tmp_path):
+    """Return a function which writes contents to a batch file in tmp_path."""
+
+    def _write(contents: str) -> Path:
+        file_path = tmp_path / "batch.gw"
+        file_path.write_bytes(contents.encode("utf-8"))
+        return file_path
+
+    return _write
+
+
+def test_process_batch_file_matches_process_lines(
+    write_batch_file, example_batch_file_contents
+):
+    """Parsing the memory-mapped file gives the same result as process_lines."""
+    file_path = write_batch_file(example_batch_file_contents)
+
+    result = process_batch_file(file_path)
+
+    assert [geneset.model_dump() for geneset in result] == [
+        geneset.model_dump() for geneset in process_lines(example_batch_file_contents)
+    ]
+
+
+def test_iter_batch_file_genesets_is_lazy(write_batch_file):
+    """Genesets are yielded one at a time, and the file is closed afterwards."""
+    file_path = write_batch_file(
+        MINIMAL_HEADER + "Gene1\t1\r\n: GS2\r\n= G2\r\n+ D2\r\nGene2\t1\r\n"
+    )
+
+    genesets = iter_batch_file_genesets(file_path)
+
+    assert next(genesets).abbreviation == "GS1"
+    assert next(genesets).abbreviation == "GS2"
+    with pytest.raises(StopIteration):
+        next(genesets)
+
+
+@pytest.mark.parametrize(
+    ("contents", "expected_error"),
+    [
+        ("", ValidationError),
+        ("# Only a comment\n", ValidationError),
+        ("Gene1\t1\n", MissingRequiredHeaderError),
+        (MINIMAL_HEADER + "Gene1\t1\textra\n", InvalidBatchValueLineError),
+        (MINIMAL_HEADER + "Gene1\tnot_a_number\n", ValidationError),
+    ],
+)
+def test_process_batch_file_errors(write_batch_file, contents, expected_error):
+    """The same errors are raised as for process_lines."""
+    file_path = write_batch_file(contents)
+
+    with pytest.raises(expected_error):
+        process_lines(contents)
+
+    with pytest.raises(expected_error):
+        process_batch_file(file_path)
+
+
+def test_process_batch_file_non_ascii(write_batch_file):
+    """Header values and symbols are decoded as UTF-8."""
+    file_path = write_batch_file(MINIMAL_HEADER + "+ Ünïcödé\nGenÉ1\t1e-3\n")
+
+    (geneset,) = process_batch_file(file_path)
+
+    assert geneset.description == " D1 Ünïcödé"
+    assert geneset.values[0].symbol == "GenÉ1"  # noqa: PD011
+    assert geneset.values[0].value == 0.001  # noqa: PD011
+
+
+def test_classify_byte_line_matches_classify_line(example_batch_file_contents):
+    """Byte lines are classified the same way as text lines."""
+    for line in example_batch_file_contents.splitlines():
+        assert classify_byte_line(line.encode("utf-8")) is classify_line(line)
+
+    for line in ["P 1", "P\t1", "P1\t1", "P", "", " ", "#", ":"]:
+        assert classify_byte_line(line.encode("utf-8")) is classify_line(line)
+
+    assert classify_byte_line(b"Gene1 1") is LineKind.VALUE
+
+
+@pytest.mark.parametrize(
+    ("line", "expected"),
+    [
+        (b"Gene1\t1", ("Gene1", 1.0)),
+        (b"  Gene1   4.62954E-05 ", ("Gene1", 4.62954e-05)),
+        (b"Gene1\tNA", ("Gene1", "NA")),
+    ],
+)
+def test_process_byte_value_line(line, expected):
+    """Values are converted to floats where possible."""
+    assert process_byte_value_line(line) == expected
+
+
+@pytest.mark.parametrize("line", [b"Gene1", b"Gene1 1 2", b""])
+def test_process_byte_value_line_invalid(line):
+    """Lines which don't split into two parts are invalid."""
+    with pytest.raises(InvalidBatchValueLineError):
+        process_byte_value_line(line)
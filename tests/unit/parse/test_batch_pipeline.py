@@ -0,0 +1,187 @@
+"""Tests for the staged batch parsing pipeline module."""
+
+# ruff: noqa: ANN001, ANN201
+import gzip
+import io
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+from geneweaver.core.parse.batch import (
+    InvalidBatchValueLineError,
+    MissingRequiredHeaderError,
+    process_lines,
+)
+from geneweaver.core.parse.batch_pipeline import (
+    iter_pipeline_genesets,
+    run_batch_pipeline,
+)
+
+HEADER = "! Binary\n@ Mus musculus\n% Gene Symbol\n"
+
+
+def dump(genesets) -> list:
+    """Dump genesets including their values, which GeneValue equality ignores."""
+    return [geneset.model_dump() for geneset in genesets]
+
+
+def many_genesets_contents(n_genesets: int) -> str:
+    """Create the contents of a batch file with many small genesets."""
+    return HEADER + "".join(
+        f": GS{idx}\n= G{idx}\n+ D{idx}\nGene{idx}\t1\n" for idx in range(n_genesets)
+    )
+
+
+class CountingStream(io.BytesIO):
+    """A binary stream which counts how many times it is read."""
+
+    def __init__(self: "CountingStream", contents: bytes) -> None:
+        """Initialize the stream."""
+        super().__init__(contents)
+        self.reads = 0
+
+    def read(self: "CountingStream", size=-1) -> bytes:
+        """Read from the stream, counting the read."""
+        self.reads += 1
+        return super().read(size)
+
+
+def pipeline_threads():
+    """Get the pipeline stage threads which are still running."""
+    return [
+        thread
+        for thread in threading.enumerate()
+        if thread.name.endswith("_stage)") and thread.is_alive()
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", [7, 65536])
+@pytest.mark.parametrize("binary", [True, False])
+def test_pipeline_matches_process_lines(
+    example_batch_file_contents, chunk_size, binary
+):
+    """The pipeline gives the same genesets as process_lines, in the same order."""
+    contents = example_batch_file_contents
+    stream = io.BytesIO(contents.encode("utf-8")) if binary else io.StringIO(contents)
+
+    genesets = list(iter_pipeline_genesets(stream, chunk_size=chunk_size))
+
+    assert dump(genesets) == dump(process_lines(contents))
+
+
+def test_pipeline_compressed_stream(example_batch_file_contents):
+    """Compressed binary streams are decompressed."""
+    stream = io.BytesIO(gzip.compress(example_batch_file_contents.encode("utf-8")))
+
+    genesets = list(iter_pipeline_genesets(stream))
+
+    assert dump(genesets) == dump(process_lines(example_batch_file_contents))
+
+
+def test_pipeline_wrapped_text_stream(example_batch_file_contents):
+    """Text streams which are not io.TextIOBase are read as text."""
+    with tempfile.SpooledTemporaryFile(mode="w+") as stream:
+        stream.write(example_batch_file_contents)
+        stream.seek(0)
+
+        genesets = list(iter_pipeline_genesets(stream))
+
+    assert dump(genesets) == dump(process_lines(example_batch_file_contents))
+
+
+@pytest.mark.parametrize("executor_class", [ThreadPoolExecutor, ProcessPoolExecutor])
+def test_pipeline_validates_in_executor(executor_class):
+    """Genesets validated in an executor are still returned in file order."""
+    contents = many_genesets_contents(50)
+
+    with executor_class(max_workers=2) as executor:
+        genesets = list(
+            iter_pipeline_genesets(
+                io.StringIO(contents), max_queue_size=4, executor=executor
+            )
+        )
+
+    assert dump(genesets) == dump(process_lines(contents))
+
+
+def test_pipeline_options(example_batch_file_contents):
+    """Parsing options are passed on to the validation stage."""
+    stream = io.StringIO(example_batch_file_contents)
+
+    genesets = list(iter_pipeline_genesets(stream, columnar=True))
+
+    assert dump(genesets) == dump(
+        process_lines(example_batch_file_contents, columnar=True)
+    )
+
+
+@pytest.mark.parametrize("use_executor", [False, True])
+def test_pipeline_raises_first_error(use_executor):
+    """The first error in the file is raised, after the genesets before it."""
+    contents = many_genesets_contents(20) + ": GSX\n= GX\nGeneX\t1\n: GSY\nGene\t1 2\n"
+    with pytest.raises(MissingRequiredHeaderError):
+        process_lines(contents)
+
+    with ThreadPoolExecutor() as executor:
+        genesets = iter_pipeline_genesets(
+            io.StringIO(contents), executor=executor if use_executor else None
+        )
+        received = [next(genesets) for _ in range(20)]
+        with pytest.raises(MissingRequiredHeaderError):
+            next(genesets)
+
+    assert len(received) == 20
+    assert not pipeline_threads()
+
+
+def test_pipeline_raises_read_errors():
+    """Errors raised while reading the stream are raised by the pipeline."""
+
+    class FailingStream(io.StringIO):
+        def read(self: "FailingStream", size=-1) -> str:
+            raise OSError("Read failed")
+
+    with pytest.raises(OSError, match="Read failed"):
+        list(iter_pipeline_genesets(FailingStream()))
+
+
+def test_pipeline_backpressure():
+    """A slow consumer stops the earlier stages from reading the whole file."""
+    contents = many_genesets_contents(1000).encode("utf-8")
+    stream = CountingStream(contents)
+    genesets = iter_pipeline_genesets(stream, max_queue_size=2, chunk_size=64)
+
+    next(genesets)
+    time.sleep(0.2)
+    reads_while_waiting = stream.reads
+    genesets.close()
+
+    assert reads_while_waiting < len(contents) / 64 / 10
+    assert not pipeline_threads()
+
+
+def test_run_batch_pipeline(example_batch_file_contents):
+    """Each geneset is passed to the consumer, in file order."""
+    consumed = []
+
+    count = run_batch_pipeline(
+        io.StringIO(example_batch_file_contents), consumed.append, chunk_size=10
+    )
+
+    assert dump(consumed) == dump(process_lines(example_batch_file_contents))
+    assert count == len(consumed)
+
+
+def test_run_batch_pipeline_consumer_error():
+    """An error in the consumer stops the pipeline, and is raised."""
+    stream = io.StringIO(many_genesets_contents(100))
+
+    def consume(geneset) -> None:
+        raise InvalidBatchValueLineError("Write failed")
+
+    with pytest.raises(InvalidBatchValueLineError, match="Write failed"):
+        run_batch_pipeline(stream, consume, max_queue_size=1)
+
+    assert not pipeline_threads()
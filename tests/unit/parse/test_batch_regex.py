@@ -0,0 +1,140 @@
+"""Tests for the REGEX batch parsing engine, cross-checked against the LINES engine."""
+
+# ruff: noqa: ANN001, ANN003, ANN201, PD011
+import pytest
+from geneweaver.core.parse.batch import TrustLevel, process_lines
+from geneweaver.core.parse.batch_regex import (
+    iter_genesets_regex,
+    split_value_block,
+)
+from geneweaver.core.parse.enum import BatchEngine, DuplicatePolicy
+from geneweaver.core.parse.exceptions import ValueConversionError
+from geneweaver.core.parse.symbols import SymbolTable
+
+HEADER = "! Binary\n@ Mus musculus\n% Gene Symbol\n: GS1\n= G1\n+ D1\n"
+
+OPTIONS = [
+    {},
+    {"columnar": True},
+    {"trust": TrustLevel.TRUSTED},
+    {"columnar": True, "trust": TrustLevel.TRUSTED},
+    {"vectorized": True},
+    {"duplicates": DuplicatePolicy.KEEP_FIRST},
+]
+
+CONTENTS = [
+    # Blank lines, comments and surrounding whitespace around values.
+    HEADER + "\n# A comment\n  Gene1\t1\n\nGene2  2.5 \n\t\nGene3\t-1e-3\n",
+    # Windows and old Mac line endings.
+    HEADER.replace("\n", "\r\n") + "Gene1\t1\r\nGene2\t2\r\n",
+    HEADER.replace("\n", "\r") + "Gene1\t1\rGene2\t2",
+    # Line boundaries only recognised by str.splitlines.
+    HEADER + "Gene1\t1\x0cGene2\t2\u2028Gene3\t3\n",
+    # Space separated header characters which start value lines.
+    HEADER + "P53\t1\nAgt\t2\nP 12345\nTnf\t3\nP\t4\n",
+    # Several genesets, inheriting header values.
+    HEADER + "Gene1\t1\nGene2\t2\n: GS2\n= G2\n+ D2\nGene1\t0.5\nGene1\t0.5\n",
+    # Non-ASCII values and symbols.
+    HEADER + "Gene1\t١\nGène2\t2\nGene3\t３\n",
+    # No trailing newline, and no values.
+    HEADER + "Gene1\t1",
+    HEADER,
+]
+
+INVALID_CONTENTS = [
+    # Too many or too few fields.
+    HEADER + "Gene1\t1\nGene2\t2\t3\nGene3\t3\n",
+    HEADER + "Gene1\t1\nGene2\nGene3\t3\n",
+    # Fields which balance out over the block.
+    HEADER + "Gene1\t1\tx\nGene2\n",
+    # Invalid values.
+    HEADER + "Gene1\t1\nGene2\tx\n",
+    HEADER + "Gene1\t1\nGene2\tNA\n",
+    HEADER + "Gene1\t1\nGene2\t½\n",
+    # Missing required header values.
+    "! Binary\n@ Mus musculus\n% Gene Symbol\n: GS1\nGene1\t1\n",
+    # Missing required header values, with an invalid first value.
+    "! Binary\n@ Mus musculus\n% Gene Symbol\n: GS1\nGene1\tNA\n",
+    # Values before any header.
+    "Gene1\t1\n" + HEADER,
+]
+
+
+def parse(contents, engine, **options):
+    """Parse contents with an engine, returning the genesets or the error raised."""
+    try:
+        return [
+            geneset.model_dump()
+            for geneset in process_lines(contents, engine=engine, **options)
+        ]
+    except Exception as error:  # noqa: BLE001
+        return type(error), str(error)
+
+
+@pytest.mark.parametrize("options", OPTIONS)
+def test_regex_engine_matches_lines_engine(example_batch_file_contents, options):
+    """The REGEX engine gives the same genesets as the LINES engine."""
+    expected = parse(example_batch_file_contents, BatchEngine.LINES, **options)
+    result = parse(example_batch_file_contents, BatchEngine.REGEX, **options)
+
+    assert isinstance(expected, list)
+    assert result == expected
+
+
+@pytest.mark.parametrize("options", OPTIONS)
+@pytest.mark.parametrize("contents", CONTENTS + INVALID_CONTENTS)
+def test_regex_engine_matches_lines_engine_on_edge_cases(contents, options):
+    """The REGEX engine gives the same genesets, or the same error, as LINES."""
+    expected = parse(contents, BatchEngine.LINES, **options)
+
+    assert parse(contents, BatchEngine.REGEX, **options) == expected
+
+
+def test_regex_engine_reports_line_numbers():
+    """Vectorized values which cannot be converted are reported with their line."""
+    contents = HEADER + "# Comment\nGene1\tx\nGene2\t1e-3\n\nGene3\tNA\n"
+
+    with pytest.raises(ValueConversionError) as exc_info:
+        process_lines(contents, vectorized=True, engine=BatchEngine.REGEX)
+
+    assert exc_info.value.failures == [(8, "x"), (11, "NA")]
+
+
+def test_regex_engine_interns_symbols():
+    """Gene symbols are interned in the symbol table, as with the LINES engine."""
+    contents = HEADER + "Gene1\t1\nGene2\t2\n: GS2\n= G2\n+ D2\nGene1\t3\n"
+    lines_table, regex_table = SymbolTable(), SymbolTable()
+
+    process_lines(contents, columnar=True, symbols=lines_table)
+    genesets = process_lines(
+        contents, columnar=True, symbols=regex_table, engine=BatchEngine.REGEX
+    )
+
+    assert genesets[1].values.symbols[0] is genesets[0].values.symbols[0]
+    assert regex_table.stats() == lines_table.stats()
+
+
+def test_iter_genesets_regex_is_lazy():
+    """Each geneset is yielded before the rest of the contents are parsed."""
+    contents = HEADER + "Gene1\t1\n: GS2\n= G2\n+ D2\nGene2\tx\n"
+
+    genesets = iter_genesets_regex(contents)
+
+    assert next(genesets).abbreviation == "GS1"
+    with pytest.raises(ValueError, match="float"):
+        next(genesets)
+
+
+@pytest.mark.parametrize(
+    ("block", "expected"),
+    [
+        ("Gene1\t1\nGene2\t2", (["Gene1", "Gene2"], ["1", "2"])),
+        (" Gene1  1 \nGene2\t2", (["Gene1", "Gene2"], ["1", "2"])),
+        ("Gene1\t1\t2\nGene2", None),
+        ("Gene1\t1\nGene2\x1f2\t3", None),
+        ("Gene1\t1\nGene2", None),
+    ],
+)
+def test_split_value_block(block, expected):
+    """Blocks are only split if every line has exactly two fields."""
+    assert split_value_block(block) == expected
@@ -0,0 +1,123 @@
+"""Tests for the batch file shard module."""
+
+# ruff: noqa: ANN001, ANN201
+import pytest
+from geneweaver.core.parse.batch import process_lines
+from geneweaver.core.parse.batch_index import BatchFileIndex
+from geneweaver.core.parse.batch_shard import (
+    format_explicit_header,
+    plan_shards,
+    shard_path,
+    write_shards,
+)
+
+MULTI_GENESET_CONTENTS = (
+    "# A comment\n! Binary\n@ Mus musculus\n% Gene Symbol\nP 123\n"
+    ": GS1\n= G1\n+ D1\n+ More\nGene1\t1\nGene2\t1\n\n"
+    ": GS2\n= G2\n+ D2\n@ Homo sapiens\r\nGene3\t1\r\n"
+    ": GS3\n= G3\n+ D3\nGene4\t1\nGene5\t1\nGene6\t1\n# Trailing comment\n"
+    ": GS4\n= G4\n+ D4\nP 456\nGene7\t0.01\nGene8\t0.02"
+)
+
+
+def parse_shards(shards):
+    """Parse each shard in order, returning every geneset dumped with its values."""
+    return [
+        geneset.model_dump()
+        for shard in shards
+        for geneset in process_lines(shard.path.read_text(encoding="utf-8"))
+    ]
+
+
+def dump(genesets):
+    """Dump genesets including their values, which GeneValue equality ignores."""
+    return [geneset.model_dump() for geneset in genesets]
+
+
+@pytest.mark.parametrize("n_shards", [1, 2, 3, 4, 10])
+def test_write_shards_reparse_to_the_same_genesets(tmp_path, n_shards):
+    """Shards parsed in order give exactly the genesets of the original file."""
+    file_path = tmp_path / "batch.gw"
+    file_path.write_bytes(MULTI_GENESET_CONTENTS.encode("utf-8"))
+
+    shards = write_shards(file_path, n_shards, directory=tmp_path / "shards")
+
+    assert len(shards) == min(n_shards, 4)
+    assert parse_shards(shards) == dump(process_lines(MULTI_GENESET_CONTENTS))
+    assert shards[0].first_geneset == 0
+    assert sum(shard.geneset_count for shard in shards) == 4
+    assert sum(shard.value_count for shard in shards) == 8
+
+
+def test_write_shards_example_files(tmp_path, example_batch_file_contents):
+    """The example batch files re-parse to the same genesets after sharding."""
+    file_path = tmp_path / "batch.gw"
+    file_path.write_bytes(example_batch_file_contents.encode("utf-8"))
+
+    shards = write_shards(file_path, 3)
+
+    assert parse_shards(shards) == dump(process_lines(example_batch_file_contents))
+
+
+def test_write_shards_makes_inherited_headers_explicit(tmp_path):
+    """Each shard repeats the header values its genesets inherit."""
+    file_path = tmp_path / "batch.gw"
+    file_path.write_bytes(MULTI_GENESET_CONTENTS.encode("utf-8"))
+    index = BatchFileIndex.build(file_path)
+
+    shards = write_shards(file_path, 4, index=index)
+    last_shard = shards[-1].path.read_text(encoding="utf-8")
+
+    assert shards[-1].path == tmp_path / "batch.shard-4-of-4.gw"
+    assert last_shard.startswith(format_explicit_header(index.genesets[3].header))
+    for line in ("! Binary\n", "@ Homo sapiens\n", "% Gene Symbol\n", "P 456\n"):
+        assert line in last_shard
+    assert process_lines(last_shard)[0].pubmed_id == "456"
+
+
+@pytest.mark.parametrize(
+    ("value_counts", "n_shards", "expected"),
+    [
+        ([10, 1, 1, 1, 1, 10], 2, [range(0, 3), range(3, 6)]),
+        ([5, 5, 5, 5], 2, [range(0, 2), range(2, 4)]),
+        ([100, 1, 1, 1], 2, [range(0, 1), range(1, 4)]),
+        ([1, 1, 1, 100], 3, [range(0, 2), range(2, 3), range(3, 4)]),
+        ([1, 2], 5, [range(0, 1), range(1, 2)]),
+        ([0, 0, 0], 2, [range(0, 1), range(1, 3)]),
+        ([7], 1, [range(0, 1)]),
+    ],
+)
+def test_plan_shards(value_counts, n_shards, expected):
+    """Shards are contiguous, non-empty and balanced by value count."""
+    assert plan_shards(value_counts, n_shards) == expected
+
+
+def test_plan_shards_balances_many_genesets():
+    """No shard is further from an equal share than the largest geneset."""
+    value_counts = [(idx * 37) % 101 + 1 for idx in range(1000)]
+
+    plan = plan_shards(value_counts, 7)
+    shard_totals = [sum(value_counts[idx] for idx in shard) for shard in plan]
+
+    assert len(plan) == 7
+    assert [idx for shard in plan for idx in shard] == list(range(1000))
+    equal_share = sum(value_counts) / 7
+    assert all(
+        abs(total - equal_share) <= 2 * max(value_counts) for total in shard_totals
+    )
+
+
+def test_plan_shards_rejects_no_shards():
+    """At least one shard must be requested."""
+    with pytest.raises(ValueError, match="at least 1"):
+        plan_shards([1, 2], 0)
+
+
+def test_shard_path():
+    """Shard paths are numbered from 1, padded to the width of the shard count."""
+    assert shard_path("/data/batch.gw", 1, 12).as_posix() == (
+        "/data/batch.shard-02-of-12.gw"
+    )
+    assert shard_path("batch.txt", 0, 3, "out").as_posix() == (
+        "out/batch.shard-1-of-3.txt"
+    )
@@ -0,0 +1,116 @@
+"""Tests for the batch file validation module."""
+
+# ruff: noqa: ANN001, ANN201
+import pytest
+from geneweaver.core.parse.batch import process_lines
+from geneweaver.core.parse.batch_validation import (
+    validate_batch_buffer,
+    validate_batch_file,
+)
+
+HEADER = b"! Binary\n@ Mus musculus\n% Gene Symbol\n"
+
+INVALID_CONTENTS = (
+    HEADER + b": GS1\n= G1\n+ D1\nGene1\t1\nGene2\tx\nGene3 1 2\n"
+    b": GS2\n@ Not a species\nGene4\t1\n"
+    b": GS3\n= G3\n+ D3\n\xff\xfe\nGene5\t1\n"
+)
+
+
+def test_validate_valid_batch_file(tmp_path, example_batch_file_contents):
+    """A batch file that process_lines accepts has no issues."""
+    file_path = tmp_path / "batch.gw"
+    file_path.write_bytes(example_batch_file_contents.encode("utf-8"))
+
+    report = validate_batch_file(file_path)
+
+    assert report.is_valid
+    assert not report.truncated
+    assert report.geneset_count == len(process_lines(example_batch_file_contents))
+
+
+def test_validate_collects_every_issue():
+    """Validation continues past each error, and reports where each one is."""
+    report = validate_batch_buffer(INVALID_CONTENTS)
+
+    assert not report.is_valid
+    assert not report.truncated
+    assert report.geneset_count == 3
+    assert report.line_count == 17
+    assert [
+        (issue.line_number, issue.geneset_index, issue.error) for issue in report.issues
+    ] == [
+        (8, 0, "ValidationError"),
+        (9, 0, "InvalidBatchValueLineError"),
+        (12, 1, "MissingRequiredHeaderError"),
+        # The invalid species is inherited by GS3, whose header starts on line 13.
+        (13, 2, "KeyError"),
+        (16, 2, "UnicodeDecodeError"),
+    ]
+    for issue in report.issues:
+        line = INVALID_CONTENTS.splitlines()[issue.line_number - 1]
+        assert INVALID_CONTENTS[issue.offset :].startswith(line)
+    assert "name (=), description (+)" in report.issues[2].message
+
+
+def test_validate_reports_missing_header_of_final_geneset():
+    """A final geneset without values is still checked for its header values."""
+    report = validate_batch_buffer(HEADER + b": GS1\n= G1\n+ D1\nGene1\t1\n: GS2\n")
+
+    assert report.geneset_count == 2
+    assert [(issue.line_number, issue.geneset_index) for issue in report.issues] == [
+        (8, 1)
+    ]
+
+
+@pytest.mark.parametrize(
+    ("max_errors", "line_count"),
+    # The header of GS3 (line 13) can only be checked on its first value line (17).
+    [(1, 9), (2, 12), (3, 17), (4, 17)],
+)
+def test_validate_stops_at_max_errors(max_errors, line_count):
+    """Validation stops once max_errors issues have been found."""
+    report = validate_batch_buffer(INVALID_CONTENTS, max_errors=max_errors)
+
+    assert report.truncated
+    assert len(report.issues) == max_errors
+    assert report.line_count == line_count
+
+
+@pytest.mark.parametrize("max_errors", [1, 2, 3, 4])
+def test_validate_keeps_first_issues_in_file(max_errors):
+    """A truncated report keeps the first max_errors issues in the file."""
+    report = validate_batch_buffer(INVALID_CONTENTS, max_errors=max_errors)
+
+    assert report.issues == validate_batch_buffer(INVALID_CONTENTS).issues[:max_errors]
+
+
+@pytest.mark.parametrize("max_errors", [5, 6])
+def test_validate_not_truncated_at_exactly_max_errors(max_errors):
+    """A report with no more than max_errors issues is not truncated."""
+    report = validate_batch_buffer(INVALID_CONTENTS, max_errors=max_errors)
+
+    assert not report.truncated
+    assert len(report.issues) == 5
+    assert report.line_count == 17
+
+
+def test_validate_not_truncated_with_one_issue():
+    """A single issue with max_errors=1 is not truncated."""
+    report = validate_batch_buffer(
+        HEADER + b": GS1\n= G1\n+ D1\nGene1\tx\nGene2\t1\n", max_errors=1
+    )
+
+    assert not report.truncated
+    assert len(report.issues) == 1
+
+
+def test_validate_batch_file_stops_at_max_errors(tmp_path):
+    """Stopping early releases the memory-mapped file cleanly."""
+    file_path = tmp_path / "batch.gw"
+    file_path.write_bytes(INVALID_CONTENTS)
+
+    report = validate_batch_file(file_path, max_errors=1)
+
+    assert report.truncated
+    assert report.issues[0].line_number == 8
@@ -0,0 +1,183 @@
+"""Tests for the parse result cache module."""
+
+# ruff: noqa: ANN001, ANN201
+import os
+
+import pytest
+from geneweaver.core.parse import csv, xlsx
+from geneweaver.core.parse.batch import TrustLevel, process_lines
+from geneweaver.core.parse.cache import CACHE_FILE_SUFFIX, ParseCache, make_cache_key
+from geneweaver.core.parse.duplicates import DuplicateStats
+from geneweaver.core.parse.enum import BatchEngine, DuplicatePolicy
+from geneweaver.core.parse.symbols import SymbolTable
+from geneweaver.core.schema.batch import ColumnarBatchUploadGeneset
+from openpyxl import Workbook
+
+
+@pytest.fixture()
+def cache(tmp_path):
+    """Create a parse cache in a temporary directory."""
+    return ParseCache(tmp_path / "cache")
+
+
+@pytest.mark.parametrize("columnar", [True, False])
+def test_parse_cache_process_lines(cache, example_batch_file_contents, columnar):
+    """Cached results match process_lines, and are only parsed once."""
+    expected = [g.model_dump() for g in process_lines(example_batch_file_contents)]
+
+    for _ in range(3):
+        result = cache.process_lines(example_batch_file_contents, columnar=columnar)
+        assert [g.model_dump() for g in result] == expected
+        assert all(
+            isinstance(g, ColumnarBatchUploadGeneset) == columnar for g in result
+        )
+
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_parse_cache_options_are_part_of_the_key(cache, example_batch_file_contents):
+    """Parsing with different options is a cache miss."""
+    cache.process_lines(example_batch_file_contents)
+    cache.process_lines(example_batch_file_contents, trust=TrustLevel.TRUSTED)
+    cache.process_lines(example_batch_file_contents + "\n")
+
+    assert (cache.hits, cache.misses) == (0, 3)
+
+
+def test_parse_cache_equal_options_hit(cache, example_batch_file_contents):
+    """Parsing with equal options is a cache hit."""
+    for _ in range(2):
+        cache.process_lines(
+            example_batch_file_contents,
+            trust=TrustLevel.TRUSTED,
+            duplicates=DuplicatePolicy.KEEP_FIRST,
+            vectorized=True,
+            engine=BatchEngine.REGEX,
+        )
+
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.parametrize(
+    "options", [{"symbols": SymbolTable()}, {"duplicate_stats": DuplicateStats()}]
+)
+def test_parse_cache_rejects_uncacheable_options(
+    cache, example_batch_file_contents, options
+):
+    """Options which share state with the caller are rejected, and nothing is stored."""
+    with pytest.raises(ValueError, match="can't be cached"):
+        cache.process_lines(example_batch_file_contents, **options)
+
+    assert (cache.hits, cache.misses) == (0, 0)
+    assert cache.size() == 0
+
+
+def test_parse_cache_errors_are_not_cached(cache):
+    """Parse errors are raised on every call, and nothing is stored."""
+    for _ in range(2):
+        with pytest.raises(ValueError):  # noqa: PT011
+            cache.process_lines(": GS1\n= G1\n+ D1\nGene1\tx\n")
+
+    assert cache.misses == 2
+    assert cache.size() == 0
+
+
+def test_parse_cache_csv(cache, tmp_path):
+    """Cached CSV files match csv.read_to_dict."""
+    file_path = tmp_path / "genes.csv"
+    file_path.write_text("Gene,Value\nGene1,1\nGene2,0.5\n")
+
+    for _ in range(2):
+        assert cache.read_csv_to_dict(file_path) == csv.read_to_dict(file_path)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    file_path.write_text("Gene,Value\nGene1,1\n")
+    assert cache.read_csv_to_dict(file_path) == [{"Gene": "Gene1", "Value": "1"}]
+    assert cache.misses == 2
+
+
+def test_parse_cache_xlsx(cache, tmp_path):
+    """Cached Excel files match xlsx.read_to_dict."""
+    file_path = tmp_path / "genes.xlsx"
+    workbook = Workbook()
+    for row in [("Gene", "Value"), ("Gene1", 1), ("Gene2", 0.5)]:
+        workbook.active.append(row)
+    workbook.save(file_path)
+
+    for _ in range(2):
+        assert cache.read_xlsx_to_dict(file_path) == xlsx.read_to_dict(file_path)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_parse_cache_evicts_least_recently_used(tmp_path):
+    """Stored results are evicted, least recently used first, to stay in budget."""
+    cache = ParseCache(tmp_path, max_bytes=10**6)
+    for idx in range(3):
+        cache.get_or_parse(str(idx).encode(), lambda idx=idx: "x" * 1000, "test")
+        # Make sure each result has a distinct modification time.
+        for path in tmp_path.glob(f"*{CACHE_FILE_SUFFIX}"):
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10**9))
+
+    # Use the first result, so the second is now the least recently used.
+    cache.get_or_parse(b"0", lambda: "unused", "test")
+    cache.max_bytes = cache.size() - 1
+
+    assert cache.evict() == 1
+    assert cache.get_or_parse(b"0", lambda: "reparsed", "test") == "x" * 1000
+    assert cache.get_or_parse(b"2", lambda: "reparsed", "test") == "x" * 1000
+    assert cache.get_or_parse(b"1", lambda: "reparsed", "test") == "reparsed"
+
+
+def test_parse_cache_corrupt_result(cache):
+    """A corrupt stored result is treated as a miss, and replaced."""
+    cache.get_or_parse(b"data", lambda: [1, 2, 3], "test")
+    (path,) = cache.directory.glob(f"*{CACHE_FILE_SUFFIX}")
+    path.write_bytes(b"not a pickle")
+
+    assert cache.get_or_parse(b"data", lambda: [4], "test") == [4]
+    assert cache.get_or_parse(b"data", lambda: [5], "test") == [4]
+
+    cache.clear()
+    assert cache.size() == 0
+
+
+@pytest.mark.parametrize(
+    "stale_pickle",
+    [
+        # A class which has since been renamed (AttributeError).
+        b"cgeneweaver.core.parse.cache\nRenamedClass\n.",
+        # A module which has since been removed (ImportError).
+        b"cgeneweaver.core.no_such_module\nGeneset\n.",
+        # A pickle protocol which is not supported (ValueError).
+        b"\x80\xff.",
+        # A class whose arguments have since changed (TypeError).
+        b"cbuiltins\nint\n(S'x'\nI1\nI2\ntR.",
+    ],
+)
+def test_parse_cache_stale_result(cache, stale_pickle):
+    """A stored result which can't be loaded is a miss, and is replaced."""
+    cache.get_or_parse(b"data", lambda: [1, 2, 3], "test")
+    (path,) = cache.directory.glob(f"*{CACHE_FILE_SUFFIX}")
+    path.write_bytes(stale_pickle)
+
+    assert cache.get_or_parse(b"data", lambda: [4], "test") == [4]
+    assert cache.get_or_parse(b"data", lambda: [5], "test") == [4]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_make_cache_key():
+    """Keys depend on the data, the parser and its options."""
+    key = make_cache_key(b"data", "parser", a=1, b=2)
+
+    assert key == make_cache_key(b"data", "parser", b=2, a=1)
+    assert len(key) == 64
+    assert key != make_cache_key(b"data2", "parser", a=1, b=2)
+    assert key != make_cache_key(b"data", "parser2", a=1, b=2)
+    assert key != make_cache_key(b"data", "parser", a=1, b=3)
+
+
+def test_make_cache_key_rejects_unstable_options():
+    """Options without a stable repr can't be part of a key."""
+    with pytest.raises(ValueError, match="symbols option"):
+        make_cache_key(b"data", "parser", symbols=SymbolTable())
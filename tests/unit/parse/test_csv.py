@@ -1,6 +1,7 @@
 """Tests for the CSV parser module."""
 
 # ruff: noqa: B905, ANN001, ANN201
+import gzip
 import tempfile
 from pathlib import Path
 
@@ -212,6 +213,22 @@ def test_read_row_not_found(csv_file, csv_content):
     assert str(idx) in str(e)
 
 
+@pytest.mark.parametrize(
+    ("csv_content", "expected_header_idx", "expected_header"),
+    zip(EXAMPLE_CSV_FILES_WITH_HEADER, EXAMPLE_HEADER_IDX, EXAMPLE_HEADERS),
+)
+def test_read_to_dict_gzip(tmp_path, csv_content, expected_header_idx, expected_header):
+    """Test reading a gzip compressed CSV file, without decompressing it first."""
+    csv_file = tmp_path / "genes.csv.gz"
+    csv_file.write_bytes(gzip.compress(csv_content.encode("utf-8")))
+
+    assert find_header(csv_file)[1] == expected_header_idx
+    result = read_to_dict(csv_file, expected_header_idx)
+    assert result
+    for row in result:
+        assert expected_header == list(row.keys())
+
+
 @pytest.mark.parametrize(
     ("csv_content", "expected_header_idx", "expected_header"),
     zip(EXAMPLE_CSV_FILES_WITH_HEADER, EXAMPLE_HEADER_IDX, EXAMPLE_HEADERS),
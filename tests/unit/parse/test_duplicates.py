@@ -0,0 +1,95 @@
+"""Tests for the duplicate gene handling module."""
+
+# ruff: noqa: ANN001, ANN201, PD011
+import pytest
+from geneweaver.core.parse.duplicates import (
+    DuplicateStats,
+    deduplicate_gene_values,
+    duplicate_indices_to_keep,
+)
+from geneweaver.core.parse.enum import DuplicatePolicy
+from geneweaver.core.parse.exceptions import DuplicateGeneError
+from geneweaver.core.schema.gene import GeneValue, GeneValueColumns
+
+SYMBOLS = ["A", "B", "A", "C", "B", "A"]
+VALUES = [0.5, -1.0, 0.01, 2.0, 3.0, -0.9]
+
+
+@pytest.mark.parametrize(
+    ("policy", "expected"),
+    [
+        (DuplicatePolicy.KEEP_FIRST, [("A", 0.5), ("B", -1.0), ("C", 2.0)]),
+        (DuplicatePolicy.KEEP_LAST, [("A", -0.9), ("B", 3.0), ("C", 2.0)]),
+        (DuplicatePolicy.MIN_VALUE, [("A", -0.9), ("B", -1.0), ("C", 2.0)]),
+        (DuplicatePolicy.MAX_ABS_VALUE, [("A", -0.9), ("B", 3.0), ("C", 2.0)]),
+        ("keep_first", [("A", 0.5), ("B", -1.0), ("C", 2.0)]),
+    ],
+)
+def test_deduplicate_gene_values(policy, expected):
+    """Each policy keeps one value per symbol, in order of first appearance."""
+    gene_values = [GeneValue(symbol=s, value=v) for s, v in zip(SYMBOLS, VALUES)]
+
+    result, removed = deduplicate_gene_values(gene_values, policy)
+
+    assert removed == 3
+    assert [(gv.symbol, gv.value) for gv in result] == expected
+
+    columns, removed = deduplicate_gene_values(
+        GeneValueColumns(SYMBOLS, VALUES), policy
+    )
+
+    assert removed == 3
+    assert isinstance(columns, GeneValueColumns)
+    assert list(zip(columns.symbols, columns.values)) == expected
+
+
+def test_deduplicate_gene_values_without_duplicates():
+    """Values without duplicates are returned unchanged."""
+    gene_values = [GeneValue(symbol="A", value=1), GeneValue(symbol="B", value=1)]
+
+    result, removed = deduplicate_gene_values(gene_values, DuplicatePolicy.ERROR)
+
+    assert result is gene_values
+    assert removed == 0
+
+
+def test_deduplicate_gene_values_error():
+    """The ERROR policy raises on the first duplicate symbol."""
+    with pytest.raises(DuplicateGeneError, match="Duplicate gene symbol: A") as e:
+        deduplicate_gene_values(
+            GeneValueColumns(SYMBOLS, VALUES), DuplicatePolicy.ERROR
+        )
+    assert e.value.symbol == "A"
+
+
+def test_duplicate_indices_to_keep_ties_and_nan():
+    """Ties keep the earlier value, and NaN is the worst value."""
+    nan = float("nan")
+    symbols = ["A", "A", "B", "B", "C", "C"]
+
+    assert duplicate_indices_to_keep(
+        symbols, [1.0, 1.0, nan, 0.5, 0.5, nan], DuplicatePolicy.MIN_VALUE
+    ) == [0, 3, 4]
+    assert duplicate_indices_to_keep(
+        symbols, [-1.0, 1.0, nan, 0.5, 0.5, nan], DuplicatePolicy.MAX_ABS_VALUE
+    ) == [0, 3, 4]
+    assert duplicate_indices_to_keep(
+        ["A", "A"], [nan, nan], DuplicatePolicy.MIN_VALUE
+    ) == [0]
+
+
+def test_duplicate_indices_to_keep_invalid_policy():
+    """Unknown policies are rejected."""
+    with pytest.raises(ValueError, match="not_a_policy"):
+        duplicate_indices_to_keep(SYMBOLS, VALUES, "not_a_policy")
+
+
+def test_duplicate_stats():
+    """Duplicates are counted along with the genesets they were removed from."""
+    stats = DuplicateStats()
+
+    for removed in (3, 0, 2):
+        stats.add(removed)
+
+    assert (stats.removed, stats.genesets) == (5, 2)
+    assert repr(stats) == "DuplicateStats(removed=5, genesets=2)"
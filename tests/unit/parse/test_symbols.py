@@ -0,0 +1,89 @@
+"""Tests for the gene symbol interning module."""
+
+# ruff: noqa: ANN001, ANN201, PD011
+import sys
+
+import pytest
+from geneweaver.core.parse.batch import TrustLevel, process_lines
+from geneweaver.core.parse.symbols import SymbolTable
+
+
+def new_string(value: str) -> str:
+    """Create a new string object with the given contents."""
+    return "".join(list(value))
+
+
+def test_symbol_table_intern():
+    """Interning returns the first string seen with the same contents."""
+    table = SymbolTable()
+    first, second = new_string("Gene1"), new_string("Gene1")
+    assert first is not second
+
+    assert table.intern(first) is first
+    assert table.intern(second) is first
+    assert table.intern("Gene2") == "Gene2"
+
+    assert len(table) == 2
+    assert "Gene1" in table
+    assert "Gene3" not in table
+
+
+def test_symbol_table_ids():
+    """Symbols are given IDs in order of first appearance."""
+    table = SymbolTable(["Gene1"])
+
+    ids = table.encode(["Gene2", "Gene1", "Gene2", "Gene3"])
+
+    assert list(ids) == [1, 0, 1, 2]
+    assert ids.itemsize == 4
+    assert table.decode(ids) == ["Gene2", "Gene1", "Gene2", "Gene3"]
+    assert table.symbol_of(2) == "Gene3"
+    assert table.id_of("Gene3") == 2
+    with pytest.raises(IndexError):
+        table.symbol_of(3)
+    with pytest.raises(IndexError):
+        table.symbol_of(-1)
+
+
+def test_symbol_table_stats():
+    """Statistics count the duplicates replaced, and the memory saved."""
+    table = SymbolTable()
+    for _ in range(3):
+        table.intern(new_string("Gene1"))
+    table.intern("Gene2")
+
+    stats = table.stats()
+
+    assert stats.unique_symbols == 2
+    assert stats.duplicates == 2
+    assert stats.bytes_saved == 2 * sys.getsizeof("Gene1")
+    assert stats.table_bytes > 0
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{}, {"columnar": True}, {"trust": TrustLevel.TRUSTED}, {"vectorized": True}],
+)
+def test_process_lines_interns_symbols(example_batch_file_contents, options):
+    """Parsing with a symbol table gives the same genesets, sharing symbol strings."""
+    table = SymbolTable()
+
+    result = process_lines(example_batch_file_contents, symbols=table, **options)
+
+    expected = process_lines(example_batch_file_contents, **options)
+    assert [g.model_dump() for g in result] == [g.model_dump() for g in expected]
+    for geneset in result:
+        for gene_value in geneset.values:
+            assert gene_value.symbol is table.intern(gene_value.symbol)
+
+
+def test_symbol_table_shared_between_parses():
+    """A table can be shared, so symbols are shared between files."""
+    table = SymbolTable()
+    contents = "! Binary\n@ Mus musculus\n% Gene Symbol\n: GS1\n= G1\n+ D1\nGene1\t1\n"
+
+    (first,) = process_lines(contents, symbols=table)
+    (second,) = process_lines(contents, symbols=table)
+
+    assert first.values[0].symbol is second.values[0].symbol
+    assert table.stats().duplicates == 1
@@ -1,8 +1,32 @@
 """Tests for the parser utility functions."""
 
 # ruff: noqa: ANN001, ANN201
+import bz2
+import gzip
+import io
+import lzma
+import tempfile
+
 import pytest
-from geneweaver.core.parse.utils import get_file_type, replace_keys
+from geneweaver.core.parse.enum import Compression
+from geneweaver.core.parse.utils import (
+    LineSplitter,
+    detect_compression,
+    get_file_type,
+    is_binary_stream,
+    iter_byte_lines,
+    iter_lines,
+    open_decompressed_stream,
+    open_file,
+    read_file_content,
+    replace_keys,
+)
+
+COMPRESSORS = [
+    (Compression.GZIP, gzip.compress),
+    (Compression.BZ2, bz2.compress),
+    (Compression.XZ, lzma.compress),
+]
 
 
 def test_get_file_type():
@@ -23,6 +47,91 @@ def test_get_file_type():
     assert str(exc_info.value) == "Unsupported file type .docx."
 
 
+@pytest.mark.parametrize("compression", ["gz", "GZ", "bz2", "xz", "zst"])
+def test_get_file_type_compressed(compression):
+    """Compression extensions are skipped when getting the file type."""
+    assert get_file_type(f"/path/to/file.csv.{compression}") == "csv"
+    assert get_file_type(f"/path/to/file.v1.txt.{compression}") == "txt"
+
+    with pytest.raises(ValueError, match="Unsupported"):
+        get_file_type(f"/path/to/file.{compression}")
+
+
+@pytest.mark.parametrize(("compression", "compress"), COMPRESSORS)
+def test_open_file_decompresses(tmp_path, compression, compress):
+    """Compressed files are detected by their magic bytes and decompressed."""
+    contents = "a,b\r\n1,2\n"
+    file_path = tmp_path / "file.csv.bin"
+    file_path.write_bytes(compress(contents.encode("utf-8")))
+
+    assert detect_compression(file_path) is compression
+    assert read_file_content(file_path) == contents.replace("\r\n", "\n")
+    with open_file(file_path, newline="") as f:
+        assert f.read() == contents
+    with open_file(file_path, "rb") as f:
+        assert f.read() == contents.encode("utf-8")
+
+
+def test_open_file_uncompressed(tmp_path):
+    """Uncompressed files are opened as they are."""
+    file_path = tmp_path / "file.txt"
+    file_path.write_text("Gene1\t1\n")
+
+    assert detect_compression(file_path) is None
+    assert read_file_content(file_path) == "Gene1\t1\n"
+
+    with pytest.raises(ValueError, match="Unsupported mode"):
+        open_file(file_path, "w")
+
+
+def test_open_file_zstd(tmp_path):
+    """Zstd files are decompressed when zstandard is installed."""
+    zstandard = pytest.importorskip("zstandard")
+    file_path = tmp_path / "file.txt.zst"
+    file_path.write_bytes(zstandard.ZstdCompressor().compress(b"Gene1\t1\n"))
+
+    assert detect_compression(file_path) is Compression.ZSTD
+    assert read_file_content(file_path) == "Gene1\t1\n"
+
+
+@pytest.mark.parametrize(("compression", "compress"), COMPRESSORS)
+@pytest.mark.parametrize("buffered", [True, False])
+def test_open_decompressed_stream(compression, compress, buffered):
+    """Compressed streams are wrapped, whether they can peek or only seek."""
+    stream = io.BytesIO(b"xx" + compress(b"Gene1\t1\n"))
+    stream.seek(2)
+    if buffered:
+        stream = io.BufferedReader(stream)
+
+    assert open_decompressed_stream(stream).read() == b"Gene1\t1\n"
+
+
+def test_open_decompressed_stream_uncompressed():
+    """Uncompressed streams are returned unchanged, at the same position."""
+    stream = io.BytesIO(b"Gene1\t1\n")
+
+    assert open_decompressed_stream(stream) is stream
+    assert stream.read() == b"Gene1\t1\n"
+
+
+@pytest.mark.parametrize(
+    ("make_stream", "expected"),
+    [
+        (io.BytesIO, True),
+        (lambda: io.BufferedReader(io.BytesIO()), True),
+        (lambda: tempfile.SpooledTemporaryFile(mode="w+b"), True),
+        (lambda: tempfile.NamedTemporaryFile(mode="w+b"), True),
+        (io.StringIO, False),
+        (lambda: tempfile.SpooledTemporaryFile(mode="w+"), False),
+        (lambda: tempfile.NamedTemporaryFile(mode="w+"), False),
+    ],
+)
+def test_is_binary_stream(make_stream, expected):
+    """Binary streams are detected, including wrappers which are not io classes."""
+    with make_stream() as stream:
+        assert is_binary_stream(stream) is expected
+
+
 def test_replace_keys():
     """Test the replace keys utility function."""
     data = [{"key1": "value1", "key2": "value2"}, {"key1": "value3", "key2": "value4"}]
@@ -33,3 +142,56 @@ def test_replace_keys():
     ]
 
     assert replace_keys(data, new_keys) == expected_data
+
+
+@pytest.mark.parametrize(
+    "contents",
+    [
+        "",
+        "a",
+        "a\nb\n",
+        "a\r\nb\r\nc",
+        "a\rb\rc\r",
+        "a\r\n\r\nb\n\n",
+        "éè\n x\x0by\x85",
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 64])
+@pytest.mark.parametrize("as_bytes", [True, False])
+def test_iter_lines_matches_splitlines(contents, chunk_size, as_bytes):
+    """Test that iter_lines splits streams the same way as str.splitlines."""
+    if as_bytes:
+        stream = io.BytesIO(contents.encode("utf-8"))
+    else:
+        stream = io.StringIO(contents, newline="")
+
+    assert list(iter_lines(stream, chunk_size)) == contents.splitlines()
+
+
+@pytest.mark.parametrize(
+    "contents",
+    [b"", b"a", b"a\nb\n", b"a\r\nb\r\nc", b"a\rb\rc\r", b"a\r\n\r\nb\n\n", b"\n\n"],
+)
+def test_iter_byte_lines_matches_splitlines(contents):
+    """Test that iter_byte_lines splits buffers the same way as bytes.splitlines."""
+    assert list(iter_byte_lines(contents)) == contents.splitlines()
+
+
+def test_line_splitter_returns_completed_lines():
+    """Test that LineSplitter returns lines as soon as they are complete."""
+    line_splitter = LineSplitter()
+
+    assert line_splitter.feed("a\nb") == ["a"]
+    assert line_splitter.feed("c\r") == []
+    assert line_splitter.feed("\nd\re") == ["bc", "d"]
+    assert line_splitter.close() == ["e"]
+    assert line_splitter.close() == []
+
+
+def test_line_splitter_multibyte_character_across_chunks():
+    """Test that LineSplitter decodes characters split across chunks of bytes."""
+    line_splitter = LineSplitter()
+    encoded = "é\n".encode("utf-8")
+
+    assert line_splitter.feed(encoded[:1]) == []
+    assert line_splitter.feed(encoded[1:]) == ["é"]
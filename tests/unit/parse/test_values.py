@@ -0,0 +1,214 @@
+"""Tests for the bulk value conversion module."""
+
+# ruff: noqa: ANN001, ANN201, PD011
+import math
+
+import pytest
+from geneweaver.core.parse import csv, xlsx
+from geneweaver.core.parse.exceptions import ValueConversionError
+from geneweaver.core.parse.values import (
+    NA_VALUES,
+    RawGeneValues,
+    convert_dict_column,
+    convert_value,
+    convert_values,
+    dict_rows_to_gene_values,
+)
+from geneweaver.core.schema.gene import GeneValue
+from openpyxl import Workbook
+from pydantic import ValidationError
+
+RAW_VALUES = [
+    "1",
+    "-2.5",
+    "1e-5",
+    "1E+5",
+    ".5",
+    " 3 ",
+    "1_000",
+    "nan",
+    "NaN",
+    "inf",
+    "-Infinity",
+    "1e400",
+    "NA",
+    "",
+    "x",
+    "0x1f",
+    "１",
+    "1 2",
+    3,
+    0.25,
+    10**400,
+    None,
+]
+
+
+def gene_value_or_none(raw_value):
+    """Convert a raw value with GeneValue, or return None if it is rejected."""
+    try:
+        return GeneValue(symbol="A", value=raw_value).value
+    except ValidationError:
+        return None
+
+
+def same_float(first, second) -> bool:
+    """Compare two floats, treating NaN as equal to NaN."""
+    return first == second or (math.isnan(first) and math.isnan(second))
+
+
+def test_convert_values_matches_gene_value():
+    """Values are converted, or rejected, exactly as GeneValue does."""
+    conversion = convert_values(RAW_VALUES)
+
+    for raw_value, value, failed in zip(
+        RAW_VALUES, conversion.values, conversion.failed
+    ):
+        expected = gene_value_or_none(raw_value)
+        assert failed == (expected is None), raw_value
+        if expected is not None:
+            assert same_float(value, expected), raw_value
+        else:
+            assert math.isnan(value)
+
+    assert not conversion.ok
+    assert not conversion.na.any()
+
+
+@pytest.mark.parametrize("raw_value", RAW_VALUES)
+def test_convert_value_matches_gene_value(raw_value):
+    """A single value is converted, or rejected, exactly as GeneValue does."""
+    expected = gene_value_or_none(raw_value)
+
+    if expected is None:
+        with pytest.raises(ValueError):  # noqa: PT011
+            convert_value(raw_value)
+    else:
+        assert same_float(convert_value(raw_value), expected)
+
+
+def test_convert_values_fast_path():
+    """A column of valid values is converted in one go."""
+    conversion = convert_values(["1", "2.5e-3", "-inf"])
+
+    assert conversion.ok
+    assert len(conversion) == 3
+    assert conversion.values.tolist() == [1.0, 0.0025, -math.inf]
+    assert conversion.failed_line_numbers == []
+    conversion.raise_for_failures()
+
+
+@pytest.mark.parametrize("raw_value", [None, 10**400])
+def test_convert_values_rejects_in_valid_column(raw_value):
+    """An empty cell, or a huge number, fails even in an otherwise valid column."""
+    conversion = convert_values(["1", raw_value, "2"])
+
+    assert not conversion.ok
+    assert conversion.failed.tolist() == [False, True, False]
+    assert conversion.values[[0, 2]].tolist() == [1.0, 2.0]
+    with pytest.raises(ValueConversionError) as exc_info:
+        conversion.raise_for_failures()
+    assert exc_info.value.failures == [(2, raw_value)]
+
+
+def test_dict_rows_to_gene_values_rejects_empty_cell():
+    """An empty value cell is rejected, unless "" is an NA value."""
+    rows = [{"Gene": "A", "Value": 1}, {"Gene": "B", "Value": None}]
+
+    with pytest.raises(ValueConversionError) as exc_info:
+        dict_rows_to_gene_values(rows, "Gene", "Value")
+    assert exc_info.value.failures == [(3, None)]
+
+    columns = dict_rows_to_gene_values(rows, "Gene", "Value", na_values=[""])
+    assert str(list(columns.values)) == "[1.0, nan]"
+
+
+def test_convert_values_failed_line_numbers():
+    """Failures are reported as a mask, and with their line numbers."""
+    conversion = convert_values(["1", "x", "2", "y"], line_numbers=[10, 12, 13, 20])
+
+    assert conversion.failed.tolist() == [False, True, False, True]
+    assert conversion.failed_line_numbers == [12, 20]
+    with pytest.raises(ValueConversionError) as exc_info:
+        conversion.raise_for_failures()
+    assert exc_info.value.failures == [(12, "x"), (20, "y")]
+    assert "'x' (line 12)" in str(exc_info.value)
+
+
+def test_convert_values_default_line_numbers():
+    """Without line numbers, failures are reported by position, starting at 1."""
+    assert convert_values(["x", "1", "y"]).failed_line_numbers == [1, 3]
+
+
+def test_convert_values_na_values():
+    """NA values are converted to NaN, and reported in their own mask."""
+    conversion = convert_values(["1", "NA", "", None, "x"], na_values=NA_VALUES)
+
+    assert conversion.na.tolist() == [False, True, True, True, False]
+    assert conversion.failed.tolist() == [False, False, False, False, True]
+    assert conversion.values[0] == 1.0
+    assert all(math.isnan(value) for value in conversion.values[1:])
+
+
+def test_convert_values_empty():
+    """An empty column converts to an empty array."""
+    conversion = convert_values([])
+
+    assert len(conversion) == 0
+    assert conversion.ok
+
+
+def test_raw_gene_values():
+    """Raw gene values are converted to columns, and sliced with their NA values."""
+    raw = RawGeneValues(na_values=("NA",))
+    for line_number, (symbol, value) in enumerate(
+        [("A", "1"), ("B", "NA"), ("C", "2e-2")], start=4
+    ):
+        raw.append(symbol, value)
+        raw.line_numbers.append(line_number)
+
+    columns = raw.to_columns()
+
+    assert len(raw) == 3
+    assert columns.symbols == ["A", "B", "C"]
+    assert str(list(columns.values)) == "[1.0, nan, 0.02]"
+    assert raw[:0].na_values == ("NA",)
+    assert len(raw[1:]) == 2
+
+    raw.append("D", "x")
+    raw.line_numbers.append(9)
+    with pytest.raises(ValueConversionError) as exc_info:
+        raw.to_columns()
+    assert exc_info.value.failures == [(9, "x")]
+
+
+def test_dict_rows_to_gene_values_csv(tmp_path):
+    """Rows read from a CSV file are converted, with failures on their file lines."""
+    file_path = tmp_path / "genes.csv"
+    file_path.write_text("# Comment\nGene,Value\nA,1\nB,NA\nC,1e-3\nD,x\n")
+    rows = csv.read_to_dict(file_path, start_row=1)
+
+    conversion = convert_dict_column(rows, "Value", start_row=1, na_values=NA_VALUES)
+    assert conversion.failed_line_numbers == [6]
+    assert conversion.na.tolist() == [False, True, False, False]
+
+    columns = dict_rows_to_gene_values(rows[:3], "Gene", "Value", 1, NA_VALUES)
+    assert columns.symbols == ["A", "B", "C"]
+    assert str(list(columns.values)) == "[1.0, nan, 0.001]"
+
+
+def test_dict_rows_to_gene_values_xlsx(tmp_path):
+    """Rows read from an Excel file (with numeric cells) are converted."""
+    file_path = tmp_path / "genes.xlsx"
+    workbook = Workbook()
+    for row in [("Gene", "Value"), ("A", 1), ("B", 0.5), ("C", None), ("D", "x")]:
+        workbook.active.append(row)
+    workbook.save(file_path)
+    rows = xlsx.read_to_dict(file_path)
+
+    with pytest.raises(ValueConversionError) as exc_info:
+        dict_rows_to_gene_values(rows, "Gene", "Value", na_values=NA_VALUES)
+
+    assert exc_info.value.failures == [(5, "x")]
+    columns = dict_rows_to_gene_values(rows[:3], "Gene", "Value", na_values=[""])
+    assert str(list(columns.values)) == "[1.0, 0.5, nan]"
@@ -25,3 +25,16 @@ def test_format_geneset_values_empty(mock_empty_geneset):
     """Test the format_geneset_values function with an empty geneset."""
     formatted_values = format_geneset_values(mock_empty_geneset)
     assert formatted_values == ""
+
+
+def test_format_geneset_values_value_format(
+    mock_batch_upload_geneset_one_gene_id_one_microarray,
+):
+    """Test that values are formatted with the value format."""
+    geneset = mock_batch_upload_geneset_one_gene_id_one_microarray
+    formatted_values = format_geneset_values(geneset, "%.2f")
+
+    assert formatted_values == "\n".join(
+        f"{gene_value.symbol}\t{gene_value.value:.2f}"
+        for gene_value in geneset.values  # noqa: PD011
+    )
@@ -0,0 +1,60 @@
+"""Test the iter_batch_file_chunks function."""
+
+from typing import Iterator
+
+import pytest
+from geneweaver.core.parse.batch import process_lines
+from geneweaver.core.render.batch import (
+    format_batch_file,
+    format_geneset_metadata,
+    format_geneset_values,
+    iter_batch_file_chunks,
+)
+from geneweaver.core.schema.batch import BatchUploadGeneset
+
+from tests.unit.parse.const import EXAMPLE_BATCH_FILE
+
+GENESETS = process_lines(EXAMPLE_BATCH_FILE)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 100, 64 * 1024])
+def test_iter_batch_file_chunks_matches_format_batch_file(chunk_size):
+    """Test that the chunks join up to the output of format_batch_file."""
+    chunks = list(iter_batch_file_chunks(GENESETS, chunk_size=chunk_size))
+
+    assert b"".join(chunks).decode("utf-8") == format_batch_file(GENESETS)
+
+
+def test_iter_batch_file_chunks_are_bounded():
+    """Test that chunks stay near chunk_size, however large the genesets are."""
+    chunks = list(iter_batch_file_chunks(GENESETS, chunk_size=1024))
+
+    assert len(chunks) > 1
+    assert all(len(chunk) < 2048 for chunk in chunks)
+
+
+def test_iter_batch_file_chunks_is_lazy():
+    """Test that the first chunk is yielded before every geneset is read."""
+
+    def genesets() -> Iterator[BatchUploadGeneset]:
+        yield GENESETS[0]
+        raise AssertionError("Read past the first geneset.")
+
+    assert next(iter_batch_file_chunks(genesets(), chunk_size=16))
+
+
+def test_iter_batch_file_chunks_empty():
+    """Test that no genesets give no chunks."""
+    assert list(iter_batch_file_chunks([])) == []
+
+
+def test_iter_batch_file_chunks_value_format():
+    """Test that values are formatted with the value format."""
+    chunks = iter_batch_file_chunks(GENESETS, chunk_size=100, value_format="%.1e")
+    expected = "".join(
+        format_geneset_metadata(geneset) + format_geneset_values(geneset, "%.1e") + "\n"
+        for geneset in GENESETS
+    )
+
+    assert b"".join(chunks).decode("utf-8") == expected
+    assert "e-0" in expected
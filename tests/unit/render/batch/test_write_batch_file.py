@@ -0,0 +1,112 @@
+"""Test the write_batch_file function."""
+
+import io
+import tempfile
+from typing import Callable, Iterator
+
+import pytest
+from geneweaver.core.parse.batch import process_lines
+from geneweaver.core.render.batch import format_batch_file, write_batch_file
+from geneweaver.core.schema.batch import BatchUploadGeneset
+
+from tests.unit.parse.const import EXAMPLE_BATCH_FILE
+
+
+def test_write_batch_file_text_stream(mock_batch_upload_geneset_all_species_scores):
+    """Test that write_batch_file writes the same text as format_batch_file."""
+    genesets = [mock_batch_upload_geneset_all_species_scores for _ in range(3)]
+    output = io.StringIO()
+
+    count = write_batch_file(genesets, output)
+
+    assert count == 3
+    assert output.getvalue() == format_batch_file(genesets)
+
+
+def test_write_batch_file_binary_stream(mock_batch_upload_geneset_all_species_scores):
+    """Test that write_batch_file encodes the output for binary streams."""
+    genesets = [mock_batch_upload_geneset_all_species_scores]
+    output = io.BytesIO()
+
+    write_batch_file(genesets, output, encoding="utf-16")
+
+    assert output.getvalue().decode("utf-16") == format_batch_file(genesets)
+
+
+def test_write_batch_file_consumes_generator_lazily(
+    mock_batch_upload_geneset_all_species_scores,
+):
+    """Test that each geneset is written before the next one is taken."""
+    output = io.StringIO()
+    written_before = []
+
+    def genesets() -> Iterator[BatchUploadGeneset]:
+        for _ in range(3):
+            written_before.append(len(output.getvalue()))
+            yield mock_batch_upload_geneset_all_species_scores
+
+    write_batch_file(genesets(), output)
+
+    assert written_before[0] == 0
+    assert written_before[1] < written_before[2] < len(output.getvalue())
+
+
+def test_write_batch_file_empty():
+    """Test that write_batch_file writes nothing for no genesets."""
+    output = io.StringIO()
+
+    assert write_batch_file(iter([]), output) == 0
+    assert output.getvalue() == ""
+
+
+def test_write_batch_file_round_trip():
+    """Test that written genesets parse back to the same genesets."""
+    genesets = process_lines(EXAMPLE_BATCH_FILE)
+    output = io.StringIO()
+
+    write_batch_file(iter(genesets), output)
+
+    assert [geneset.model_dump() for geneset in process_lines(output.getvalue())] == [
+        geneset.model_dump() for geneset in genesets
+    ]
+
+
+@pytest.mark.parametrize(
+    "open_stream",
+    [
+        lambda: tempfile.NamedTemporaryFile("w+", encoding="utf-8"),
+        lambda: tempfile.SpooledTemporaryFile(mode="w+", encoding="utf-8"),
+        lambda: tempfile.SpooledTemporaryFile(max_size=1, mode="w+", encoding="utf-8"),
+    ],
+)
+def test_write_batch_file_wrapped_text_stream(
+    mock_batch_upload_geneset_all_species_scores, open_stream: Callable
+):
+    """Test that text streams which are not io.TextIOBase are written with str."""
+    genesets = [mock_batch_upload_geneset_all_species_scores]
+
+    with open_stream() as output:
+        write_batch_file(genesets, output)
+        output.seek(0)
+
+        assert output.read() == format_batch_file(genesets)
+
+
+@pytest.mark.parametrize(
+    "open_stream",
+    [
+        lambda: tempfile.NamedTemporaryFile("w+b"),
+        lambda: tempfile.SpooledTemporaryFile(mode="w+b"),
+    ],
+)
+def test_write_batch_file_wrapped_binary_stream(
+    mock_batch_upload_geneset_all_species_scores, open_stream: Callable
+):
+    """Test that wrapped binary streams are written with encoded bytes."""
+    genesets = [mock_batch_upload_geneset_all_species_scores]
+
+    with open_stream() as output:
+        write_batch_file(genesets, output)
+        output.seek(0)
+
+        assert output.read().decode("utf-8") == format_batch_file(genesets)
@@ -0,0 +1,27 @@
+"""Test the iter_encoded_chunks function."""
+
+import pytest
+from geneweaver.core.render.chunks import iter_encoded_chunks
+
+
+def test_iter_encoded_chunks_coalesces_small_pieces():
+    """Test that small pieces are joined into chunks of at least chunk_size."""
+    chunks = list(iter_encoded_chunks(("abc" for _ in range(10)), chunk_size=8))
+
+    assert chunks == [b"abcabcabc", b"abcabcabc", b"abcabcabc", b"abc"]
+
+
+def test_iter_encoded_chunks_keeps_large_pieces_whole():
+    """Test that a piece larger than chunk_size is yielded as one chunk."""
+    chunks = list(iter_encoded_chunks(["a", "b" * 10, "c"], chunk_size=4))
+
+    assert chunks == [b"a" + b"b" * 10, b"c"]
+
+
+@pytest.mark.parametrize("pieces", [[], [""], ["é", "ü", "ß"]])
+def test_iter_encoded_chunks_utf8(pieces):
+    """Test that the chunks join up to the UTF-8 encoding of the pieces."""
+    chunks = list(iter_encoded_chunks(pieces, chunk_size=2))
+
+    assert b"".join(chunks) == "".join(pieces).encode("utf-8")
+    assert all(chunks)
@@ -0,0 +1,28 @@
+"""Test the iter_csv_file_chunks function."""
+
+import pytest
+from geneweaver.core.parse.batch import process_lines
+from geneweaver.core.render.csv import format_csv_file, iter_csv_file_chunks
+
+from tests.unit.parse.const import EXAMPLE_BATCH_FILE
+
+GENESET = process_lines(EXAMPLE_BATCH_FILE)[0]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 100, 64 * 1024])
+@pytest.mark.parametrize(("sep", "header_prefix"), [(",", "#"), ("\t", "//")])
+def test_iter_csv_file_chunks_matches_format_csv_file(chunk_size, sep, header_prefix):
+    """Test that the chunks join up to the output of format_csv_file."""
+    chunks = iter_csv_file_chunks(GENESET, sep, header_prefix, chunk_size=chunk_size)
+
+    assert b"".join(chunks).decode("utf-8") == format_csv_file(
+        GENESET, sep, header_prefix
+    )
+
+
+def test_iter_csv_file_chunks_are_bounded():
+    """Test that chunks stay near chunk_size."""
+    chunks = list(iter_csv_file_chunks(GENESET, chunk_size=256))
+
+    assert len(chunks) > 1
+    assert all(len(chunk) < 1024 for chunk in chunks)
@@ -0,0 +1,146 @@
+"""Test the export_genesets function."""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator
+from unittest.mock import patch
+
+import pytest
+from geneweaver.core.parse.batch import process_lines
+from geneweaver.core.render import export
+from geneweaver.core.render.batch import format_batch_file
+from geneweaver.core.render.csv import format_csv_file
+from geneweaver.core.render.export import ExportFormat, export_genesets
+from geneweaver.core.render.gene_list import gene_list_str
+from geneweaver.core.schema.batch import BatchUploadGeneset
+
+from tests.unit.parse.const import EXAMPLE_BATCH_FILE
+
+GENESETS = process_lines(EXAMPLE_BATCH_FILE)
+COLUMNAR_GENESETS = process_lines(EXAMPLE_BATCH_FILE, columnar=True)
+
+
+@pytest.mark.parametrize(
+    ("export_format", "render"),
+    [
+        (ExportFormat.BATCH, lambda geneset: format_batch_file([geneset])),
+        (ExportFormat.CSV, format_csv_file),
+        (ExportFormat.GENE_LIST, lambda geneset: gene_list_str(geneset.values)),
+    ],
+)
+def test_export_genesets_formats(tmp_path, export_format, render):
+    """Test that each geneset is written to its own file in the export format."""
+    with ThreadPoolExecutor(2) as executor:
+        paths = export_genesets(
+            GENESETS,
+            "{index:03d}-{abbreviation}.txt",
+            export_format,
+            directory=tmp_path,
+            executor=executor,
+        )
+
+    assert paths == [
+        tmp_path / f"{idx:03d}-{geneset.abbreviation}.txt"
+        for idx, geneset in enumerate(GENESETS)
+    ]
+    for path, geneset in zip(paths, GENESETS):  # noqa: B905
+        assert path.read_text(encoding="utf-8") == render(geneset)
+    assert sorted(tmp_path.iterdir()) == sorted(paths)
+
+
+def test_export_genesets_process_pool(tmp_path):
+    """Test exporting columnar genesets in the default process pool."""
+    progress = []
+
+    paths = export_genesets(
+        COLUMNAR_GENESETS,
+        "gs{index}.gw",
+        directory=tmp_path,
+        max_workers=2,
+        progress=lambda count, path: progress.append((count, path)),
+        value_format="%.3g",
+    )
+
+    assert [count for count, _ in progress] == list(range(1, len(paths) + 1))
+    assert sorted(path for _, path in progress) == sorted(paths)
+    for path, geneset in zip(paths, GENESETS):  # noqa: B905
+        assert process_lines(path.read_text())[0].abbreviation == geneset.abbreviation
+
+
+@pytest.mark.parametrize("chunksize", [1, 3])
+def test_export_genesets_bounds_in_flight(tmp_path, chunksize):
+    """Test that genesets are only taken as earlier chunks finish."""
+    taken = []
+
+    def genesets() -> Iterator[BatchUploadGeneset]:
+        for geneset in GENESETS:
+            taken.append(geneset)
+            yield geneset
+
+    def progress(count: int, _: Path) -> None:
+        # Two chunks in flight, and the next chunk waiting to be submitted.
+        assert len(taken) <= count - 1 + 3 * chunksize
+
+    with ThreadPoolExecutor(1) as executor:
+        export_genesets(
+            genesets(),
+            "{index}.gw",
+            directory=tmp_path,
+            executor=executor,
+            chunksize=chunksize,
+            max_in_flight=2,
+            progress=progress,
+        )
+
+    assert len(taken) == len(GENESETS)
+
+
+def test_export_genesets_retries_failed_writes(tmp_path):
+    """Test that a failed write is retried, without leaving temporary files."""
+    write_file_atomic = export.write_file_atomic
+    attempts = []
+
+    def flaky_write(path: Path, data: bytes) -> None:
+        attempts.append(path)
+        if attempts.count(path) == 1:
+            raise OSError("Busy")
+        write_file_atomic(path, data)
+
+    with patch.object(export, "write_file_atomic", flaky_write), patch.object(
+        export, "DEFAULT_RETRY_DELAY", 0
+    ), ThreadPoolExecutor(2) as executor:
+        paths = export_genesets(
+            GENESETS[:3], "{index}.gw", directory=tmp_path, executor=executor
+        )
+
+    assert len(attempts) == 6
+    assert sorted(tmp_path.iterdir()) == sorted(paths)
+
+
+def test_export_genesets_raises_after_retries(tmp_path):
+    """Test that the error is raised once the retries are used up."""
+    with patch.object(export.os, "replace", side_effect=OSError("Busy")), patch.object(
+        export, "DEFAULT_RETRY_DELAY", 0
+    ), ThreadPoolExecutor(1) as executor, pytest.raises(OSError, match="Busy"):
+        export_genesets(
+            GENESETS[:1], "{index}.gw", directory=tmp_path, executor=executor
+        )
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize(
+    "filename_template", ["../{index}.gw", "/tmp/{index}.gw", "", "same.gw"]
+)
+def test_export_genesets_invalid_file_names(tmp_path, filename_template):
+    """Test that file names outside the directory, or repeated, are rejected."""
+    with ThreadPoolExecutor(1) as executor, pytest.raises(ValueError, match="export"):
+        export_genesets(
+            GENESETS, filename_template, directory=tmp_path, executor=executor
+        )
+
+
+def test_export_genesets_invalid_chunksize(tmp_path):
+    """Test that chunks must hold at least one geneset."""
+    with pytest.raises(ValueError, match="chunksize"):
+        export_genesets(GENESETS, "{index}.gw", directory=tmp_path, chunksize=0)
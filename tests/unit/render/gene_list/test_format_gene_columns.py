@@ -0,0 +1,78 @@
+"""Test the format_gene_columns function, and value formats for gene lists."""
+
+from array import array
+from typing import List
+
+import pytest
+from geneweaver.core.render.gene_list import (
+    format_gene_columns,
+    gene_list_str,
+    iter_gene_list_chunks,
+    iter_gene_list_pieces,
+)
+from geneweaver.core.schema.gene import GeneValue, GeneValueColumns
+
+SYMBOLS = ["Gene1", "Gene2", "Gene3"]
+VALUES = [1.0, 0.123456789, -2.5e-10]
+
+
+@pytest.mark.parametrize("separator", ["\t", ",", "%"])
+def test_format_gene_columns_matches_gene_values(separator: str):
+    """Test that the default format renders values as GeneValue does."""
+    gene_values = [GeneValue(symbol=s, value=v) for s, v in zip(SYMBOLS, VALUES)]
+    expected = "\n".join(f"{g.symbol}{separator}{g.value}" for g in gene_values)
+
+    assert format_gene_columns(SYMBOLS, VALUES, separator) == expected
+    assert gene_list_str(gene_values, separator) == expected
+
+
+@pytest.mark.parametrize(
+    ("value_format", "expected"),
+    [
+        ("%.6g", "Gene1\t1\nGene2\t0.123457\nGene3\t-2.5e-10"),
+        ("%.3f", "Gene1\t1.000\nGene2\t0.123\nGene3\t-0.000"),
+        ("%.2e", "Gene1\t1.00e+00\nGene2\t1.23e-01\nGene3\t-2.50e-10"),
+    ],
+)
+def test_format_gene_columns_value_format(value_format: str, expected: str):
+    """Test that values are rendered with the value format."""
+    assert format_gene_columns(SYMBOLS, VALUES, "\t", value_format) == expected
+
+
+def test_format_gene_columns_empty():
+    """Test that no genes give an empty string."""
+    assert format_gene_columns([], []) == ""
+
+
+def test_gene_list_str_columns(mock_gene_value_list: List[GeneValue]):
+    """Test that GeneValueColumns render the same as their GeneValue objects."""
+    columns = GeneValueColumns.from_gene_values(mock_gene_value_list)
+
+    assert gene_list_str(columns) == gene_list_str(mock_gene_value_list)
+    assert gene_list_str(columns, ",", "%.4g") == gene_list_str(
+        mock_gene_value_list, ",", "%.4g"
+    )
+
+
+@pytest.mark.parametrize("rows_per_piece", [1, 2, 4096])
+def test_iter_gene_list_pieces_matches_gene_list_str(rows_per_piece: int):
+    """Test that the pieces join up to the output of gene_list_str."""
+    gene_values = [GeneValue(symbol=f"Gene{i}", value=i / 7) for i in range(5)]
+    columns = GeneValueColumns(
+        [g.symbol for g in gene_values], array("d", [g.value for g in gene_values])
+    )
+    expected = gene_list_str(gene_values, "\t", "%.3g")
+
+    for genes in (gene_values, iter(gene_values), columns):
+        pieces = list(iter_gene_list_pieces(genes, "\t", "%.3g", rows_per_piece))
+        assert "".join(pieces) == expected
+        assert len(pieces) == -(-5 // rows_per_piece)
+
+
+def test_iter_gene_list_chunks_value_format(mock_gene_value_list: List[GeneValue]):
+    """Test that chunks are rendered with the value format."""
+    chunks = iter_gene_list_chunks(mock_gene_value_list, ",", 50, "%.2f")
+
+    assert b"".join(chunks).decode("utf-8") == gene_list_str(
+        mock_gene_value_list, ",", "%.2f"
+    )
@@ -0,0 +1,25 @@
+"""Test the iter_gene_list_chunks function."""
+
+from typing import List
+
+import pytest
+from geneweaver.core.render.gene_list import gene_list_str, iter_gene_list_chunks
+from geneweaver.core.schema.gene import GeneValue
+
+
+@pytest.mark.parametrize("chunk_size", [1, 50, 64 * 1024])
+@pytest.mark.parametrize("separator", ["\t", ","])
+def test_iter_gene_list_chunks_matches_gene_list_str(
+    mock_gene_value_list: List[GeneValue], chunk_size: int, separator: str
+):
+    """Test that the chunks join up to the output of gene_list_str."""
+    chunks = iter_gene_list_chunks(mock_gene_value_list, separator, chunk_size)
+
+    assert b"".join(chunks).decode("utf-8") == gene_list_str(
+        mock_gene_value_list, separator
+    )
+
+
+def test_iter_gene_list_chunks_empty():
+    """Test that an empty gene list gives no chunks."""
+    assert list(iter_gene_list_chunks([])) == []
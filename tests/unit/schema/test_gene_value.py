@@ -0,0 +1,28 @@
+"""Tests for the GeneValue schema."""
+
+# ruff: noqa: ANN001, ANN201
+import pickle
+
+import pytest
+from geneweaver.core.schema.gene import GeneValue
+from pydantic import ValidationError
+
+
+def test_gene_value_from_typed_matches_validated():
+    """A gene value built without validation is the same as a validated one."""
+    gene_value = GeneValue.from_typed("Gene1", 0.5)
+    expected = GeneValue(symbol="Gene1", value=0.5)
+
+    assert repr(gene_value) == repr(expected)
+    assert gene_value.model_dump() == expected.model_dump()
+    assert gene_value.model_fields_set == expected.model_fields_set
+    assert hash(gene_value) == hash(expected)
+    assert pickle.loads(pickle.dumps(gene_value)).model_dump() == expected.model_dump()
+
+
+def test_gene_value_from_typed_is_frozen():
+    """A gene value built without validation is still frozen."""
+    gene_value = GeneValue.from_typed("Gene1", 0.5)
+
+    with pytest.raises(ValidationError):
+        gene_value.value = 1.0
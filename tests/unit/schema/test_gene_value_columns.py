@@ -0,0 +1,67 @@
+"""Tests for the GeneValueColumns schema."""
+
+# ruff: noqa: ANN001, ANN201, PD011
+import pytest
+from geneweaver.core.schema.gene import GeneValue, GeneValueColumns
+from pydantic import ValidationError
+
+GENE_VALUES = [
+    GeneValue(symbol="Gene1", value=1.0),
+    GeneValue(symbol="Gene2", value=0.05),
+    GeneValue(symbol="Gene3", value=-2.5),
+]
+
+
+def test_gene_value_columns_materialize_gene_values():
+    """Indexing and iterating the columns gives GeneValue instances."""
+    columns = GeneValueColumns.from_gene_values(GENE_VALUES)
+
+    assert len(columns) == 3
+    assert columns.symbols == ["Gene1", "Gene2", "Gene3"]
+    assert list(columns.values) == [1.0, 0.05, -2.5]
+    assert columns[1] == GENE_VALUES[1]
+    assert columns[-1].value == -2.5
+    assert [(gv.symbol, gv.value) for gv in columns.to_gene_values()] == [
+        (gv.symbol, gv.value) for gv in GENE_VALUES
+    ]
+    assert columns[1:] == GeneValueColumns(["Gene2", "Gene3"], [0.05, -2.5])
+
+
+def test_gene_value_columns_equality_compares_values():
+    """Columns compare values too, unlike GeneValue, and never equal a list."""
+    columns = GeneValueColumns.from_gene_values(GENE_VALUES)
+    changed = GeneValueColumns(["Gene1", "Gene2", "Gene3"], [1.0, 0.05, 2.5])
+
+    assert columns == GeneValueColumns.from_gene_values(GENE_VALUES)
+    assert columns != changed
+    assert columns.to_gene_values() == changed.to_gene_values()
+    assert columns != GENE_VALUES
+    assert GENE_VALUES != columns
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [("1", 1.0), ("1e-5", 1e-5), ("-.5", -0.5), ("inf", float("inf")), (3, 3.0)],
+)
+def test_gene_value_columns_append_converts_like_gene_value(value, expected):
+    """Values are converted to floats as GeneValue would convert them."""
+    columns = GeneValueColumns()
+    columns.append("Gene1", value)
+
+    assert columns.values[0] == expected == GeneValue(symbol="Gene1", value=value).value
+
+
+@pytest.mark.parametrize("value", ["x", "0x10", "１", ""])
+def test_gene_value_columns_append_rejects_like_gene_value(value):
+    """Values which GeneValue rejects raise the same ValidationError."""
+    columns = GeneValueColumns()
+
+    with pytest.raises(ValidationError):
+        columns.append("Gene1", value)
+    assert len(columns) == 0
+
+
+def test_gene_value_columns_length_mismatch():
+    """Symbols and values must be the same length."""
+    with pytest.raises(ValueError, match="same length"):
+        GeneValueColumns(["Gene1"], [])
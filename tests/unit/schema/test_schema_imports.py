@@ -7,6 +7,7 @@ import pytest
 VALID_IMPORTS = [
     ("geneweaver.core.schema", "Gene"),
     ("geneweaver.core.schema", "GeneValue"),
+    ("geneweaver.core.schema", "GeneValueColumns"),
     ("geneweaver.core.schema", "Geneset"),
     ("geneweaver.core.schema", "GenesetUpload"),
     ("geneweaver.core.schema", "Group"),